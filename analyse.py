@@ -1,172 +1,378 @@
-from datetime import datetime
-
-from tabulate import tabulate
-import questionary
-
-import display
-import manage
-
-class Analyse:
-    """ 
-    A class to analyse and display habit-related data. 
-    """
-    @classmethod
-    def get_top_main(cls, habits, attribute, designation):
-        """ 
-        Sorts and displays habits based on a specified attribute in ascending or descending order. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyse. 
-        attribute (str): The attribute of the habit to sort by. 
-        designation (str): A descriptive name for the attribute being sorted. 
-        """
-        order = cls.choose_order()
-        sorted_habits = sorted(habits, key=lambda habit: getattr(habit, attribute), reverse=order)
-        top = sorted_habits
-
-        table_data = []
-        for habit in top:
-            if getattr(habit, attribute) > 0:
-                table_data.append([habit.id, habit.name, getattr(habit, attribute), habit.status])
-        if not table_data:
-            print(f"\nNo results found for this filter.")
-        else:
-            order_text = "descending" if order else "ascending"
-            print(f"\nHere is a {order_text} list of all habits that have a {designation} > 0:")
-            print(tabulate(table_data, headers=["ID", "Name", f"{designation.capitalize()}", "Status"], tablefmt="github"))
-
-    @classmethod
-    def get_top_most(cls, habits, attribute, designation):
-        """ 
-        Finds and displays the top 3 habits based on the length of a specified attribute. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyse. 
-        attribute (str): The attribute of the habit to sort by length. 
-        designation (str): A descriptive name for the attribute being sorted. 
-        """
-        sorted_habits = sorted(habits, key=lambda habit: len(getattr(habit, attribute)), reverse=True)
-        top_3_habits = sorted_habits[:3]
-
-        table_data = []
-        for habit in top_3_habits:
-            if len(getattr(habit, attribute)) > 0:
-                table_data.append([habit.id, habit.name, len(getattr(habit, attribute)), habit.status])
-        if not table_data:
-            print(f"\nNo results found for this filter.")
-        else:
-            print(f"\nHere are the top 3 of your habits with the most {designation} since creation:")
-            print(tabulate(table_data, headers=["ID", "Name", f"{designation.capitalize()}", "Status"], tablefmt="github"))
-
-    @classmethod
-    def get_top_longest_expired(cls, habits):
-        """ 
-        Finds and displays the top 3 habits that have not been worked on for the longest time. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyse. 
-        """
-        now = datetime.now().strftime("%Y-%m-%d")
-
-        habit_deadline_dates = [(habit, datetime.strptime(habit.deadline, "%Y-%m-%d")) for habit in habits]
-        sorted_habits = sorted(habit_deadline_dates, key=lambda item: item[1], reverse=False)
-        top_3_habits = sorted_habits[:3]
-
-        table_data = []
-        for habit, deadline_date in top_3_habits:
-            if habit.deadline < now and habit.status == "Broken":
-                table_data.append([habit.id, habit.name, habit.deadline, habit.status])
-
-        if not table_data:
-            print(f"\nNo results found for this filter.")
-        else:
-            print(f"\nHere are the top 3 of your habits that have not been worked on for the longest time:")
-            print(tabulate(table_data, headers=["ID", "Name", "Deadline", "Status"], tablefmt="github"))
-
-
-    @classmethod
-    def get_group_habits_by_category(cls, habits):
-        """ 
-        Groups and displays all habits by their categories. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyze. 
-        """
-        all_categories = manage.CATEGORIES
-
-        category_count = {category: {'total': 0, 'active': 0, 'broken': 0, 'established': 0} for category in all_categories}
-
-        for habit in habits:
-            if habit.category in category_count:
-                category_count[habit.category]['total'] += 1
-                if habit.status == "Active":
-                    category_count[habit.category]['active'] += 1
-                elif habit.status == "Broken":
-                    category_count[habit.category]['broken'] += 1
-                elif habit.status == "Established":
-                    category_count[habit.category]['established'] += 1
-
-        table_data = []
-        for category, counts in category_count.items():
-            table_data.append([category, counts['total'], counts['active'], counts['broken'], counts['established']])
-        if not table_data:
-            print(f"\nNo results found for this filter.")
-        else:
-            print(f"\nHere is a grouping of all habits by category:")
-            print(tabulate(table_data, headers=["Category", "Total", "Active", "Broken", "Established"], tablefmt="github"))
-
-    @classmethod
-    def get_habit_streak_max(cls, habits):
-        """ 
-        Displays the maximum streak ("Longest Streak per Habit") of a specific habit selected by the user. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyze. 
-        """
-        display.display_habits(habits, status_request = None,  length = "short", filter_period= [1,2,7], headline = "")
-        try:
-            habit_id = int(questionary.text(f"\nPlease enter the ID of the habit you want to see:").ask())
-        except ValueError:
-            print(f"\nInvalid input. Please enter one of the numeric IDs you can see in the list above.")
-            return
-        if not any(habit.id == habit_id for habit in habits):
-            print(f"\nNo habit found with ID {habit_id}. Please enter a numeric ID you can see in the list above.")
-            return
-
-        habit = None
-        for h in habits:
-            if h.id == habit_id:
-                habit = h
-                break
-
-        table_data = [[habit.id, habit.name, habit.streak_max, habit.status]]
-        print(tabulate(table_data, headers=["ID", "Name", "Streak Max", "Status"], tablefmt="github"))
-
-    @classmethod
-    def get_habits_by_period(cls, habits):
-        """ 
-        Displays all habits that have the same period. 
-        
-        Parameters: 
-        habits (list): The list of habit objects to analyze. 
-        """
-        period_word = questionary.select("Select the period for which you want to display habits:", choices = manage.PERIODS ).ask()
-        period = manage.PERIOD_MAPPING[period_word]
-        
-        display.display_habits(habits, status_request = None, length = "short", filter_period = [period], 
-                               headline =f"\nHere are all habits with a period of '{period_word}'.")
-    
-    @staticmethod
-    def choose_order():
-        """ 
-        Allows the user to choose the order (ascending or descending) for sorting. 
-        
-        Returns: 
-        bool: True if descending, False if ascending. 
-
-        Used by:
-        analyse.get_top_main()
-        """
-        choice = questionary.select(f"\nShould the list be in ascending or descending order?",choices=["ascending", "descending"]).ask()
-        order = {"descending": True ,"ascending" : False}[choice]
+from datetime import date
+import heapq
+
+import display
+import manage
+
+class Analyse:
+    """ 
+    A class to analyse and display habit-related data. 
+    """
+    @classmethod
+    def get_top_main(cls, habits, attribute, designation, order = None):
+        """ 
+        Sorts and displays habits based on a specified attribute in ascending or descending order. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habit objects to analyse. 
+        attribute (str): The attribute of the habit to sort by ("streak" or "streak_max"). 
+        designation (str): A descriptive name for the attribute being sorted. 
+        order (bool): True for descending, False for ascending. The user is asked if None. 
+
+        Returns: 
+        list: The rows of the table (ID, name, value, status). 
+        """
+        if order is None:
+            order = cls.choose_order()
+        snapshot = cls.get_snapshot(habits)
+        if snapshot is not None:
+            values = snapshot.column(attribute)
+            top = [(int(values[position]), snapshot.habits[position]) for position in snapshot.ranked(values, order, mask=values > 0).tolist()]
+        else:
+            sorted_habits = sorted(habits, key=lambda habit: getattr(habit, attribute), reverse=order)
+            top = [(getattr(habit, attribute), habit) for habit in sorted_habits if getattr(habit, attribute) > 0]
+
+        table_data = [[habit.id, habit.name, value, habit.status] for value, habit in top]
+        if not table_data:
+            print(f"\nNo results found for this filter.")
+        else:
+            order_text = "descending" if order else "ascending"
+            print(f"\nHere is a {order_text} list of all habits that have a {designation} > 0:")
+            display.print_table(table_data, ["ID", "Name", f"{designation.capitalize()}", "Status"])
+        return table_data
+
+    @classmethod
+    def get_top_most(cls, habits, attribute, designation, k = 3):
+        """ 
+        Finds and displays the top k habits based on the length of a specified attribute. 
+        
+        Parameters: 
+        habits (list): The list of habit objects to analyse. 
+        attribute (str): The attribute of the habit to sort by length. 
+        designation (str): A descriptive name for the attribute being sorted. 
+        k (int): The number of habits to display. 
+
+        Returns: 
+        list: The rows of the table (ID, name, length, status). 
+        """
+        snapshot = cls.get_snapshot(habits)
+        if snapshot is not None:
+            values = snapshot.column(attribute)
+            top_habits = [(int(values[position]), snapshot.habits[position]) for position in snapshot.ranked(values, k=k).tolist()]
+        else:
+            top_habits = cls.top_k(habits, key=lambda habit: len(getattr(habit, attribute)), k=k)
+
+        table_data = []
+        for length, habit in top_habits:
+            if length > 0:
+                table_data.append([habit.id, habit.name, length, habit.status])
+        if not table_data:
+            print(f"\nNo results found for this filter.")
+        else:
+            print(f"\nHere are the top {k} of your habits with the most {designation} since creation:")
+            display.print_table(table_data, ["ID", "Name", f"{designation.capitalize()}", "Status"])
+        return table_data
+
+    @classmethod
+    def get_top_longest_expired(cls, habits, k = 3):
+        """ 
+        Finds and displays the top k broken habits that have not been worked on for the longest time. 
+        
+        Parameters: 
+        habits (list): The list of habit objects to analyse. 
+        k (int): The number of habits to display. 
+
+        Returns: 
+        list: The rows of the table (ID, name, deadline, status). 
+        """
+        today = manage.clock.now().toordinal()
+        snapshot = cls.get_snapshot(habits)
+        if snapshot is not None:
+            expired = (snapshot.statuses == snapshot.code("Broken")) & (snapshot.deadlines < today)
+            top_habits = [(None, snapshot.habits[position]) for position in snapshot.ranked(snapshot.deadlines, False, expired, k).tolist()]
+        else:
+            expired_habits = (habit for habit in habits if habit.status == "Broken" and habit.deadline_ordinal < today)
+            top_habits = cls.top_k(expired_habits, key=lambda habit: habit.deadline_ordinal, k=k, largest=False)
+
+        table_data = [[habit.id, habit.name, habit.deadline, habit.status] for _, habit in top_habits]
+
+        if not table_data:
+            print(f"\nNo results found for this filter.")
+        else:
+            print(f"\nHere are the top {k} of your habits that have not been worked on for the longest time:")
+            display.print_table(table_data, ["ID", "Name", "Deadline", "Status"])
+        return table_data
+
+    @staticmethod
+    def get_snapshot(habits):
+        """ 
+        Returns the columnar snapshot of the habits which answers the reports with array operations. 
+        columnar is imported here, so that starting the tracker does not load NumPy. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        
+        Returns: 
+        HabitSnapshot: The snapshot, or None if NumPy or columnar.py is missing. Then the reports loop over the habits. 
+        """
+        try:
+            import columnar
+        except ImportError:
+            return None
+        return columnar.snapshot(habits)
+
+    @staticmethod
+    def top_k(habits, key, k = 3, largest = True):
+        """ 
+        Selects the k habits with the largest (or smallest) key with a heap instead of sorting all habits. 
+        The key is computed once per habit (and again for the k selected ones), so the selection costs O(n log k). 
+        Habits with the same key keep the order of the collection, as with a stable sort. 
+        
+        Parameters: 
+        habits (iterable): The habits to select from. 
+        key (callable): Computes the key of a habit. 
+        k (int): The number of habits to select. 
+        largest (bool): If True, the habits with the largest keys are selected, otherwise those with the smallest. 
+        
+        Returns: 
+        list: Pairs of key and habit, ordered by key. 
+
+        Used by: analyse.get_top_most() and analyse.get_top_longest_expired() without NumPy
+        """
+        select = heapq.nlargest if largest else heapq.nsmallest
+        return [(key(habit), habit) for habit in select(k, habits, key=key)]
+
+    @classmethod
+    def get_group_habits_by_category(cls, habits):
+        """ 
+        Groups and displays all habits by their categories. 
+        The numbers are read from the running counters of the collection, so the report costs O(categories). 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habit objects to analyze. 
+        """
+        table_data = []
+        for category in manage.CATEGORIES:
+            counts = habits.counts.by_status(category)
+            table_data.append([category, sum(counts.values()), counts.get("Active", 0), counts.get("Broken", 0), counts.get("Established", 0)])
+        if not table_data:
+            print(f"\nNo results found for this filter.")
+        else:
+            print(f"\nHere is a grouping of all habits by category:")
+            display.print_table(table_data, ["Category", "Total", "Active", "Broken", "Established"])
+
+    @classmethod
+    def get_habit_streak_max(cls, habits, habit_id = None):
+        """ 
+        Displays the maximum streak ("Longest Streak per Habit") of a specific habit selected by the user. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habit objects to analyze. 
+        habit_id (int): The ID of the habit to display. The user is asked if None. 
+        """
+        if habit_id is None:
+            import questionary
+
+            display.display_habits(habits, status_request = None,  length = "short", filter_period= [1,2,7], headline = "")
+            try:
+                habit_id = int(questionary.text(f"\nPlease enter the ID of the habit you want to see:").ask())
+            except ValueError:
+                print(f"\nInvalid input. Please enter one of the numeric IDs you can see in the list above.")
+                return
+        habit = habits.get(habit_id)
+        if habit is None:
+            print(f"\nNo habit found with ID {habit_id}. Please enter a numeric ID you can see in the list above.")
+            return
+
+        table_data = [[habit.id, habit.name, habit.streak_max, habit.status]]
+        display.print_table(table_data, ["ID", "Name", "Streak Max", "Status"])
+
+    @classmethod
+    def get_habits_by_period(cls, habits, period = None):
+        """ 
+        Displays all habits that have the same period. 
+        
+        Parameters: 
+        habits (list): The list of habit objects to analyze. 
+        period (int): The period in days to display. The user is asked if None. 
+        """
+        if period is None:
+            import questionary
+
+            period_word = questionary.select("Select the period for which you want to display habits:", choices = manage.PERIODS ).ask()
+            period = manage.PERIOD_MAPPING[period_word]
+        period_word = manage.PERIOD_MAPPING[period]
+
+        display.display_habits(habits, status_request = None, length = "short", filter_period = [period], 
+                               headline =f"\nHere are all habits with a period of '{period_word}'.")
+    
+    @classmethod
+    def completion_rates(cls, habits, bucket = "week", by = "habit", today = None):
+        """ 
+        Computes the completion rate of every habit or category per week or month: the checks of a bucket divided by the 
+        checks its period asks for on the days the habit was tracked in that bucket, at most 100 %. A habit is tracked from 
+        the day of its creation until today or, once it is established, until its last check. 
+        Checks and interruptions are binned from the day numbers of the parsed date lists with integer arithmetic and one 
+        lookup table of the buckets, so no date is parsed again and the cost is O(checks + habits * buckets). 
+        The trend is the slope of the least squares line through the rates, in percentage points per bucket. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        bucket (str): "week" (starting on Monday) or "month". 
+        by (str): "habit" or "category". 
+        today (int): The day ordinal of the last evaluated day, later checks are ignored. Defaults to today. 
+        
+        Returns: 
+        dict: "labels", the names of the buckets (e.g. "2024-W05" or "2024-03"), and "groups", which maps every habit ID 
+              or category to a dict with its "name", the lists "checks", "expected", "interruptions" and "rates" 
+              (None where no check was expected) with one entry per bucket, and the "trend" (None for less than two rates). 
+        """
+        if bucket not in ("week", "month") or by not in ("habit", "category"):
+            raise ValueError(f"Unknown bucket '{bucket}' or grouping '{by}'.")
+        if today is None:
+            today = manage.clock.now().toordinal()
+        habits = [habit for habit in habits if habit.date_create_ordinal <= today]
+        if not habits:
+            return dict(labels=[], groups={})
+
+        starts = cls.get_bucket_starts(bucket, min(habit.date_create_ordinal for habit in habits), today)
+        first = starts[0]
+        count = len(starts) - 1
+        bucket_of = []  # Position of the bucket of every day from first to today
+        for position in range(count):
+            bucket_of.extend([position] * (min(starts[position + 1], today + 1) - starts[position]))
+        first_seconds = (first - manage.EPOCH_ORDINAL) * manage.DAY
+        days = len(bucket_of)
+
+        groups = {}
+        for habit in habits:
+            key = habit.id if by == "habit" else habit.category
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = dict(name=habit.name if by == "habit" else habit.category, checks=[0] * count, 
+                                           expected=[0.0] * count, interruptions=[0] * count)
+            checks, interruptions = group["checks"], group["interruptions"]
+            last = today
+            for seconds in habit.date_check.numbers:
+                day = (seconds - first_seconds) // manage.DAY
+                if 0 <= day < days:
+                    checks[bucket_of[day]] += 1
+            for day in habit.date_interruptions.numbers:
+                if 0 <= day - first < days:
+                    interruptions[bucket_of[day - first]] += 1
+            expected = group["expected"]
+            start = habit.date_create_ordinal
+            if habit.status == "Established" and len(habit.date_check):
+                # The last check can be older than the habit, e.g. for imported habits, but no expected count is negative
+                last = max(start, min(today, manage.EPOCH_ORDINAL + max(habit.date_check.numbers) // manage.DAY))
+            for position in range(bucket_of[start - first], bucket_of[last - first] + 1):
+                tracked = min(starts[position + 1], last + 1) - max(starts[position], start)
+                expected[position] += tracked / habit.period
+
+        for group in groups.values():
+            group["rates"] = [min(1.0, checks / expected) if expected else None 
+                              for checks, expected in zip(group["checks"], group["expected"])]
+            group["trend"] = cls.get_trend(group["rates"])
+
+        if bucket == "week":
+            labels = ["{}-W{:02d}".format(*date.fromordinal(start).isocalendar()[:2]) for start in starts[:-1]]
+        else:
+            labels = [date.fromordinal(start).strftime("%Y-%m") for start in starts[:-1]]
+        return dict(labels=labels, groups=groups)
+
+    @staticmethod
+    def get_bucket_starts(bucket, first, last):
+        """ 
+        Returns the first day of every week or month from the one of the first day to the one of the last day, 
+        followed by the first day of the next week or month as end of the last bucket. 
+        
+        Parameters: 
+        bucket (str): "week" or "month". 
+        first (int): The day ordinal of the first day. 
+        last (int): The day ordinal of the last day. 
+        
+        Returns: 
+        list: Day ordinals, one more than there are buckets. 
+
+        Used by: analyse.completion_rates()
+        """
+        if bucket == "week":
+            start = first - (first - 1) % 7  # Day ordinal 1 is a Monday
+            return list(range(start, last + 8, 7))
+        year, month = date.fromordinal(first).year, date.fromordinal(first).month
+        starts = []
+        while not starts or starts[-1] <= last:
+            starts.append(date(year, month, 1).toordinal())
+            year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+        return starts
+
+    @staticmethod
+    def get_trend(rates):
+        """ 
+        Returns the slope of the least squares line through the rates, skipping the buckets without a rate. 
+        
+        Parameters: 
+        rates (list): The rates (0 to 1) per bucket, None where no check was expected. 
+        
+        Returns: 
+        float: The change in percentage points per bucket, or None if there are less than two rates. 
+
+        Used by: analyse.completion_rates()
+        """
+        points = [(position, rate * 100) for position, rate in enumerate(rates) if rate is not None]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x, _ in points)
+
+    @classmethod
+    def get_completion_rates(cls, habits, bucket = None, by = None, count = 6):
+        """ 
+        Displays the completion rates of the last weeks or months per habit or per category, with their trend. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        bucket (str): "week" or "month". The user is asked if None. 
+        by (str): "habit" or "category". The user is asked if None. 
+        count (int): The number of the most recent buckets to display. 
+        
+        Returns: 
+        dict: The completion rates, see completion_rates(). 
+        """
+        if bucket is None or by is None:
+            import questionary
+
+            bucket = bucket or questionary.select("Should the rates be per week or per month?", choices=["week", "month"]).ask()
+            by = by or questionary.select("Should the rates be per habit or per category?", choices=["habit", "category"]).ask()
+        rates = cls.completion_rates(habits, bucket, by)
+        labels = rates["labels"][-count:] if count > 0 else []
+
+        table_data = []
+        for key, group in rates["groups"].items():
+            cells = ["-" if rate is None else f"{rate:.0%}" for rate in group["rates"][len(group["rates"]) - len(labels):]]
+            trend = "-" if group["trend"] is None else f"{group['trend']:+.1f} pp"
+            table_data.append(([key, group["name"]] if by == "habit" else [key]) + cells + [trend])
+        if not table_data:
+            print(f"\nNo results found for this filter.")
+        else:
+            print(f"\nHere are the completion rates per {bucket} of the last {len(labels)} {bucket}s, with the trend in percentage points per {bucket}:")
+            display.print_table(table_data, (["ID", "Name"] if by == "habit" else ["Category"]) + labels + ["Trend"])
+        return rates
+
+    @staticmethod
+    def choose_order():
+        """ 
+        Allows the user to choose the order (ascending or descending) for sorting. 
+        
+        Returns: 
+        bool: True if descending, False if ascending. 
+
+        Used by:
+        analyse.get_top_main()
+        """
+        import questionary
+
+        choice = questionary.select(f"\nShould the list be in ascending or descending order?",choices=["ascending", "descending"]).ask()
+        order = {"descending": True ,"ascending" : False}[choice]
         return order
\ No newline at end of file
@@ -0,0 +1,356 @@
+"""
+Non-interactive command line for scripts, cron jobs and hooks:
+
+    python cli.py check 1 4
+    python cli.py add "Read Book" --category Education --period 2 --target 28
+    python cli.py list --all
+    python cli.py filter streak ">" 3
+    python cli.py query "category in {Sport, Health} and streak > 5 and name contains 'run'"
+    python cli.py analyse category
+    python cli.py verify --repair
+    python cli.py export --format csv --output habits.csv
+
+Nothing is done at import time and the modules behind each command are only imported when the command runs,
+so a call starts without questionary and only the table commands load tabulate.
+"""
+import argparse
+import sys
+
+ANALYSES = ["tracked", "period", "streak-max", "habit", "active", "interruptions", "checks", "expired", "category", "completion"]
+COMPARISONS = ["=", ">", "<"]
+FILTER_ATTRIBUTES = {"id": "id", "name": "name", "category": "category", "period": "period", "target": "target",
+                     "streak": "streak", "max-streak": "streak_max", "created-on": "date_create", "deadline": "deadline", "status": "status"}
+
+def load(args):
+    """
+    Loads the habits and updates the status of all due habits, like the interactive start.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the habits file.
+
+    Returns:
+    tuple: The store and the HabitCollection.
+    """
+    from manage import Habit
+    from store import JournaledHabitsStore
+
+    habits_store = JournaledHabitsStore()
+    habits = habits_store.load(args.file, lazy=True)
+    Habit.update(habits)
+    return habits_store, habits
+
+def check(args):
+    """
+    Checks the given habits now or at the given time and saves them once.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the IDs and the optional time.
+
+    Returns:
+    int: The exit code, 1 if one of the IDs is unknown, 2 if the time is invalid.
+    """
+    from manage import Habit
+
+    habits_store, habits = load(args)
+    checks = [(habit_id, args.at) if args.at else habit_id for habit_id in args.ids]
+    try:
+        result = Habit.check_batch(habits, checks)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    habits_store.save(habits, args.file)
+
+    for habit_id in result["checked"]:
+        habit = habits.get(habit_id)
+        print(f"{habit.id}\t{habit.name}\tstreak {habit.streak}/{habit.target}\t{habit.status}\tnext deadline {habit.deadline}")
+    for habit_id in result["skipped"]:
+        print(f"{habit_id}\talready established, not checked")
+    for habit_id in result["unknown"]:
+        print(f"{habit_id}\tunknown habit ID", file=sys.stderr)
+    return 1 if result["unknown"] else 0
+
+def add(args):
+    """
+    Adds a new habit without any prompt.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with name, category, period and target.
+
+    Returns:
+    int: The exit code, 2 if one of the values is invalid.
+    """
+    from manage import Habit
+
+    habits_store, habits = load(args)
+    try:
+        habit = Habit.create(habits, args.name, args.category, args.period, args.target)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    habits_store.save(habits, args.file)
+    print(f"{habit.id}\t{habit.name}")
+    return 0
+
+def list_habits(args):
+    """
+    Displays the habits, by default all active and broken ones.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the level of detail and the period filter.
+
+    Returns:
+    int: The exit code.
+    """
+    import display
+
+    _, habits = load(args)
+    display.display_habits(habits, status_request = None if args.all else "Established", length = "full" if args.full else "short",
+                           filter_period = args.period or [1, 2, 7], headline = "", page_size = args.page_size or display.PAGE_SIZE)
+    return 0
+
+def filter_habits(args):
+    """
+    Displays the habits which match one filter, e.g. "streak > 3", "name read" or "category Health Sport".
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the attribute and the values.
+
+    Returns:
+    int: The exit code, 2 if the values do not fit the attribute.
+    """
+    from datetime import datetime
+
+    attribute = FILTER_ATTRIBUTES[args.attribute]
+    values = args.values
+    comp_symbol = None
+    try:
+        if attribute in ["id", "target", "streak", "streak_max", "date_create", "deadline"]:
+            if len(values) != 2 or values[0] not in COMPARISONS:
+                raise ValueError(f"{args.attribute} needs a comparison ({', '.join(COMPARISONS)}) and one value.")
+            comp_symbol = values[0]
+            if attribute in ["date_create", "deadline"]:
+                value = datetime.strptime(values[1], "%Y-%m-%d")
+            else:
+                value = int(values[1])
+        elif attribute == "name":
+            value = " ".join(values).lower()
+        elif attribute == "period":
+            value = [int(v) for v in values]
+        else:
+            value = values
+    except ValueError as error:
+        print(f"Invalid filter: {error}", file=sys.stderr)
+        return 2
+
+    import display
+
+    _, habits = load(args)
+    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked", "Deadline", "Status", "Interruptions"]
+    display.print_pages((display.get_row(habit) for habit in display.select_habits(habits, attribute, value, comp_symbol)), header)
+    return 0
+
+def query(args):
+    """
+    Displays the habits which match a compound query, e.g. "category in {Sport, Health} and streak > 5".
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the text of the query.
+
+    Returns:
+    int: The exit code, 2 if the query is invalid.
+    """
+    from query import Query
+
+    try:
+        compiled = Query.parse(" ".join(args.text))
+    except ValueError as error:
+        print(f"Invalid query: {error}", file=sys.stderr)
+        return 2
+
+    import display
+
+    _, habits = load(args)
+    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked", "Deadline", "Status", "Interruptions"]
+    display.print_pages((display.get_row(habit) for habit in compiled.run(habits)), header)
+    return 0
+
+def analyse(args):
+    """
+    Runs one of the analyses of the "Analyse" menu without any prompt.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the name of the analysis and its options.
+
+    Returns:
+    int: The exit code, 2 if an option of the analysis is missing.
+    """
+    from analyse import Analyse
+    import display
+
+    _, habits = load(args)
+    if args.report == "tracked":
+        display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], headline = "")
+    elif args.report == "period":
+        if args.period is None:
+            print("The analysis 'period' needs --period.", file=sys.stderr)
+            return 2
+        Analyse.get_habits_by_period(habits, period = args.period)
+    elif args.report == "streak-max":
+        Analyse.get_top_main(habits, attribute = "streak_max", designation = "Max Streak", order = not args.ascending)
+    elif args.report == "habit":
+        if args.id is None:
+            print("The analysis 'habit' needs --id.", file=sys.stderr)
+            return 2
+        Analyse.get_habit_streak_max(habits, habit_id = args.id)
+    elif args.report == "active":
+        Analyse.get_top_main(habits, attribute = "streak", designation = "Streak", order = not args.ascending)
+    elif args.report == "interruptions":
+        Analyse.get_top_most(habits, attribute = "date_interruptions", designation = "interruptions", k = args.top)
+    elif args.report == "checks":
+        Analyse.get_top_most(habits, attribute = "date_check", designation = "checks", k = args.top)
+    elif args.report == "expired":
+        Analyse.get_top_longest_expired(habits, k = args.top)
+    elif args.report == "category":
+        Analyse.get_group_habits_by_category(habits)
+    elif args.report == "completion":
+        Analyse.get_completion_rates(habits, bucket = args.bucket, by = args.by, count = args.top)
+    return 0
+
+def verify(args):
+    """
+    Recomputes streaks, status and interruptions from the checks and prints all stored values which disagree.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the optional IDs and the repair switch.
+
+    Returns:
+    int: The exit code, 1 if disagreements were found and not repaired.
+    """
+    import streaks
+
+    habits_store, habits = load(args)
+    disagreements = streaks.verify(habits, ids = args.ids or None, repair = args.repair)
+    for habit_id, field, stored, derived in disagreements:
+        print(f"{habit_id}\t{field}\tstored {stored}\tderived {derived}")
+    if args.repair:
+        habits_store.save(habits, args.file)
+        print(f"{len(disagreements)} values repaired.")
+        return 0
+    return 1 if disagreements else 0
+
+def export(args):
+    """
+    Exports all habits as JSON or CSV to stdout or a file, or as binary file.
+
+    Parameters:
+    args (argparse.Namespace): The parsed arguments with the format and the output file.
+
+    Returns:
+    int: The exit code, 2 if the binary format is requested without output file.
+    """
+    import manage
+    from store import HabitsStore
+
+    if args.format == "binary" and args.output is None:
+        print("The binary format needs --output.", file=sys.stderr)
+        return 2
+
+    _, habits = load(args)
+    if args.format == "binary":
+        HabitsStore(binary=True).save(habits, args.output)
+        return 0
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            import json
+            json.dump([habit.to_dict() for habit in habits], output, indent=4)
+            output.write("\n")
+        else:
+            import csv
+            writer = csv.writer(output)
+            writer.writerow(manage.FIELDS)
+            for habit in habits:
+                data = habit.to_dict()
+                writer.writerow([";".join(data[field]) if field in manage.LIST_FIELDS else data[field] for field in manage.FIELDS])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+def get_parser():
+    """
+    Builds the parser for all commands.
+
+    Returns:
+    argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog="cli.py", description="Habit Tracker without prompts.")
+    parser.add_argument("--file", default="habits.json", help="the habits file (default: habits.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("check", help="check one or several habits")
+    command.add_argument("ids", type=int, nargs="+", metavar="ID")
+    command.add_argument("--at", help="the time of the check (YYYY-MM-DD HH:MM:SS), default: now")
+    command.set_defaults(function=check)
+
+    command = commands.add_parser("add", help="add a new habit")
+    command.add_argument("name")
+    command.add_argument("--category", required=True)
+    command.add_argument("--period", type=int, required=True, choices=[1, 2, 7], help="days")
+    command.add_argument("--target", type=int, required=True)
+    command.set_defaults(function=add)
+
+    command = commands.add_parser("list", help="display the active and broken habits")
+    command.add_argument("--all", action="store_true", help="include established habits")
+    command.add_argument("--full", action="store_true", help="display all columns")
+    command.add_argument("--period", type=int, action="append", choices=[1, 2, 7], help="days, can be repeated")
+    command.add_argument("--page-size", type=int, help="habits per table (default: 50)")
+    command.set_defaults(function=list_habits)
+
+    command = commands.add_parser("filter", help="display the habits which match a filter")
+    command.add_argument("attribute", choices=list(FILTER_ATTRIBUTES))
+    command.add_argument("values", nargs="+", help="comparison and value, text or allowed values")
+    command.set_defaults(function=filter_habits)
+
+    command = commands.add_parser("query", help="display the habits which match several conditions")
+    command.add_argument("text", nargs="+", help="conditions joined by 'and', e.g. \"category in {Sport, Health} and streak > 5\"")
+    command.set_defaults(function=query)
+
+    command = commands.add_parser("analyse", help="run an analysis")
+    command.add_argument("report", choices=ANALYSES)
+    command.add_argument("--period", type=int, choices=[1, 2, 7], help="days, for 'period'")
+    command.add_argument("--id", type=int, help="habit ID, for 'habit'")
+    command.add_argument("--ascending", action="store_true", help="for 'streak-max' and 'active'")
+    command.add_argument("--top", type=int, default=3, help="number of habits for 'interruptions', 'checks' and 'expired', "
+                                                            "of weeks or months for 'completion' (default: 3)")
+    command.add_argument("--bucket", choices=["week", "month"], default="week", help="for 'completion' (default: week)")
+    command.add_argument("--by", choices=["habit", "category"], default="habit", help="for 'completion' (default: habit)")
+    command.set_defaults(function=analyse)
+
+    command = commands.add_parser("verify", help="recompute streaks, status and interruptions from the checks")
+    command.add_argument("ids", type=int, nargs="*", metavar="ID", help="default: all habits")
+    command.add_argument("--repair", action="store_true", help="replace the stored values which disagree")
+    command.set_defaults(function=verify)
+
+    command = commands.add_parser("export", help="export all habits")
+    command.add_argument("--format", choices=["json", "csv", "binary"], default="json")
+    command.add_argument("--output", help="the output file, default: stdout")
+    command.set_defaults(function=export)
+    return parser
+
+def main(argv = None):
+    """
+    Runs one command.
+
+    Parameters:
+    argv (list): The arguments, defaults to the arguments of the program.
+
+    Returns:
+    int: The exit code.
+    """
+    args = get_parser().parse_args(argv)
+    return args.function(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
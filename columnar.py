@@ -0,0 +1,202 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the engine is only available if it is installed
+    np = None
+
+import manage
+
+ACTIVE, BROKEN, ESTABLISHED = [manage.STATUS_LIST.index(status) for status in ["Active", "Broken", "Established"]]
+OTHER = len(manage.STATUS_LIST)  # Code of statuses which are not part of STATUS_LIST
+
+class HabitColumns:
+    """ 
+    A columnar snapshot of habits: the attributes needed for bulk operations are held as NumPy arrays, 
+    one entry per habit in the order of the collection. 
+    Used to apply Habit.update() to many habits at once with array operations instead of a loop over the objects. 
+    """
+    def __init__(self, habits):
+        """ 
+        Initializes a HabitColumns object. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to put into columns. 
+        """
+        if np is None:
+            raise ImportError("The columnar engine needs NumPy. Install it with 'pip install numpy'.")
+        self.habits = list(habits)
+        count = len(self.habits)
+        self.ids = np.fromiter((habit.id for habit in self.habits), dtype=np.int64, count=count)
+        self.periods = np.fromiter((habit.period for habit in self.habits), dtype=np.int64, count=count)
+        self.streaks = np.fromiter((habit.streak for habit in self.habits), dtype=np.int64, count=count)
+        self.deadlines = np.fromiter((habit.deadline_ordinal for habit in self.habits), dtype=np.int64, count=count)
+        status_codes = {status: code for code, status in enumerate(manage.STATUS_LIST)}
+        self.statuses = np.fromiter((status_codes.get(habit.status, OTHER) for habit in self.habits), dtype=np.int8, count=count)
+
+    def update(self, today):
+        """ 
+        Applies the rules of Habit.update() to the columns: habits with a passed deadline break and lose their streak, 
+        broken habits which were checked in time again become active and their deadline is rolled forward. 
+        
+        Parameters: 
+        today (int): The day ordinal of today. 
+        
+        Returns: 
+        tuple: The positions of the broken habits, of the broken habits which need a new interruption 
+               and of the reactivated habits. 
+        """
+        open_habits = self.statuses != ESTABLISHED
+        broken = np.flatnonzero(open_habits & (self.deadlines < today))
+        activated = np.flatnonzero(open_habits & (self.deadlines >= today) & (self.statuses == BROKEN))
+
+        self.statuses[broken] = BROKEN
+        self.streaks[broken] = 0
+        last_interruptions = np.fromiter((max(self.habits[position].date_interruptions.numbers, default=-1) for position in broken), 
+                                         dtype=np.int64, count=len(broken))
+        interrupted = broken[last_interruptions != today]
+
+        self.statuses[activated] = ACTIVE
+        self.deadlines[activated] = today + self.periods[activated]
+        return broken, interrupted, activated
+
+    def write_back(self, habits, broken, interrupted, activated, today):
+        """ 
+        Writes the results of update() back to the changed Habit objects and informs the collection about 
+        every change, so journal, dirty flags and indexes stay the same as with Habit.update(). 
+        
+        Parameters: 
+        habits (HabitCollection): The collection the columns were built from. 
+        broken, interrupted, activated (ndarray): The positions returned by update(). 
+        today (int): The day ordinal of today. 
+        """
+        interrupted = set(interrupted.tolist())
+        for position in broken.tolist():
+            habit = self.habits[position]
+            changed = habit.status != "Broken" or habit.streak != 0
+            habit.status = "Broken"
+            habit.streak = 0
+            if position in interrupted:
+                habit.date_interruptions.numbers.append(today)
+                habits.notify("interrupt", habit, dict(status=habit.status, streak=habit.streak, date_interruptions=habit.date_interruptions[-1]))
+            elif changed:
+                habits.notify("update", habit, dict(status=habit.status, streak=habit.streak))
+        for position in activated.tolist():
+            habit = self.habits[position]
+            habit.status = "Active"
+            habit.deadline_ordinal = int(self.deadlines[position])
+            habits.notify("update", habit, dict(status=habit.status, deadline=habit.deadline))
+
+def update(habits, today = None):
+    """ 
+    Vectorized version of Habit.update() for large collections, e.g. in nightly batch runs. 
+    The results are identical to Habit.update(). 
+    
+    Parameters: 
+    habits (HabitCollection): The collection of current habits. 
+    today (int): The day ordinal of today. Defaults to the date of manage.clock. 
+    
+    Returns: 
+    int: The number of changed habits. 
+    """
+    today = today or manage.clock.now().toordinal()
+    columns = HabitColumns(habits)
+    broken, interrupted, activated = columns.update(today)
+    columns.write_back(habits, broken, interrupted, activated, today)
+    return len(broken) + len(activated)
+
+class HabitSnapshot(HabitColumns):
+    """ 
+    A columnar snapshot for the analyses: besides the columns of HabitColumns it holds max streaks, 
+    the number of checks and interruptions and the category of every habit. 
+    It is built once and kept by the collection until a habit changes, see snapshot(). 
+    """
+    def __init__(self, habits):
+        """ 
+        Initializes a HabitSnapshot object. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to put into columns. 
+        """
+        super().__init__(habits)
+        count = len(self.habits)
+        self.streak_maxes = np.fromiter((habit.streak_max for habit in self.habits), dtype=np.int64, count=count)
+        self.checks = np.fromiter((len(habit.date_check) for habit in self.habits), dtype=np.int64, count=count)
+        self.interruptions = np.fromiter((len(habit.date_interruptions) for habit in self.habits), dtype=np.int64, count=count)
+        category_codes = {category: code for code, category in enumerate(manage.CATEGORIES)}
+        self.categories = np.fromiter((category_codes.get(habit.category, len(manage.CATEGORIES)) for habit in self.habits), 
+                                      dtype=np.int8, count=count)
+
+    @staticmethod
+    def code(status):
+        """ 
+        Returns: 
+        int: The code of a status in the status column. 
+        """
+        return manage.STATUS_LIST.index(status) if status in manage.STATUS_LIST else OTHER
+
+    def column(self, attribute):
+        """ 
+        Returns the column of an attribute. For "date_check" and "date_interruptions" it holds the number of dates. 
+        
+        Parameters: 
+        attribute (str): "streak", "streak_max", "date_check", "date_interruptions" or "deadline". 
+        
+        Returns: 
+        ndarray: The values of all habits. 
+        """
+        return {"streak": self.streaks, "streak_max": self.streak_maxes, "date_check": self.checks, 
+                "date_interruptions": self.interruptions, "deadline": self.deadlines}[attribute]
+
+    def ranked(self, values, descending = True, mask = None, k = None):
+        """ 
+        Returns the positions of the habits ordered by a column. Habits with the same value keep the order 
+        of the collection, as with a stable sort. If only the first k are needed, they are selected with a 
+        partition first, so only the candidates are sorted. 
+        
+        Parameters: 
+        values (ndarray): The column to order by. 
+        descending (bool): If True, the largest values come first. 
+        mask (ndarray): Boolean column of the habits to consider. All habits if None. 
+        k (int): The number of positions to return. All if None. 
+        
+        Returns: 
+        ndarray: The positions of the habits. 
+        """
+        positions = np.arange(len(values)) if mask is None else np.flatnonzero(mask)
+        keys = -values[positions] if descending else values[positions]
+        if k is not None:
+            if k <= 0:
+                return positions[:0]
+            if k < len(keys):
+                bound = np.partition(keys, k - 1)[k - 1]
+                candidates = np.flatnonzero(keys <= bound)  # Includes all habits tied with the k-th one
+                positions, keys = positions[candidates], keys[candidates]
+        return positions[np.argsort(keys, kind="stable")][:k]
+
+    def select(self, mask):
+        """ 
+        Returns the habits of a boolean column in the order of the collection. 
+        
+        Parameters: 
+        mask (ndarray): Boolean column of the habits to return. 
+        
+        Returns: 
+        list: The habits. 
+        """
+        return [self.habits[position] for position in np.flatnonzero(mask).tolist()]
+
+def snapshot(habits):
+    """ 
+    Returns the columnar snapshot of a collection. It is built on first use and kept by the collection, 
+    which drops it as soon as a habit is added, changed or removed. 
+    
+    Parameters: 
+    habits (HabitCollection): The collection of current habits. 
+    
+    Returns: 
+    HabitSnapshot: The snapshot, or None if NumPy is not installed. 
+    """
+    if np is None:
+        return None
+    if habits.snapshot is None:
+        habits.snapshot = HabitSnapshot(habits)
+    return habits.snapshot
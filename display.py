@@ -1,186 +1,259 @@
-from datetime import datetime, timedelta
-
-from tabulate import tabulate
-
-import manage
-from manage import Habit
-import questionary
-
-def display_habits(habits, status_request, length, filter_period, headline):
-    """ 
-    Displays habits in a formatted table. 
-    
-    Parameters: 
-    habits (list): The list of habit objects to display. 
-    status_request (str): The status of habits NOT to display. Displays habits with different statuses if None. 
-    length (str): The level of detail for the table. Options are "full" or any other string for a shorter version.
-    filter_period (list): List of periods which shall be displayed
-    """
-    if Habit.check_habits_exist(habits):
-        return
-    
-    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked",  "Deadline", "Status", "Interruptions"]
-
-    if length != "full":
-        header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Last Checked", "Deadline", "Status"]
-    
-    table_data = []
-
-    for habit in habits:
-        latest_check_date = max(habit.date_check, default="N/A")
-        no_interruptions = len(habit.date_interruptions)
-        period_word = manage.PERIOD_MAPPING[habit.period]
-
-        if habit.status != status_request and habit.period in filter_period:
-            
-            row = [habit.id, habit.name, habit.category, period_word, habit.target, habit.streak, habit.streak_max, habit.date_create, latest_check_date, habit.deadline, habit.status, no_interruptions]
-            if length != "full":
-                row = [habit.id, habit.name, habit.category, period_word, habit.target, habit.streak, latest_check_date, habit.deadline, habit.status]
-         
-            table_data.append(row)
-    print(f"\n{headline}")
-    print(tabulate(table_data, headers=header, tablefmt="github"))
-
-def enter_filter (choices, attribute):
-    """ 
-    Prompts user to select filter values for a specified attribute. 
-    
-    Parameters: 
-    choices (list): A list of choices to filter by depending on attribute to filter.
-    attribute (str): The attribute to filter. 
-    
-    Returns: 
-    list: The selected filter values. 
-    """
-    value = questionary.checkbox("Select at least one value you want to filter for:",choices).ask()
-    print(f"You have chosen {' and '.join(value)}")
-    print(f"Here are the results for all habits with {attribute} {' or '.join(value)}:")
-    return value
-
-def enter_comparison():
-    """ 
-    Prompts user to select a comparison type for numerical filtering. 
-    
-    Returns: 
-    str: The selected comparison symbol ("=", ">", "<"). 
-    """
-    comp_word = questionary.select("For what do you want to filter?",choices=["exact value", "greater values", "smaller values"]).ask() 
-    comp_symbol = {"exact value": "=", "greater values": ">", "smaller values": "<"}[comp_word] 
-    return comp_symbol
-
-def get_match(comp_symbol, value_compare, value): 
-    """ 
-    Determines if a value matches the comparison criteria. 
-    
-    Parameters: 
-    comp_symbol (str): The comparison symbol ("=", ">", "<"). 
-    value_compare (int/float/datetime): The value to compare. 
-    value (int/float/datetime): The target value for comparison. 
-    
-    Returns: 
-    bool: True if the value matches the comparison criteria, otherwise False. 
-    """
-    match = False 
-    if comp_symbol == "=":
-        match = value_compare == value 
-    elif comp_symbol == ">": 
-        match = value_compare > value 
-    elif comp_symbol == "<": 
-        match = value_compare < value 
-    return match 
-
-def filter_habits(habits):
-    """ 
-    Filters and displays habits based on user-selected criteria. 
-
-    Parameters: 
-    habits (list): The list of habit objects to filter and display. 
-    """
-    if Habit.check_habits_exist(habits):
-        return
-    
-    attribute = questionary.select(
-        "Which attribute do you want to filter?",
-        choices=["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Deadline", "Status"]).ask().lower()
-    
-    if attribute in ["id", "target", "streak", "max streak"]: 
-        wording = attribute
-        if attribute == "max streak": 
-            attribute = "streak_max"
-        comp_symbol = enter_comparison() 
-        while True: 
-            try: 
-                value = int(questionary.text(f"The values should be {comp_symbol} ...").ask()) 
-                if value >= 0:
-                    break
-                else: 
-                    print("Invalid input. Please enter a positive integer.") 
-            except ValueError: 
-                print("Invalid input. Please enter a positive integer.")
-
-        print(f"Here are the results for all habits with {wording} {comp_symbol} {value}:")
-
-    elif attribute == "name":
-        value = questionary.text("What should the attribute name contain?").ask().lower()
-        print(f"Here are the results for all habits with a name containing {value}:")
-
-    elif attribute == "status":
-        value = enter_filter (choices=manage.STATUS_LIST, attribute = attribute)
-
-    elif attribute == "category":
-        value = enter_filter (choices=manage.CATEGORIES, attribute = attribute)
-
-    elif attribute == "period":
-        value = enter_filter (choices=manage.PERIODS, attribute = attribute)
-        value = [manage.PERIOD_MAPPING[p] for p in value]
-
-    elif attribute in ["created on", "deadline"]:
-        wording = attribute 
-        if attribute == "created on":
-            attribute = "date_create" 
-        comp_symbol = enter_comparison() 
-        while True: 
-            date_str = questionary.text(f"The values should be {comp_symbol}...(Enter a date in the format YYYY-MM-DD):").ask() 
-            try: 
-                value = datetime.strptime(date_str, '%Y-%m-%d') 
-                break 
-            except ValueError: 
-                print("Incorrect format. Please enter the date in YYYY-MM-DD format.")
-        print(f"Here are the results for all habits with a {wording} value {comp_symbol} {value}:")
-
-    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked", "Deadline", "Status", "Interruptions"]
-    table_data = []
-    
-    for habit in habits:
-  
-        match = False
-        if attribute in ["id", "target", "streak", "streak_max"]:
-            value_compare = getattr(habit, attribute)
-            match = get_match(comp_symbol, value_compare, value)
-
-        elif attribute in ["date_create", "deadline"]: 
-            value_compare = datetime.strptime(getattr(habit, attribute), '%Y-%m-%d')
-            match = get_match(comp_symbol, value_compare, value)
-
-        elif attribute == "name":
-            if value in str(getattr(habit, attribute)).lower():
-                match = True
-
-        elif attribute in ["category", "status"]:
-            if getattr(habit, attribute).lower() in [v.lower() for v in value]:
-                match = True
-
-        elif attribute == "period": 
-            if getattr(habit, attribute) in value:
-                match = True
-
-        if match: 
-            latest_check_date = max(habit.date_check, default="N/A")
-            no_interruptions = len(habit.date_interruptions)
-            period_word = manage.PERIOD_MAPPING[habit.period]
-            
-            row = [habit.id, habit.name, habit.category, period_word, habit.target, habit.streak, habit.streak_max, habit.date_create, latest_check_date, habit.deadline, habit.status, no_interruptions]
-            table_data.append(row)
-    
-    print(tabulate(table_data, headers=header, tablefmt="github"))
-
+from datetime import datetime, timedelta
+
+import manage
+from manage import Habit
+from query import Query
+
+PAGE_SIZE = 50  # Rows per table of display_habits() and filter_habits()
+pause = False  # If True, the user is asked before every further page. Set by main.cli_main(), scripts print all pages
+
+def display_habits(habits, status_request, length, filter_period, headline, page_size = PAGE_SIZE):
+    """ 
+    Displays habits in a formatted table. The habits are filtered first and the rows of the visible habits are built 
+    one page at a time, see print_pages(), so the first page appears at once, also for very many habits. 
+    
+    Parameters: 
+    habits (HabitCollection or list): The habits to display. 
+    status_request (str): The status of habits NOT to display. Displays habits with different statuses if None. 
+    length (str): The level of detail for the table. Options are "full" or any other string for a shorter version.
+    filter_period (list): List of periods which shall be displayed
+    headline (str): The text printed above the table. 
+    page_size (int): The number of habits per page. 
+    """
+    if Habit.check_habits_exist(habits):
+        return
+    
+    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked",  "Deadline", "Status", "Interruptions"]
+
+    if length != "full":
+        header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Last Checked", "Deadline", "Status"]
+
+    # The running counters of a collection tell without a scan whether any habit passes the filter
+    visible = True
+    if isinstance(habits, manage.HabitCollection):
+        visible = sum(habits.counts.count(period=period) for period in set(filter_period))
+        if status_request is not None:
+            visible -= sum(habits.counts.count(status=status_request, period=period) for period in set(filter_period))
+    periods = set(filter_period)
+    rows = (get_row(habit, length) for habit in habits if habit.status != status_request and habit.period in periods)
+    print(f"\n{headline}")
+    print_pages(rows if visible else [], header, page_size)
+
+def print_pages(rows, header, page_size = PAGE_SIZE):
+    """ 
+    Prints rows as tables of page_size rows each. A page is printed as soon as it is complete, so only one page 
+    of rows is held at a time and the rows of later pages are only built when they are shown. 
+    If pause is set, the user is asked before every further page and the rest is skipped on "no". 
+    
+    Parameters: 
+    rows (iterable): The rows of the table, e.g. a generator. 
+    header (list): The column names. 
+    page_size (int): The number of rows per page. 
+
+    Returns: 
+    int: The number of printed rows. 
+
+    Used by: display.display_habits(), display.filter_habits() and cli
+    """
+    page = []
+    printed = 0
+    for row in rows:
+        if len(page) == page_size:
+            print_table(page, header)
+            printed += len(page)
+            page = []
+            if pause:
+                import questionary
+
+                if not questionary.confirm(f"{printed} habits shown. Do you want to see the next {page_size}?", default=True).ask():
+                    return printed
+        page.append(row)
+    if page or not printed:
+        print_table(page, header)
+    return printed + len(page)
+
+def print_table(table_data, header):
+    """ 
+    Prints rows as a table. 
+    tabulate is imported on the first table, so that starting the tracker does not wait for it. 
+    
+    Parameters: 
+    table_data (list): The rows of the table. 
+    header (list): The column names. 
+
+    Used by: display, analyse and cli
+    """
+    from tabulate import tabulate
+
+    print(tabulate(table_data, headers=header, tablefmt="github"))
+
+def get_row(habit, length = "full"):
+    """ 
+    Builds the table row of a habit. 
+    
+    Parameters: 
+    habit (Habit): The habit to display. 
+    length (str): The level of detail for the row. Options are "full" or any other string for a shorter version.
+
+    Returns: 
+    list: The values of the row in the order of the table header. 
+
+    Used by: display.display_habits(), display.filter_habits() and cli.filter_habits()
+    """
+    latest_check_date = habit.date_check.latest(default="N/A")
+    period_word = manage.PERIOD_MAPPING[habit.period]
+    if length != "full":
+        return [habit.id, habit.name, habit.category, period_word, habit.target, habit.streak, latest_check_date, habit.deadline, habit.status]
+    no_interruptions = len(habit.date_interruptions)
+    return [habit.id, habit.name, habit.category, period_word, habit.target, habit.streak, habit.streak_max, habit.date_create, latest_check_date, habit.deadline, habit.status, no_interruptions]
+
+def enter_filter (choices, attribute):
+    """ 
+    Prompts user to select filter values for a specified attribute. 
+    
+    Parameters: 
+    choices (list): A list of choices to filter by depending on attribute to filter.
+    attribute (str): The attribute to filter. 
+    
+    Returns: 
+    list: The selected filter values. 
+    """
+    import questionary
+
+    value = questionary.checkbox("Select at least one value you want to filter for:",choices).ask()
+    print(f"You have chosen {' and '.join(value)}")
+    print(f"Here are the results for all habits with {attribute} {' or '.join(value)}:")
+    return value
+
+def enter_comparison():
+    """ 
+    Prompts user to select a comparison type for numerical filtering. 
+    
+    Returns: 
+    str: The selected comparison symbol ("=", ">", "<"). 
+    """
+    import questionary
+
+    comp_word = questionary.select("For what do you want to filter?",choices=["exact value", "greater values", "smaller values"]).ask() 
+    comp_symbol = {"exact value": "=", "greater values": ">", "smaller values": "<"}[comp_word] 
+    return comp_symbol
+
+def filter_habits(habits):
+    """ 
+    Filters and displays habits based on user-selected criteria. Several attributes can be combined, 
+    either one after the other in the menus or as expression, e.g. "category in {Sport, Health} and streak > 5". 
+
+    Parameters: 
+    habits (list): The list of habit objects to filter and display. 
+    """
+    import questionary
+
+    if Habit.check_habits_exist(habits):
+        return
+    
+    attributes = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Deadline", "Status"]
+    choice = questionary.select("Which attribute do you want to filter?", choices=attributes + ["Several attributes", "Expression"]).ask().lower()
+
+    if choice == "expression":
+        while True:
+            text = questionary.text("Enter the filter, e.g. category in {Sport, Health} and streak > 5 and name contains 'run':").ask()
+            try:
+                query = Query.parse(text)
+                break
+            except ValueError as error:
+                print(f"Invalid filter: {error}")
+        print(f"Here are the results for all habits with {text}:")
+    elif choice == "several attributes":
+        conditions = []
+        while True:
+            attribute = questionary.select("Which attribute do you want to filter?", choices=attributes).ask().lower()
+            conditions.append(enter_condition(attribute))
+            if not questionary.confirm("Do you want to filter for another attribute as well?", default=False).ask():
+                break
+        query = Query(conditions)
+    else:
+        query = Query([enter_condition(choice)])
+
+    header = ["ID", "Name", "Category", "Period", "Target", "Streak", "Max Streak", "Created On", "Last Checked", "Deadline", "Status", "Interruptions"]
+    print_pages((get_row(habit) for habit in query.run(habits)), header)
+
+def enter_condition(attribute):
+    """ 
+    Prompts the user for the comparison and the value of a filter on one attribute. 
+    
+    Parameters: 
+    attribute (str): The attribute as chosen in the menu, in lower case (e.g. "max streak"). 
+    
+    Returns: 
+    tuple: The attribute, the comparison and the value, a condition of query.Query. 
+
+    Used by: display.filter_habits()
+    """
+    import questionary
+
+    comp_symbol = None
+    if attribute in ["id", "target", "streak", "max streak"]: 
+        wording = attribute
+        if attribute == "max streak": 
+            attribute = "streak_max"
+        comp_symbol = enter_comparison() 
+        while True: 
+            try: 
+                value = int(questionary.text(f"The values should be {comp_symbol} ...").ask()) 
+                if value >= 0:
+                    break
+                else: 
+                    print("Invalid input. Please enter a positive integer.") 
+            except ValueError: 
+                print("Invalid input. Please enter a positive integer.")
+
+        print(f"Here are the results for all habits with {wording} {comp_symbol} {value}:")
+
+    elif attribute == "name":
+        comp_symbol = "contains"
+        value = questionary.text("What should the attribute name contain?").ask().lower()
+        print(f"Here are the results for all habits with a name containing {value}:")
+
+    elif attribute in ["status", "category", "period"]:
+        comp_symbol = "in"
+        choices = {"status": manage.STATUS_LIST, "category": manage.CATEGORIES, "period": manage.PERIODS}[attribute]
+        value = enter_filter (choices=choices, attribute = attribute)
+        if attribute == "period":
+            value = [manage.PERIOD_MAPPING[p] for p in value]
+
+    elif attribute in ["created on", "deadline"]:
+        wording = attribute 
+        if attribute == "created on":
+            attribute = "date_create" 
+        comp_symbol = enter_comparison() 
+        while True: 
+            date_str = questionary.text(f"The values should be {comp_symbol}...(Enter a date in the format YYYY-MM-DD):").ask() 
+            try: 
+                value = datetime.strptime(date_str, '%Y-%m-%d') 
+                break 
+            except ValueError: 
+                print("Incorrect format. Please enter the date in YYYY-MM-DD format.")
+        print(f"Here are the results for all habits with a {wording} value {comp_symbol} {value}:")
+
+    return (attribute, comp_symbol, value)
+
+def select_habits(habits, attribute, value, comp_symbol = None):
+    """ 
+    Selects the habits which match a filter, without any prompt. The filter is compiled once by query.Query, 
+    which converts the value and compares it with the parsed fields of the habits, so nothing is parsed per habit. 
+    
+    Parameters: 
+    habits (list): The list of habit objects to filter. 
+    attribute (str): The attribute to filter: "id", "target", "streak", "streak_max", "date_create", "deadline", 
+                     "name", "category", "status" or "period". 
+    value: The value to compare with: an int for numbers, a date or datetime (or YYYY-MM-DD) for dates, a string contained 
+           in the name and a list of the allowed values for category, status and period. 
+    comp_symbol (str): The comparison symbol ("=", ">", "<") for numbers and dates. 
+    
+    Returns: 
+    generator: The matching habits. 
+
+    Used by: cli.filter_habits()
+    """
+    comparison = comp_symbol or ("contains" if attribute == "name" else "in")
+    return Query([(attribute, comparison, value)]).run(habits)
@@ -0,0 +1,205 @@
+"""
+Reports across many users: runs the analyses over a directory with one habits file per user, in parallel processes.
+
+    python fleet.py users/ --top 10 --workers 8
+
+Every worker loads one file at a time, updates its habits like the start of the tracker (without saving them)
+and reduces them to a partial result: the top habits per report and the habits per category and status.
+The partial results of all files are merged into the fleet-wide report, so no process ever holds the habits of all users.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import heapq
+import os
+import time
+
+from analyse import Analyse
+import display
+from manage import CATEGORIES, Habit
+from store import JournaledHabitsStore
+
+REPORTS = {"streak_max": "Max Streak", "streak": "Streak", "date_interruptions": "Interruptions"}
+
+def find_files(directory):
+    """
+    Returns the habits files of a directory and its subdirectories, e.g. "users/alice/habits.json".
+    Journals (".json.journal") belong to their file and are not listed.
+
+    Parameters:
+    directory (str): The directory with the habits files.
+
+    Returns:
+    list: The paths of the files, sorted.
+    """
+    return sorted(os.path.join(root, name) for root, _, names in os.walk(directory) for name in names if name.endswith(".json"))
+
+def empty_result():
+    """
+    Returns:
+    dict: A result without any user, see analyse_file().
+    """
+    return dict(users=0, habits=0, top={report: [] for report in REPORTS}, categories={}, errors=[])
+
+def ranking_key(entry):
+    """
+    Orders entries of the top lists by value (largest first), then by user and habit ID,
+    so the merged lists do not depend on the order in which the workers finish.
+
+    Used by: fleet.merge()
+    """
+    value, user, habit_id = entry[:3]
+    return (-value, user, habit_id)
+
+def analyse_file(path, directory, k):
+    """
+    Loads the habits of one user, updates them and reduces them to a partial result.
+    The journal of the file is replayed, but nothing is written back.
+
+    Parameters:
+    path (str): The habits file.
+    directory (str): The directory of all files. The user is the path of the file relative to it.
+    k (int): The number of habits to keep per report.
+
+    Returns:
+    dict: "users" and "habits" (numbers), "top" (report -> list of (value, user, habit ID, name, status)),
+          "categories" ((category, status) -> number of habits) and "errors" (list of (user, message)).
+    """
+    user = os.path.relpath(path, directory)
+    result = empty_result()
+    store = JournaledHabitsStore()
+    try:
+        habits = store.load(path, lazy=True)
+        Habit.update(habits)
+    except (OSError, ValueError, TypeError, KeyError) as error:
+        result["errors"].append((user, str(error) or type(error).__name__))
+        return result
+    finally:
+        store.close()
+
+    result["users"] = 1
+    result["habits"] = len(habits)
+    for report in REPORTS:
+        if report == "date_interruptions":
+            top = Analyse.top_k(habits, key=lambda habit: len(habit.date_interruptions), k=k)
+        else:
+            top = Analyse.top_k(habits, key=lambda habit, report=report: getattr(habit, report), k=k)
+        result["top"][report] = [(value, user, habit.id, habit.name, habit.status) for value, habit in top if value > 0]
+    for category in CATEGORIES:
+        for status, number in habits.counts.by_status(category).items():
+            result["categories"][(category, status)] = number
+    return result
+
+def analyse_chunk(paths, directory, k):
+    """
+    Analyses a chunk of files one after the other in a worker process and merges their results,
+    so only one partial result per chunk is sent back.
+
+    Parameters:
+    paths (list): The habits files of the chunk.
+    directory (str): The directory of all files.
+    k (int): The number of habits to keep per report.
+
+    Returns:
+    dict: The merged result of the files, see analyse_file().
+    """
+    result = empty_result()
+    for path in paths:
+        merge(result, analyse_file(path, directory, k), k)
+    return result
+
+def merge(result, partial, k):
+    """
+    Adds a partial result to a result: numbers and counters are summed, the top lists are merged
+    with a heap selection and cut to k entries.
+
+    Parameters:
+    result (dict): The result, changed in place.
+    partial (dict): The result of other files.
+    k (int): The number of habits to keep per report.
+
+    Returns:
+    dict: The result.
+    """
+    result["users"] += partial["users"]
+    result["habits"] += partial["habits"]
+    for report, entries in partial["top"].items():
+        result["top"][report] = heapq.nsmallest(k, result["top"][report] + entries, key=ranking_key)
+    for key, number in partial["categories"].items():
+        result["categories"][key] = result["categories"].get(key, 0) + number
+    result["errors"].extend(partial["errors"])
+    return result
+
+def run(directory, k = 3, workers = None, chunk_size = None):
+    """
+    Analyses all habits files of a directory with a pool of worker processes.
+    The files are split into chunks, each chunk is analysed by one worker and the results are merged
+    as soon as a chunk is done.
+
+    Parameters:
+    directory (str): The directory with the habits files.
+    k (int): The number of habits per report.
+    workers (int): The number of processes. Defaults to the number of CPUs.
+    chunk_size (int): The number of files per chunk. Defaults to about four chunks per worker, at most 64 files.
+
+    Returns:
+    dict: The fleet-wide result, see analyse_file(). The errors are sorted by user.
+    """
+    paths = find_files(directory)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, min(64, -(-len(paths) // (workers * 4))))
+    chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+
+    result = empty_result()
+    if chunks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = [executor.submit(analyse_chunk, chunk, directory, k) for chunk in chunks]
+            for future in as_completed(futures):
+                merge(result, future.result(), k)
+    result["errors"].sort()
+    return result
+
+def report(result, k):
+    """
+    Prints the fleet-wide result as tables.
+
+    Parameters:
+    result (dict): The result of run().
+    k (int): The number of habits per report.
+    """
+    print(f"\n{result['users']} users with {result['habits']} habits.")
+    for attribute, designation in REPORTS.items():
+        table_data = [[user, habit_id, name, value, status] for value, user, habit_id, name, status in result["top"][attribute]]
+        if table_data:
+            print(f"\nTop {k} habits by {designation.lower()}:")
+            display.print_table(table_data, ["User", "ID", "Name", designation, "Status"])
+
+    statuses = ["Active", "Broken", "Established"]
+    table_data = [[category, sum(number for (habit_category, _), number in result["categories"].items() if habit_category == category)]
+                  + [result["categories"].get((category, status), 0) for status in statuses] for category in CATEGORIES]
+    print(f"\nHabits of all users by category:")
+    display.print_table(table_data, ["Category", "Total"] + statuses)
+
+    for user, message in result["errors"]:
+        print(f"Skipped {user}: {message}")
+
+def main(argv = None):
+    """
+    Runs the fleet-wide analyses with the given arguments and prints the result.
+
+    Parameters:
+    argv (list): The arguments, defaults to the arguments of the program.
+    """
+    parser = argparse.ArgumentParser(prog="fleet.py", description="Analyses the habits files of many users.")
+    parser.add_argument("directory", help="directory with one habits file per user, searched recursively")
+    parser.add_argument("--top", type=int, default=3, help="number of habits per report (default: 3)")
+    parser.add_argument("--workers", type=int, help="number of processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, help="files per task (default: about four tasks per process)")
+    args = parser.parse_args(argv)
+
+    moment = time.perf_counter()
+    result = run(args.directory, args.top, args.workers, args.chunk_size)
+    report(result, args.top)
+    print(f"\nAnalysed {result['users'] + len(result['errors'])} files in {time.perf_counter() - moment:.1f} s.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+from bisect import bisect_left, insort
+from collections import Counter
+import heapq
+from itertools import chain
+
+class DeadlineIndex:
+    """ 
+    A min-heap of the deadlines of all habits which are not established yet, used by Habit.update() to find the due habits. 
+    Building the heap reads every habit once and costs O(n). It is built on first use, i.e. once per start of the tracker, 
+    so only the updates after it and repeated calls in the same session cost O(k log n) for k due habits. 
+    Entries are not removed when a deadline changes. Outdated entries are skipped when they reach the top of the heap. 
+    """
+    def __init__(self, habits):
+        """ 
+        Initializes a DeadlineIndex object. The heap itself is built on first use. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habits to index. 
+        """
+        self.habits = habits
+        self.heap = None  # (deadline ordinal, habit ID)
+        self.pending = set()  # IDs of broken habits which might have to become active again
+
+    def build(self):
+        """ 
+        Builds the heap from all habits of the collection which are not established. Costs O(n). 
+        """
+        self.heap = [(habit.deadline_ordinal, habit.id) for habit in self.habits if habit.status != "Established"]
+        heapq.heapify(self.heap)
+        self.pending = {habit.id for habit in self.habits if habit.status == "Broken"}
+
+    def push(self, habit):
+        """ 
+        Adds the current deadline of a habit to the index. Called by the collection for every changed habit. 
+        
+        Parameters: 
+        habit (Habit): The changed habit. 
+        """
+        if self.heap is None:
+            return
+        if habit.status != "Established":
+            heapq.heappush(self.heap, (habit.deadline_ordinal, habit.id))
+        if habit.status == "Broken":
+            self.pending.add(habit.id)
+        if len(self.heap) > 2 * len(self.habits) + 64:  # Too many outdated entries
+            self.build()
+
+    def due(self, today):
+        """ 
+        Removes and returns all habits which have to be updated: habits whose deadline has passed 
+        and broken habits which were checked in time again. Established habits are skipped. 
+        Costs O(k log n) for k due habits once the heap is built, the first call also builds it. 
+        
+        Parameters: 
+        today (int): The day ordinal of today. 
+        
+        Returns: 
+        list: The habits to update, each habit once. 
+        """
+        if self.heap is None:
+            self.build()
+
+        due_habits = {}
+        while self.heap and self.heap[0][0] < today:
+            deadline, habit_id = heapq.heappop(self.heap)
+            habit = self.habits.get(habit_id)
+            if habit is not None and habit.deadline_ordinal == deadline and habit.status != "Established":
+                due_habits[habit_id] = habit
+
+        for habit_id in self.pending:
+            habit = self.habits.get(habit_id)
+            if habit is not None and habit.status == "Broken" and habit.deadline_ordinal >= today:
+                due_habits[habit_id] = habit
+        self.pending = {habit_id for habit_id in self.pending if habit_id not in due_habits}
+        return list(due_habits.values())
+
+class HabitCounts:
+    """ 
+    Running counters of the habits per category, status and period, a materialized view used by 
+    Analyse.get_group_habits_by_category(), display.display_habits() and query.Query, which also reads the IDs of the 
+    habits counted under each key. 
+    Built by one pass over the collection on first use and afterwards kept up to date from the changes the collection 
+    is informed about, so reading it never needs to look at the habits again. 
+    """
+    def __init__(self, habits):
+        """ 
+        Initializes a HabitCounts object. The counters themselves are built on first use. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habits to count. 
+        """
+        self.habits = habits
+        self.counts = None  # (category, status, period) -> number of habits
+        self.keys = {}  # Habit ID -> (category, status, period) under which the habit is counted
+        self.members = {}  # (category, status, period) -> IDs of the habits
+
+    @staticmethod
+    def key(habit):
+        """ 
+        Returns: 
+        tuple: The category, status and period under which a habit is counted. 
+        """
+        return (habit.category, habit.status, habit.period)
+
+    def build(self):
+        """ 
+        Counts all habits of the collection. 
+        """
+        self.counts = {}
+        self.keys = {}
+        self.members = {}
+        for habit in self.habits:
+            self.add(habit)
+
+    def add(self, habit):
+        """ 
+        Counts a habit which was added to the collection. 
+        
+        Parameters: 
+        habit (Habit): The added habit. 
+        """
+        if self.counts is None:
+            return
+        key = self.key(habit)
+        self.keys[habit.id] = key
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.members.setdefault(key, set()).add(habit.id)
+
+    def discard(self, habit):
+        """ 
+        Stops counting a habit which was removed from the collection. 
+        
+        Parameters: 
+        habit (Habit): The removed habit. 
+        """
+        if self.counts is None or habit.id not in self.keys:
+            return
+        key = self.keys.pop(habit.id)
+        self.counts[key] -= 1
+        self.members[key].discard(habit.id)
+        if self.counts[key] == 0:
+            del self.counts[key]
+            del self.members[key]
+
+    def update(self, habit):
+        """ 
+        Moves a changed habit to its current category, status and period. Called by the collection for every changed habit. 
+        
+        Parameters: 
+        habit (Habit): The changed habit. 
+        """
+        if self.counts is not None and self.keys.get(habit.id) != self.key(habit):
+            self.discard(habit)
+            self.add(habit)
+
+    def count(self, category = None, status = None, period = None):
+        """ 
+        Returns the number of habits with the given category, status and period. 
+        Costs O(categories * statuses * periods), independent of the number of habits. 
+        
+        Parameters: 
+        category (str): The category, all categories if None. 
+        status (str): The status, all statuses if None. 
+        period (int): The period, all periods if None. 
+        
+        Returns: 
+        int: The number of habits. 
+        """
+        if self.counts is None:
+            self.build()
+        return sum(number for (habit_category, habit_status, habit_period), number in self.counts.items() 
+                   if category in (None, habit_category) and status in (None, habit_status) and period in (None, habit_period))
+
+    def by_status(self, category):
+        """ 
+        Returns the number of habits of a category per status. 
+        
+        Parameters: 
+        category (str): The category. 
+        
+        Returns: 
+        dict: Status -> number of habits. Statuses without habits are missing. 
+        """
+        if self.counts is None:
+            self.build()
+        statuses = {}
+        for (habit_category, status, _), number in self.counts.items():
+            if habit_category == category:
+                statuses[status] = statuses.get(status, 0) + number
+        return statuses
+
+    def values(self, attribute):
+        """ 
+        Returns the categories, statuses or periods the habits have. 
+        
+        Parameters: 
+        attribute (str): "category", "status" or "period". 
+        
+        Returns: 
+        set: The values as the habits store them. 
+        """
+        if self.counts is None:
+            self.build()
+        position = ["category", "status", "period"].index(attribute)
+        return {key[position] for key in self.counts}
+
+    def ids(self, attribute, values):
+        """ 
+        Returns the IDs of the habits whose category, status or period is one of the given values. 
+        
+        Parameters: 
+        attribute (str): "category", "status" or "period". 
+        values (set): The allowed values. 
+        
+        Returns: 
+        set: The IDs of the habits. 
+        """
+        if self.counts is None:
+            self.build()
+        position = ["category", "status", "period"].index(attribute)
+        return set().union(*(members for key, members in self.members.items() if key[position] in values))
+
+    def verify(self):
+        """ 
+        Counts all habits again and compares the result with the running counters. 
+        
+        Returns: 
+        dict: (category, status, period) -> (running count, recount) for every counter which differs. Empty if all agree. 
+        """
+        if self.counts is None:
+            self.build()
+        recount = {}
+        for habit in self.habits:
+            key = self.key(habit)
+            recount[key] = recount.get(key, 0) + 1
+        return {key: (self.counts.get(key, 0), recount.get(key, 0)) for key in set(self.counts) | set(recount) 
+                if self.counts.get(key, 0) != recount.get(key, 0)}
+
+class SortedIndex:
+    """ 
+    A secondary index of one numeric attribute: the pairs (value, habit ID) of all habits, kept sorted in a list, 
+    so range queries find their habits with a binary search in O(log n + k) instead of comparing all habits. 
+    Dates are indexed by their day ordinal. Built on first use and afterwards kept up to date from the changes 
+    the collection is informed about. 
+    """
+    FIELDS = {"id": "id", "target": "target", "streak": "streak", "streak_max": "streak_max", 
+              "date_create": "date_create_ordinal", "deadline": "deadline_ordinal"}
+
+    def __init__(self, habits, attribute):
+        """ 
+        Initializes a SortedIndex object. The sorted list itself is built on first use. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habits to index. 
+        attribute (str): The attribute to index, one of FIELDS. 
+        """
+        self.habits = habits
+        self.field = self.FIELDS[attribute]
+        self.entries = None  # Sorted (value, habit ID)
+        self.values = {}  # Habit ID -> value under which the habit is indexed
+
+    def build(self):
+        """ 
+        Sorts the values of all habits of the collection. 
+        """
+        self.values = {habit.id: getattr(habit, self.field) for habit in self.habits}
+        self.entries = sorted((value, habit_id) for habit_id, value in self.values.items())
+
+    def add(self, habit):
+        """ 
+        Indexes a habit which was added to the collection. 
+        
+        Parameters: 
+        habit (Habit): The added habit. 
+        """
+        if self.entries is None:
+            return
+        value = getattr(habit, self.field)
+        self.values[habit.id] = value
+        insort(self.entries, (value, habit.id))
+
+    def discard(self, habit):
+        """ 
+        Removes a habit which was removed from the collection. 
+        
+        Parameters: 
+        habit (Habit): The removed habit. 
+        """
+        if self.entries is None or habit.id not in self.values:
+            return
+        entry = (self.values.pop(habit.id), habit.id)
+        del self.entries[bisect_left(self.entries, entry)]
+
+    def update(self, habit):
+        """ 
+        Moves a changed habit to its current value. Called by the collection for every changed habit. 
+        
+        Parameters: 
+        habit (Habit): The changed habit. 
+        """
+        if self.entries is not None and self.values.get(habit.id) != getattr(habit, self.field):
+            self.discard(habit)
+            self.add(habit)
+
+    def bounds(self, comparison, value):
+        """ 
+        Returns the positions of the first and after the last entry which match a comparison. 
+        
+        Parameters: 
+        comparison (str): "=", ">" or "<". 
+        value (int): The value to compare with, a day ordinal for dates. 
+        
+        Returns: 
+        tuple: The start and end position in the sorted list. 
+        """
+        if self.entries is None:
+            self.build()
+        if comparison == "=":
+            return bisect_left(self.entries, (value,)), bisect_left(self.entries, (value + 1,))
+        if comparison == ">":
+            return bisect_left(self.entries, (value + 1,)), len(self.entries)
+        return 0, bisect_left(self.entries, (value,))
+
+    def count(self, comparison, value):
+        """ 
+        Returns the number of habits which match a comparison. Costs O(log n). 
+        
+        Parameters: 
+        comparison (str): "=", ">" or "<". 
+        value (int): The value to compare with. 
+        
+        Returns: 
+        int: The number of habits. 
+        """
+        start, end = self.bounds(comparison, value)
+        return end - start
+
+    def ids(self, comparison, value):
+        """ 
+        Returns the IDs of the habits which match a comparison, ordered by value. Costs O(log n + k). 
+        
+        Parameters: 
+        comparison (str): "=", ">" or "<". 
+        value (int): The value to compare with. 
+        
+        Returns: 
+        list: The IDs of the habits. 
+        """
+        start, end = self.bounds(comparison, value)
+        return [habit_id for _, habit_id in self.entries[start:end]]
+
+class TrigramIndex:
+    """ 
+    An inverted index of the habit names: every trigram (three consecutive characters) of a lower case name maps to the IDs 
+    of the habits whose name contains it. Names are indexed with a space in front, so the start of every word has trigrams 
+    of its own. A text can only be part of names which contain all of its trigrams, so a search intersects their 
+    posting lists and compares only these candidates. Built on first use and afterwards kept up to date from the changes 
+    the collection is informed about. 
+    """
+    SIMILARITY = 0.3  # Share of the trigrams of the text a name needs to contain to be found by a fuzzy search
+
+    def __init__(self, habits):
+        """ 
+        Initializes a TrigramIndex object. The posting lists themselves are built on first use. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of habits to index. 
+        """
+        self.habits = habits
+        self.postings = None  # Trigram -> IDs of the habits
+        self.names = {}  # Habit ID -> lower case name under which the habit is indexed
+
+    @staticmethod
+    def trigrams(text):
+        """ 
+        Returns: 
+        set: The trigrams of a text. Empty for texts with less than three characters. 
+        """
+        return {text[position:position + 3] for position in range(len(text) - 2)}
+
+    def build(self):
+        """ 
+        Indexes the names of all habits of the collection. 
+        """
+        postings = {}
+        names = {}
+        for habit in self.habits:
+            names[habit.id] = habit.name_lower
+            text = " " + habit.name_lower
+            for position in range(len(text) - 2):
+                ids = postings.get(text[position:position + 3])
+                if ids is None:
+                    postings[text[position:position + 3]] = {habit.id}
+                else:
+                    ids.add(habit.id)
+        self.postings, self.names = postings, names
+
+    def add(self, habit):
+        """ 
+        Indexes the name of a habit which was added to the collection. 
+        
+        Parameters: 
+        habit (Habit): The added habit. 
+        """
+        if self.postings is None:
+            return
+        self.names[habit.id] = habit.name_lower
+        for trigram in self.trigrams(" " + habit.name_lower):
+            self.postings.setdefault(trigram, set()).add(habit.id)
+
+    def discard(self, habit):
+        """ 
+        Removes a habit which was removed from the collection. 
+        
+        Parameters: 
+        habit (Habit): The removed habit. 
+        """
+        if self.postings is None or habit.id not in self.names:
+            return
+        for trigram in self.trigrams(" " + self.names.pop(habit.id)):
+            self.postings[trigram].discard(habit.id)
+            if not self.postings[trigram]:
+                del self.postings[trigram]
+
+    def update(self, habit):
+        """ 
+        Indexes the current name of a changed habit. Called by the collection for every changed habit. 
+        
+        Parameters: 
+        habit (Habit): The changed habit. 
+        """
+        if self.postings is not None and self.names.get(habit.id) != habit.name_lower:
+            self.discard(habit)
+            self.add(habit)
+
+    def count(self, text, prefix = False):
+        """ 
+        Returns an upper bound of the number of names which contain a text: the length of its shortest posting list. 
+        
+        Parameters: 
+        text (str): The lower case text. 
+        prefix (bool): If True, only the starts of words are counted. 
+        
+        Returns: 
+        int: The number of candidates, or None if the text is too short for the index. 
+        """
+        if self.postings is None:
+            self.build()
+        trigrams = self.trigrams(" " + text if prefix else text)
+        if not trigrams:
+            return None
+        return min(len(self.postings.get(trigram, ())) for trigram in trigrams)
+
+    def candidates(self, text, prefix = False):
+        """ 
+        Returns the IDs of the habits whose name contains all trigrams of a text, by intersecting the posting lists 
+        from the shortest one on. 
+        
+        Parameters: 
+        text (str): The lower case text. 
+        prefix (bool): If True, the text has to start a word. 
+        
+        Returns: 
+        set: The IDs of the candidates, or None if the text is too short for the index. 
+        """
+        if self.postings is None:
+            self.build()
+        trigrams = self.trigrams(" " + text if prefix else text)
+        if not trigrams:
+            return None
+        postings = sorted((self.postings.get(trigram, set()) for trigram in trigrams), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, text, mode = "substring", limit = None):
+        """ 
+        Finds the habits whose name contains a text, e.g. for a search box. Case is ignored. 
+        
+        Parameters: 
+        text (str): The text to search. 
+        mode (str): "substring" finds the text anywhere in the name, "prefix" at the start of a word of the name 
+                    and "fuzzy" finds similar names by the share of the trigrams of the text they contain, e.g. with typing errors. 
+        limit (int): The maximal number of habits. All if None. 
+        
+        Returns: 
+        list: The habits, ordered by ID, for "fuzzy" by similarity and shorter names first. 
+        """
+        if mode not in ["substring", "prefix", "fuzzy"]:
+            raise ValueError(f"Unknown search mode '{mode}'.")
+        text = text.lower()
+        if self.postings is None:
+            self.build()
+
+        if mode == "fuzzy":
+            trigrams = self.trigrams(" " + text)
+            common = Counter(chain.from_iterable(self.postings.get(trigram, ()) for trigram in trigrams))
+            # The share of the trigrams of the text found in the name, so the other words of a longer name do not count
+            similarity = {habit_id: number / len(trigrams) for habit_id, number in common.items() 
+                          if number >= self.SIMILARITY * len(trigrams)}
+            if text:
+                similarity.update((habit.id, 1.0) for habit in self.search(text))  # Names which contain the text itself
+            ids = sorted(similarity, key=lambda habit_id: (-similarity[habit_id], len(self.names[habit_id]), habit_id))
+        else:
+            candidates = self.candidates(text, mode == "prefix")
+            if candidates is None:  # Too short for the index, all names are compared
+                candidates = self.names
+            word_start = " " + text
+            ids = sorted(habit_id for habit_id in candidates if text in self.names[habit_id] and (mode == "substring" 
+                         or self.names[habit_id].startswith(text) or word_start in self.names[habit_id]))
+        return [self.habits.get(habit_id) for habit_id in ids[:limit]]
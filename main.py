@@ -1,130 +1,221 @@
-import questionary
-
-from analyse import Analyse
-import display
-from manage import Habit
-from store import HabitsStore
-
-habits_store = HabitsStore()
-habits = habits_store.load()
-Habit.update(habits)
-
-print ("\nWELCOME to HABIT TRACKER 2024.\n")
-if not Habit.check_habits_exist(habits):
-    display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
-                           headline ="Here is a quick overview of your currently tracked habits (active and broken):")
-  
-def cli_main(): 
-    """ 
-    Main function that runs the Habit Tracker CLI. 
-    Displays the main menu and handles user choices. 
-    """
-    while True:
-        print(f"\n \\\ MAIN MENU // ")
-        choice = questionary.select(
-            "\n What do you want to do?",
-            choices=["Quick Check a habit", "Add a new habit", "Manage your habits", "Analyse your habits", "Save and Exit"]
-        ).ask()
-
-        if choice == "Quick Check a habit":
-            if not Habit.check_habits_exist(habits):
-                check()                
-        elif choice == "Add a new habit":
-            Habit.add(habits)
-            habits_store.save(habits)
-        elif choice == "Manage your habits":
-            if not Habit.check_habits_exist(habits): 
-                cli_sub_1()        
-        elif choice == "Analyse your habits":
-            if not Habit.check_habits_exist(habits):
-                cli_sub_2()
-        else: #"Save and Exit" was chosen
-            habits_store.save(habits)
-            print("Thanks for using Habit Tracker. Keep on tracking and see you soon!")
-            break
-
-def cli_sub_1():
-    """ 
-    Sub menu for managing habits. 
-    Displays options to filter, check, delete, duplicate, adjust habits or return to the main menu. 
-    """
-    while True:
-        print(f"\n \\\ SUB MENU - MANAGE // ")
-        choice = questionary.select(
-            "What do you want to do?",
-            choices=["Filter habits", "Check a habit", "Delete a habit", "Duplicate a habit", "Adjust a habit", "Go back to Main Menu"]
-        ).ask()
-
-        if choice == "Filter habits":
-            display.filter_habits(habits)
-        elif choice == "Check a habit":
-            check()
-        elif choice == "Delete a habit":
-            display.display_habits(habits, status_request = None,  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be deleted:")
-            Habit.delete(habits)
-            habits_store.save(habits)
-        elif choice == "Duplicate a habit":
-            display.display_habits(habits, status_request = None,  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be duplicated:")
-            Habit.duplicate(habits)
-            habits_store.save(habits)
-        elif choice == "Adjust a habit":
-            display.display_habits(habits, status_request = "Established",  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be adjusted:")
-            Habit.adjust(habits)
-            habits_store.save(habits)
-        else: # "back" was chosen
-            print("Back to Main Menu")
-            break
-
-def cli_sub_2():
-    """ 
-    Sub menu for analysing habits. 
-    Displays options to analyse the habits with predefined analysefunctions, which are stored in "analyse.py", 
-    or return to the main menu. 
-    """
-    while True:
-        print(f"\n \\\ SUB MENU - ANALYSE //")
-        choice = questionary.select(
-            "What do you want to analyse?",
-            choices=["All currently tracked habits", "All habits with the same periodicity", "Longest run streak of all defined habits", 
-                     "Longest run streak for a given habit",
-                     "Longest active streaks", "Most interruptions since creation (Top 3)","Most checks since creation (Top 3)", 
-                     "Longest expired (Top 3)","Group by category","Go back to Main Menu"]
-            ).ask()
-        if choice == "All currently tracked habits":
-            display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
-                                   headline = "Here is an overview of all currently tracked habits (not established now):")
-        elif choice == "All habits with the same periodicity":
-            Analyse.get_habits_by_period(habits)
-        elif choice == "Longest run streak of all defined habits":
-            Analyse.get_top_main(habits, attribute = "streak_max", designation = "Max Streak")
-        elif choice == "Longest run streak for a given habit":
-            Analyse.get_habit_streak_max(habits)
-
-        elif choice == "Longest active streaks":
-            Analyse.get_top_main(habits, attribute = "streak", designation = "Streak")
-        elif choice == "Most interruptions since creation (Top 3)":
-            Analyse.get_top_most(habits, attribute="date_interruptions", designation = "interruptions")
-        elif choice == "Most checks since creation (Top 3)":
-            Analyse.get_top_most(habits, attribute="date_check", designation = "checks")
-        elif choice == "Longest expired (Top 3)":
-            Analyse.get_top_longest_expired(habits)
-        elif choice == "Group by category":
-            Analyse.get_group_habits_by_category(habits)
-
-        else: # "back" was chosen
-            print("Back to Main Menu")
-            break
-
-def check():
-    """ 
-    Function to check the status of active and broken habits. 
-    Displays the respective habits and allows the user to check them. 
-    """
-    print(f"\nHere are all active and broken habits which can be checked:")
-    display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
-                           headline = "Here are all active and broken habits which can be checked:")
-    Habit.check(habits)
-    habits_store.save(habits)
-
-if __name__ == "__main__":
-    cli_main()
\ No newline at end of file
+import sys
+import time
+
+STARTED = time.perf_counter()
+
+from analyse import Analyse
+import display
+from manage import Habit
+from store import JournaledHabitsStore
+
+IMPORTED = time.perf_counter()
+
+UI_MODULES = ["questionary", "tabulate"]
+
+habits_store = None
+habits = None
+timings = {"Imports": IMPORTED - STARTED}
+preloaded = {}  # UI module -> whether it was imported before the main menu imported questionary
+
+def start():
+    """ 
+    Loads the habits and updates the status of all due habits. 
+    Is called once before the first menu is shown, not when main is imported. 
+    """
+    global habits_store, habits
+    moment = time.perf_counter()
+    habits_store = JournaledHabitsStore()
+    habits = habits_store.load(lazy=True)
+    timings["Load habits"] = time.perf_counter() - moment
+
+    moment = time.perf_counter()
+    Habit.update(habits)
+    timings["Update due habits"] = time.perf_counter() - moment
+
+def overview():
+    """ 
+    Displays all active and broken habits. Used to be shown at every start, now on demand from the main menu. 
+    """
+    if not Habit.check_habits_exist(habits):
+        display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
+                               headline ="Here is a quick overview of your currently tracked habits (active and broken):")
+
+def startup_report():
+    """ 
+    Prints how long the start took until the main menu could be shown, split into its phases, 
+    and whether the UI libraries were already imported before the menu. 
+    Is shown instead of the main menu with "python main.py --startup-report". 
+    """
+    print("\nSTARTUP REPORT")
+    for phase, seconds in timings.items():
+        print(f"{phase:<26}{seconds * 1000:>9.1f} ms")
+    print(f"{'Time to first prompt':<26}{(time.perf_counter() - STARTED) * 1000:>9.1f} ms")
+    print(f"{'Habits':<26}{len(habits):>9}")
+    for module, imported in preloaded.items():
+        print(f"{module + ' preloaded':<26}{'yes' if imported else 'no':>9}")
+
+def cli_main(report = False): 
+    """ 
+    Main function that runs the Habit Tracker CLI. 
+    Displays the main menu and handles user choices. 
+
+    Parameters: 
+    report (bool): If True, the startup report is printed instead of asking the first question. 
+    """
+    preloaded.update((module, module in sys.modules) for module in UI_MODULES)
+    moment = time.perf_counter()
+    import questionary
+    timings["Import questionary"] = time.perf_counter() - moment
+    display.pause = True  # Long lists are shown page by page
+
+    print ("\nWELCOME to HABIT TRACKER 2024.\n")
+    while True:
+        print(f"\n \\\ MAIN MENU // ")
+        question = questionary.select(
+            "\n What do you want to do?",
+            choices=["Quick Check a habit", "Show overview", "Add a new habit", "Manage your habits", "Analyse your habits", "Save and Exit"]
+        )
+        if report:
+            startup_report()
+            return
+        choice = question.ask()
+
+        if choice == "Quick Check a habit":
+            if not Habit.check_habits_exist(habits):
+                check()                
+        elif choice == "Show overview":
+            overview()
+        elif choice == "Add a new habit":
+            Habit.add(habits)
+            habits_store.save(habits)
+        elif choice == "Manage your habits":
+            if not Habit.check_habits_exist(habits): 
+                cli_sub_1()        
+        elif choice == "Analyse your habits":
+            if not Habit.check_habits_exist(habits):
+                cli_sub_2()
+        else: #"Save and Exit" was chosen
+            habits_store.save(habits)
+            print("Thanks for using Habit Tracker. Keep on tracking and see you soon!")
+            break
+
+def cli_sub_1():
+    """ 
+    Sub menu for managing habits. 
+    Displays options to filter, check, delete, duplicate, adjust habits or return to the main menu. 
+    """
+    import questionary
+
+    while True:
+        print(f"\n \\\ SUB MENU - MANAGE // ")
+        choice = questionary.select(
+            "What do you want to do?",
+            choices=["Filter habits", "Check a habit", "Delete a habit", "Duplicate a habit", "Adjust a habit", "Go back to Main Menu"]
+        ).ask()
+
+        if choice == "Filter habits":
+            display.filter_habits(habits)
+        elif choice == "Check a habit":
+            check()
+        elif choice == "Delete a habit":
+            display.display_habits(habits, status_request = None,  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be deleted:")
+            Habit.delete(habits)
+            habits_store.save(habits)
+        elif choice == "Duplicate a habit":
+            display.display_habits(habits, status_request = None,  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be duplicated:")
+            Habit.duplicate(habits)
+            habits_store.save(habits)
+        elif choice == "Adjust a habit":
+            display.display_habits(habits, status_request = "Established",  length = "full", filter_period = [1, 2, 7], headline = "Here are all habits which can be adjusted:")
+            Habit.adjust(habits)
+            habits_store.save(habits)
+        else: # "back" was chosen
+            print("Back to Main Menu")
+            break
+
+def cli_sub_2():
+    """ 
+    Sub menu for analysing habits. 
+    Displays options to analyse the habits with predefined analysefunctions, which are stored in "analyse.py", 
+    or return to the main menu. 
+    """
+    import questionary
+
+    while True:
+        print(f"\n \\\ SUB MENU - ANALYSE //")
+        choice = questionary.select(
+            "What do you want to analyse?",
+            choices=["All currently tracked habits", "All habits with the same periodicity", "Longest run streak of all defined habits", 
+                     "Longest run streak for a given habit",
+                     "Longest active streaks", "Most interruptions since creation (Top 3)","Most checks since creation (Top 3)", 
+                     "Longest expired (Top 3)","Group by category","Completion rates per week or month","Go back to Main Menu"]
+            ).ask()
+        if choice == "All currently tracked habits":
+            display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
+                                   headline = "Here is an overview of all currently tracked habits (not established now):")
+        elif choice == "All habits with the same periodicity":
+            Analyse.get_habits_by_period(habits)
+        elif choice == "Longest run streak of all defined habits":
+            Analyse.get_top_main(habits, attribute = "streak_max", designation = "Max Streak")
+        elif choice == "Longest run streak for a given habit":
+            Analyse.get_habit_streak_max(habits)
+
+        elif choice == "Longest active streaks":
+            Analyse.get_top_main(habits, attribute = "streak", designation = "Streak")
+        elif choice == "Most interruptions since creation (Top 3)":
+            Analyse.get_top_most(habits, attribute="date_interruptions", designation = "interruptions")
+        elif choice == "Most checks since creation (Top 3)":
+            Analyse.get_top_most(habits, attribute="date_check", designation = "checks")
+        elif choice == "Longest expired (Top 3)":
+            Analyse.get_top_longest_expired(habits)
+        elif choice == "Group by category":
+            Analyse.get_group_habits_by_category(habits)
+        elif choice == "Completion rates per week or month":
+            Analyse.get_completion_rates(habits)
+
+        else: # "back" was chosen
+            print("Back to Main Menu")
+            break
+
+def check():
+    """ 
+    Function to check the status of active and broken habits. 
+    Displays the respective habits and allows the user to check them. 
+    """
+    print(f"\nHere are all active and broken habits which can be checked:")
+    display.display_habits(habits, status_request = "Established", length = "short", filter_period = [1, 2, 7], 
+                           headline = "Here are all active and broken habits which can be checked:")
+    Habit.check(habits)
+    habits_store.save(habits)
+
+def check_batch(source):
+    """ 
+    Function to check many habits at once without any prompt. 
+    Reads the checks from a CSV file or from stdin, applies all of them and saves the habits once. 
+
+    Parameters: 
+    source (str): The CSV file with one "ID,YYYY-MM-DD HH:MM:SS" or "ID" per line, or "-" for stdin. 
+    """
+    try:
+        if source == "-":
+            checks = Habit.read_checks(sys.stdin)
+        else:
+            with open(source, 'r') as file:
+                checks = Habit.read_checks(file)
+        result = Habit.check_batch(habits, checks)
+    except ValueError as error:  # Nothing was changed, see Habit.check_batch()
+        print(error, file=sys.stderr)
+        return
+    habits_store.save(habits)
+    print(f"{len(result['checked'])} checks recorded, {len(result['established'])} habits established.")
+    if result["unknown"]:
+        print(f"Unknown habit IDs: {', '.join(map(str, sorted(set(result['unknown']))))}")
+    if result["skipped"]:
+        print(f"Skipped already established habits: {', '.join(map(str, sorted(set(result['skipped']))))}")
+
+if __name__ == "__main__":
+    start()
+    if len(sys.argv) > 1 and sys.argv[1] == "--check-batch":
+        check_batch(sys.argv[2] if len(sys.argv) > 2 else "-")
+    else:
+        cli_main(report = "--startup-report" in sys.argv)
\ No newline at end of file
@@ -1,354 +1,970 @@
-from datetime import datetime, timedelta
-
-import questionary
-
-CATEGORIES = ["Health", "Lifestyle", "Sport", "Education", "Other"]
-PERIODS = ["Daily", "Every two days", "Weekly"]
-STATUS_LIST = ["Active", "Broken", "Established"]
-PERIOD_MAPPING = {"Daily": 1, "Every two days": 2, "Weekly": 7, 1:"Daily", 2:"Every two days", 7:"Weekly"}
-
-class Habit:
-    def __init__(self, id, name, category, period, target, streak=0, streak_max=0, date_create=None, date_check=None, deadline=None, status="Active", date_interruptions=None): 
-        """ 
-        Initializes a Habit object. 
-
-        Parameters: 
-        id (int): The unique identifier for the habit. Predefined by def get_id(habits):
-        name (str): The name of the habit. 
-        category (str): The category of the habit. 
-        period (int): The interval in days between repetitions of the habit. 
-        target (int): The target number of repetitions to establish the habit. 
-        streak (int): The current streak of consecutive completions. 
-        streak_max (int): The maximum streak of consecutive completions. 
-        date_create (str): The date the habit was created. 
-        date_check (list): The list of dates the habit was checked. 
-        deadline (str): The next due date for the habit. 
-        status (str): The current status of the habit (Active, Broken, Established). 
-        date_interruptions (list): The list of dates when the habit was interrupted. 
-        """
-        self.id = id 
-        self.name = name 
-        self.category = category 
-        self.period = int(period) 
-        self.target = target 
-        self.streak = streak 
-        self.streak_max = streak_max 
-        self.date_create = date_create or datetime.now().strftime("%Y-%m-%d") 
-        self.date_check = date_check or [] 
-        self.deadline = deadline or (datetime.now() + timedelta(days=period)).strftime("%Y-%m-%d") 
-        self.status = status 
-        self.date_interruptions = date_interruptions or []
-
-    @classmethod
-    def add(cls, habits):   
-        """ 
-        Adds a new habit to the habits list. 
-
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        id = cls.get_id(habits)
-        name = cls.enter_name()
-        category = cls.enter_category()
-        period = cls.enter_period()
-        target = cls.enter_valid_target()
-    
-        new_habit = cls(id, name, category, int(period), target) 
-
-        period_word = PERIOD_MAPPING[period].lower()
-        confirmation = questionary.confirm(f"\nDo you want to add '{name}' in {category} and repeat it {period_word} for {target} times?").ask() 
-        if confirmation:
-            habits.append(new_habit) 
-            print(f"'{name}' successfully added.")
-
-    @classmethod
-    def adjust(cls, habits):
-        """ 
-        Adjusts attributes selected by the user, 
-        as well as attributes influenced by the attribute selected by the user.
-
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        if cls.check_habits_exist(habits):
-            return
-
-        habit_id = cls.check_id_exists(habits, occasion_name="adjust")
-        if habit_id is None:
-            return
-
-        habit_to_adjust = next((habit for habit in habits if habit.id == habit_id), None)
-
-        if habit_to_adjust.status == "Established":
-            print(f"\nThis habit is already established. If you want to re-establish this habit, you can use the “Duplicate” function.")
-            return
-
-        choice = questionary.select(
-            "Which attribute do you want to adjust?",
-            choices=["Name", "Category", "Period", "Target"]
-        ).ask().lower()
-
-        if choice == "name":
-            new_value = cls.enter_name()
-        elif choice == "category":
-            new_value = cls.enter_category()
-        elif choice == "period":
-            new_value = cls.enter_period()
-            habit_to_adjust.deadline = (datetime.now() + timedelta(days=new_value)).strftime("%Y-%m-%d")
-        elif choice == "target": 
-            print(f"\nThe new target must be greater than the current streak of {habit_to_adjust.streak}.")
-            while True: 
-                new_value = cls.enter_valid_target() 
-                if new_value > habit_to_adjust.streak: 
-                    break 
-                else:
-                    print(f"\nInvalid input. The new target must be greater than the current streak of {habit_to_adjust.streak}.")
-
-        if habit_to_adjust:
-            setattr(habit_to_adjust, choice, new_value)
-            print(f"\nHabit no. {habit_id} has been adjusted. The new value for {choice} is now {new_value}.")
-
-
-    @classmethod
-    def check(cls, habits):
-        """ 
-        Checks the status of a habit.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        if cls.check_habits_exist(habits):
-            return
-        
-        habit_id = cls.check_id_exists(habits, occasion_name="check")
-        if habit_id is None:
-            return
-        
-        confirmation = questionary.confirm(f"\nDo you really want to check habit no. {habit_id}?").ask()
-        if confirmation:
-            habit_to_check = next((habit for habit in habits if habit.id == habit_id), None)
-
-            if habit_to_check.status == "Established":
-                print(f"\nThis habit is already established. If you want to re-establish this habit, you can use the “Duplicate” function.")
-                return
-            else:
-                habit_to_check.streak += 1
-                habit_to_check.streak_max = max(habit_to_check.streak_max, habit_to_check.streak)
-                habit_to_check.date_check.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                habit_to_check.deadline = (datetime.now() + timedelta(days=habit_to_check.period)).strftime("%Y-%m-%d")
-                
-                if habit_to_check.streak == habit_to_check.target:
-                    habit_to_check.status = "Established"  # Broken and Active are handled in UPDATE
-                    print(f"\nYou have established this habit. Congratulations!")
-                else:
-                    print(f"{habit_to_check.name} has been checked. The next due date is {habit_to_check.deadline}.")
-
-    @classmethod
-    def delete(cls, habits):
-        """ 
-        Deletes a habit from the habits list.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        if cls.check_habits_exist(habits):
-            return
-        
-        habit_id = cls.check_id_exists(habits, occasion_name="delete")
-        if habit_id is None:
-            return
-        
-        confirmation = questionary.confirm(f"\nDo you really want to delete habit no. {habit_id}? Deleted habits cannot be restored.").ask()
-        if confirmation:
-            habit_to_delete = next((habit for habit in habits if habit.id == habit_id), None)
-            habits.remove(habit_to_delete)
-            print(f"\nHabit no. {habit_id} has been deleted.")
-
-    @classmethod 
-    def duplicate(cls, habits):
-        """ 
-        Duplicates an existing habit.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        if cls.check_habits_exist(habits): 
-            return
-         
-        habit_id = cls.check_id_exists(habits, occasion_name="duplicate") 
-        if habit_id is None: 
-            return 
-        
-        habit_to_duplicate = next((habit for habit in habits if habit.id == habit_id), None) 
-        if habit_to_duplicate: 
-            id = cls.get_id(habits) 
-            name = cls.enter_name()
-            category = habit_to_duplicate.category 
-            period = habit_to_duplicate.period 
-            target = habit_to_duplicate.target
-
-            new_habit = cls(id, name, category, period, target)
-
-            habits.append(new_habit) 
-            print(f"\nHabit no. {habit_id} has been duplicated. The name of the new habits is '{name}'.")
-
-    @classmethod
-    def update(cls, habits):
-        """ 
-        Updates the status and streaks of all habits in the list.
-        Is called once, the programm is started.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        """
-        for habit in habits:
-            if habit.status != "Established":  #Establishment during CHECK.
-                now = datetime.now().strftime("%Y-%m-%d")
-
-                if habit.deadline < now:
-                    habit.status = "Broken"
-                    habit.streak = 0 
-                    if len(habit.date_interruptions) == 0 or max(habit.date_interruptions) != now:
-                        habit.date_interruptions.append(datetime.now().strftime("%Y-%m-%d"))
-                else:
-                    habit.status = "Active"
-                    habit.deadline = (datetime.now() + timedelta(days=habit.period)).strftime("%Y-%m-%d") 
-
-    @staticmethod
-    def get_id(habits):
-        """ 
-        Gets a new unique ID for a habit. Was added to ensure no double IDs.
-        Checks the greatest existing ID and adds +1.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        
-        Returns: 
-        int: A unique ID for the new habit. 
-
-        Used by: manage.add(), manage.duplicate()
-        """
-        id = 1
-        if habits:
-            id = max(habit.id for habit in habits) + 1
-        return id
-
-    @staticmethod
-    def enter_name(): 
-        """ 
-        Prompts the user to enter the name of the habit with max. 30 characters.
-        
-        Returns: 
-        str: The name of the habit. 
-
-        Used by: manage.add(), manage.duplicate() and manage.adjust()
-        """
-        max_length = 30
-        while True: 
-            name = questionary.text(f"\nPlease enter the name of your habit:").ask()
-            if len(name) <= max_length: 
-                return name 
-            else: 
-                print(f"\nName is too long! Kindly use maximum {max_length} characters.")
-                print(f"'{name}' has {len(name)} characters.")
-
-    @staticmethod
-    def enter_category():
-        """ 
-        Prompts the user to choose one out of four categories to asign a habit. 
-        
-        Returns: 
-        str: The selected category.
-
-        Used by: manage.add() and manage.adjust()
-        """
-        category = questionary.select(
-            "Which of these categories does your new habit belong to?",
-            choices=CATEGORIES
-        ).ask()
-        return category
-
-    @staticmethod
-    def enter_period():
-        """ 
-        Prompts the user to choose a period for the habit repetition. 
-        
-        Returns: 
-        int: The period mapped to its corresponding number of days.
-
-        Used by: manage.add() and manage.adjust()
-        """
-        period_word = questionary.select(
-            "In which period you want to repeat your new habit?",
-            choices=PERIODS
-        ).ask()
-        period = PERIOD_MAPPING[period_word]
-        return period
-
-    @staticmethod
-    def enter_valid_target():
-        """ 
-        Prompts the user to enter a valid target number of repetitions for the habit.
-        Prevents an error caused by wrong input.
-        
-        Returns: 
-        int: The target number of repetitions.
-
-        Used by: manage.add() and manage.adjust()
-        """
-        while True:
-            try:
-                target = int(questionary.text(f"\nHow many times do you want to repeat that habit?").ask())
-                if target > 0:
-                    return target
-                else:
-                    print(f"\nInvalid input. Please enter a positive integer.")
-            except ValueError:
-                print(f"\nInvalid input. Please enter a numeric value.")
-
-    @staticmethod
-    def check_habits_exist(habits):
-        """ 
-        Checks if there are any habits in the list.
-        Prevents the methods which use this helper method 
-        from trying to work without a database, which would lead to errors.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        
-        Returns: 
-        bool: True if no habits exist, False otherwise. 
-
-        Used by: manage.adjust(), manage.check(), manage.delete(), manage.duplicate(), diaplay.display_habits() and display.filter_habits()
-        """
-        if not habits:
-            print(f"\nNo habits found. You can add new habits by using the “ADD“ function.")
-            return True
-        return False
-
-    @staticmethod
-    def check_id_exists(habits, occasion_name):
-        """ 
-        Prompts the user to enter a valid existing ID and checks if 
-        the input was correct (positiv int) and if the entered ID exists. 
-        Prevents an error caused by wrong input.
-        
-        Parameters: 
-        habits (list): The list of current habits. 
-        occasion_name (str): The occasion for which the ID is being checked. 
-        
-        Returns: 
-        int: The habit ID if it exists, None otherwise. 
-
-        Used by: manage.adjust(), manage.check(), manage.delete() and manage.duplicate()
-        """
-        try:
-            habit_id = int(questionary.text(f"\nPlease enter the ID of the habit you want to {occasion_name}:").ask())
-        except ValueError:
-            print(f"\nInvalid input. Please enter one of the numeric IDs you can see in the list above.")
-            return None
-        
-        if not any(habit.id == habit_id for habit in habits):
-            print(f"\nNo habit found with ID {habit_id}. Please enter a numeric ID you can see in the list above.")
-            return None
-        return habit_id
\ No newline at end of file
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import islice
+import json
+import sys
+
+from index import DeadlineIndex, HabitCounts, SortedIndex, TrigramIndex
+
+CATEGORIES = ["Health", "Lifestyle", "Sport", "Education", "Other"]
+PERIODS = ["Daily", "Every two days", "Weekly"]
+STATUS_LIST = ["Active", "Broken", "Established"]
+PERIOD_MAPPING = {"Daily": 1, "Every two days": 2, "Weekly": 7, 1:"Daily", 2:"Every two days", 7:"Weekly"}
+FIELDS = ["id", "name", "category", "period", "target", "streak", "streak_max", "date_create", "date_check", "deadline", "status", "date_interruptions"]
+LIST_FIELDS = ["date_check", "date_interruptions"]
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+SECOND = timedelta(seconds=1)
+DAY = 86400  # Seconds per day, to turn check timestamps into day ordinals
+
+def to_ordinal(day):
+    """ 
+    Converts a date (YYYY-MM-DD) to its day ordinal. 
+    
+    Parameters: 
+    day (str): The date to convert. 
+    
+    Returns: 
+    int: The day ordinal of the date. 
+    """
+    if len(day) != 10:
+        raise ValueError(f"'{day}' is not in the format YYYY-MM-DD.")
+    return date.fromisoformat(day).toordinal()
+
+def from_ordinal(ordinal):
+    """ 
+    Converts a day ordinal back to a date (YYYY-MM-DD). 
+    
+    Parameters: 
+    ordinal (int): The day ordinal. 
+    
+    Returns: 
+    str: The date. 
+    """
+    return date.fromordinal(ordinal).isoformat()
+
+def to_timestamp(moment):
+    """ 
+    Converts a check timestamp (YYYY-MM-DD HH:MM:SS) to seconds since 1970. 
+    
+    Parameters: 
+    moment (str): The timestamp to convert. 
+    
+    Returns: 
+    int: The seconds since 1970-01-01 00:00:00. 
+    """
+    if len(moment) != 19 or moment[10] != " ":
+        raise ValueError(f"'{moment}' is not in the format YYYY-MM-DD HH:MM:SS.")
+    return (datetime.fromisoformat(moment) - EPOCH) // SECOND
+
+def from_timestamp(seconds):
+    """ 
+    Converts seconds since 1970 back to a check timestamp (YYYY-MM-DD HH:MM:SS). 
+    
+    Parameters: 
+    seconds (int): The seconds since 1970-01-01 00:00:00. 
+    
+    Returns: 
+    str: The timestamp. 
+    """
+    return (EPOCH + seconds * SECOND).isoformat(" ")
+
+class Clock:
+    """ 
+    The source of the current time for the habit tracker. All code asks the module-level manage.clock 
+    instead of calling datetime.now() itself, so tests and simulations can replace it. 
+    """
+    def now(self):
+        """ 
+        Returns: 
+        datetime: The current local date and time. 
+        """
+        return datetime.now()
+
+class SimulatedClock(Clock):
+    """ 
+    A clock which stands still until it is advanced, e.g. to replay months of usage in seconds. 
+    """
+    def __init__(self, moment):
+        """ 
+        Initializes a SimulatedClock object. 
+        
+        Parameters: 
+        moment (datetime): The time the clock starts at. 
+        """
+        self.moment = moment
+
+    def now(self):
+        """ 
+        Returns: 
+        datetime: The simulated date and time. 
+        """
+        return self.moment
+
+    def advance(self, **delta):
+        """ 
+        Moves the clock forward. 
+        
+        Parameters: 
+        delta: The arguments of timedelta, e.g. days=1 or hours=3. 
+        """
+        self.moment += timedelta(**delta)
+
+clock = Clock()  # Replace with a SimulatedClock to run the tracker at another time
+
+class DateList:
+    """ 
+    A list of dates which keeps the dates as numbers in an array, but behaves like the list of date strings 
+    used before: it can be iterated, indexed and appended with strings. Check timestamps are stored as seconds 
+    since 1970, interruption dates as day ordinals. 
+    The dates given to the list, as strings, JSON text of the list content or function returning the numbers, 
+    are only converted when the list is first read, so loading many habits does not convert dates nobody looks at. 
+    """
+    __slots__ = ["timestamps", "_numbers", "_source"]
+
+    def __init__(self, dates = None, timestamps = True):
+        """ 
+        Initializes a DateList object. 
+        
+        Parameters: 
+        dates (list, array, str or callable): The dates as strings, as numbers in an array, 
+                                              as JSON text of the list content or as function returning an array. 
+        timestamps (bool): True for check timestamps (YYYY-MM-DD HH:MM:SS), False for dates (YYYY-MM-DD). 
+        """
+        self.timestamps = timestamps
+        self._numbers = None
+        self._source = None
+        if isinstance(dates, array):
+            self._numbers = array("q", dates)
+        elif dates:
+            self._source = dates
+        else:
+            self._numbers = array("q")
+
+    @property
+    def numbers(self):
+        """ 
+        The dates as array of numbers (seconds since 1970 or day ordinals). 
+        """
+        if self._numbers is None:
+            if isinstance(self._source, str):
+                self._numbers = array("q", map(self.converter(), json.loads(f"[{self._source}]")))
+            elif callable(self._source):
+                self._numbers = array("q", self._source())
+            else:
+                self._numbers = array("q", map(self.converter(), self._source))
+            self._source = None
+        return self._numbers
+
+    def unparsed(self):
+        """ 
+        Returns the JSON text of the list content if the list was not read since it was loaded, 
+        so the store can write it back as it is. 
+        
+        Returns: 
+        str: The JSON text or None, if the dates were converted already. 
+        """
+        return self._source if isinstance(self._source, str) else None
+
+    def converter(self):
+        """ 
+        Returns the function which converts the date strings of this list to numbers. 
+        
+        Returns: 
+        callable: to_timestamp() or to_ordinal(). 
+        """
+        return to_timestamp if self.timestamps else to_ordinal
+
+    def to_number(self, text):
+        """ 
+        Converts a date string to the number stored in the list. 
+        
+        Parameters: 
+        text (str): The date string. 
+        
+        Returns: 
+        int: The seconds since 1970 or the day ordinal. 
+        """
+        return to_timestamp(text) if self.timestamps else to_ordinal(text)
+
+    def to_text(self, number):
+        """ 
+        Converts a stored number back to the date string. 
+        
+        Parameters: 
+        number (int): The seconds since 1970 or the day ordinal. 
+        
+        Returns: 
+        str: The date string. 
+        """
+        return from_timestamp(number) if self.timestamps else from_ordinal(number)
+
+    def append(self, text):
+        """ 
+        Appends a date given as string. 
+        
+        Parameters: 
+        text (str): The date string. 
+        """
+        self.numbers.append(self.to_number(text))
+
+    def latest(self, default = None):
+        """ 
+        Returns the latest date of the list without converting all numbers to strings. 
+        
+        Parameters: 
+        default: The value returned if the list is empty. 
+        
+        Returns: 
+        str: The latest date string. 
+        """
+        return self.to_text(max(self.numbers)) if self.numbers else default
+
+    def __len__(self):
+        if isinstance(self._source, str):  # Counting the quotes is enough to know the length of unparsed JSON text
+            return self._source.count('"') // 2
+        if isinstance(self._source, list):
+            return len(self._source)
+        return len(self.numbers)
+
+    def __iter__(self):
+        return map(from_timestamp if self.timestamps else from_ordinal, self.numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.to_text(number) for number in self.numbers[index]]
+        return self.to_text(self.numbers[index])
+
+    def __contains__(self, text):
+        try:
+            return self.to_number(text) in self.numbers
+        except (TypeError, ValueError):
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, DateList):
+            return self.timestamps == other.timestamps and self.numbers == other.numbers
+        return list(self) == other
+
+    def __repr__(self):
+        return f"DateList({list(self)!r})"
+
+class Habit:
+    __slots__ = ["id", "_name", "name_lower", "category", "period", "target", "streak", "streak_max", "date_create_ordinal", 
+                 "_date_check", "deadline_ordinal", "status", "_date_interruptions", "dirty"]
+
+    def __init__(self, id, name, category, period, target, streak=0, streak_max=0, date_create=None, date_check=None, deadline=None, status="Active", date_interruptions=None): 
+        """ 
+        Initializes a Habit object. 
+        The habit uses a compact layout: dates are kept as day ordinals (date_create_ordinal, deadline_ordinal), 
+        the date lists as DateList and category and status as interned strings. The attributes date_create, 
+        deadline, date_check and date_interruptions still offer the strings and lists used by the other modules. 
+
+        Parameters: 
+        id (int): The unique identifier for the habit. Predefined by def get_id(habits):
+        name (str): The name of the habit. 
+        category (str): The category of the habit. 
+        period (int): The interval in days between repetitions of the habit. 
+        target (int): The target number of repetitions to establish the habit. 
+        streak (int): The current streak of consecutive completions. 
+        streak_max (int): The maximum streak of consecutive completions. 
+        date_create (str): The date the habit was created. 
+        date_check (list): The list of dates the habit was checked. 
+                           May also be anything accepted by DateList, e.g. the JSON text of the list content, 
+                           which is parsed on first access. 
+        deadline (str): The next due date for the habit. 
+        status (str): The current status of the habit (Active, Broken, Established). 
+        date_interruptions (list): The list of dates when the habit was interrupted. Like date_check, it may be given as JSON text. 
+
+        The attribute dirty is not saved. It is True if the habit was changed since the last save. 
+        """
+        self.id = id 
+        self.name = name 
+        self.category = sys.intern(category) 
+        self.period = int(period) 
+        self.target = target 
+        self.streak = streak 
+        self.streak_max = streak_max 
+        self.date_create_ordinal = to_ordinal(date_create) if date_create else clock.now().toordinal() 
+        self.date_check = date_check 
+        self.deadline_ordinal = to_ordinal(deadline) if deadline else clock.now().toordinal() + self.period 
+        self.status = sys.intern(status) 
+        self.date_interruptions = date_interruptions
+        self.dirty = False
+
+    @property
+    def name(self):
+        """ 
+        The name of the habit. Setting it also sets name_lower, the name in lower case compared by the filters. 
+        """
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self.name_lower = value.lower()
+
+    @property
+    def date_create(self):
+        """ 
+        The date the habit was created (YYYY-MM-DD). 
+        """
+        return from_ordinal(self.date_create_ordinal)
+
+    @date_create.setter
+    def date_create(self, value):
+        self.date_create_ordinal = to_ordinal(value)
+
+    @property
+    def deadline(self):
+        """ 
+        The next due date for the habit (YYYY-MM-DD). 
+        """
+        return from_ordinal(self.deadline_ordinal)
+
+    @deadline.setter
+    def deadline(self, value):
+        self.deadline_ordinal = to_ordinal(value)
+
+    @property
+    def date_check(self):
+        """ 
+        The list of dates the habit was checked (YYYY-MM-DD HH:MM:SS). 
+        """
+        return self._date_check
+
+    @date_check.setter
+    def date_check(self, value):
+        self._date_check = value if isinstance(value, DateList) else DateList(value, timestamps=True)
+
+    @property
+    def date_interruptions(self):
+        """ 
+        The list of dates the habit was interrupted (YYYY-MM-DD). 
+        """
+        return self._date_interruptions
+
+    @date_interruptions.setter
+    def date_interruptions(self, value):
+        self._date_interruptions = value if isinstance(value, DateList) else DateList(value, timestamps=False)
+
+    @classmethod
+    def add(cls, habits):   
+        """ 
+        Adds a new habit to the habits list. 
+
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        import questionary  # deferred: the prompts are only needed in the interactive menus
+
+        name = cls.enter_name()
+        category = cls.enter_category()
+        period = cls.enter_period()
+        target = cls.enter_valid_target()
+
+        period_word = PERIOD_MAPPING[period].lower()
+        confirmation = questionary.confirm(f"\nDo you want to add '{name}' in {category} and repeat it {period_word} for {target} times?").ask() 
+        if confirmation:
+            cls.create(habits, name, category, period, target)
+            print(f"'{name}' successfully added.")
+
+    @classmethod
+    def create(cls, habits, name, category, period, target):
+        """ 
+        Adds a new habit to the habits list without any prompt. 
+        The values are validated like the inputs of the interactive ADD function. 
+
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        name (str): The name of the habit (max. 30 characters). 
+        category (str): One of the CATEGORIES. 
+        period (int): The period in days (1, 2 or 7). 
+        target (int): The positive number of repetitions to establish the habit. 
+
+        Returns: 
+        Habit: The new habit. 
+
+        Raises: 
+        ValueError: If one of the values is invalid. 
+
+        Used by: manage.add() and cli.add()
+        """
+        if not name or len(name) > 30:
+            raise ValueError(f"The name must have 1 to 30 characters, not {len(name)}.")
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown category '{category}'. Choose one of {', '.join(CATEGORIES)}.")
+        if not isinstance(period, int) or period not in PERIOD_MAPPING:
+            raise ValueError(f"Unknown period '{period}'. Choose 1, 2 or 7 days.")
+        if target <= 0:
+            raise ValueError(f"The target must be a positive integer, not {target}.")
+
+        new_habit = cls(cls.get_id(habits), name, category, period, target)
+        habits.append(new_habit)
+        habits.notify("add", new_habit, new_habit.to_dict())
+        return new_habit
+
+    @classmethod
+    def adjust(cls, habits):
+        """ 
+        Adjusts attributes selected by the user, 
+        as well as attributes influenced by the attribute selected by the user.
+
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        import questionary
+
+        if cls.check_habits_exist(habits):
+            return
+
+        habit_id = cls.check_id_exists(habits, occasion_name="adjust")
+        if habit_id is None:
+            return
+
+        habit_to_adjust = habits.get(habit_id)
+
+        if habit_to_adjust.status == "Established":
+            print(f"\nThis habit is already established. If you want to re-establish this habit, you can use the “Duplicate” function.")
+            return
+
+        choice = questionary.select(
+            "Which attribute do you want to adjust?",
+            choices=["Name", "Category", "Period", "Target"]
+        ).ask().lower()
+
+        changes = {}
+        if choice == "name":
+            new_value = cls.enter_name()
+        elif choice == "category":
+            new_value = cls.enter_category()
+        elif choice == "period":
+            new_value = cls.enter_period()
+            habit_to_adjust.deadline = (clock.now() + timedelta(days=new_value)).strftime("%Y-%m-%d")
+            changes["deadline"] = habit_to_adjust.deadline
+        elif choice == "target": 
+            print(f"\nThe new target must be greater than the current streak of {habit_to_adjust.streak}.")
+            while True: 
+                new_value = cls.enter_valid_target() 
+                if new_value > habit_to_adjust.streak: 
+                    break 
+                else:
+                    print(f"\nInvalid input. The new target must be greater than the current streak of {habit_to_adjust.streak}.")
+
+        if habit_to_adjust:
+            setattr(habit_to_adjust, choice, new_value)
+            changes[choice] = new_value
+            habits.notify("adjust", habit_to_adjust, changes)
+            print(f"\nHabit no. {habit_id} has been adjusted. The new value for {choice} is now {new_value}.")
+
+
+    @classmethod
+    def check(cls, habits):
+        """ 
+        Checks the status of a habit.
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        import questionary
+
+        if cls.check_habits_exist(habits):
+            return
+        
+        habit_id = cls.check_id_exists(habits, occasion_name="check")
+        if habit_id is None:
+            return
+        
+        confirmation = questionary.confirm(f"\nDo you really want to check habit no. {habit_id}?").ask()
+        if confirmation:
+            habit_to_check = habits.get(habit_id)
+
+            if habit_to_check.status == "Established":
+                print(f"\nThis habit is already established. If you want to re-establish this habit, you can use the “Duplicate” function.")
+                return
+            else:
+                cls.record_check(habits, habit_to_check, clock.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+                if habit_to_check.status == "Established":
+                    print(f"\nYou have established this habit. Congratulations!")
+                else:
+                    print(f"{habit_to_check.name} has been checked. The next due date is {habit_to_check.deadline}.")
+
+    @staticmethod
+    def record_check(habits, habit, moment):
+        """ 
+        Records a check of a habit: raises streak and max streak, adds the check date, 
+        sets the next deadline and establishes the habit once the target is reached. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        habit (Habit): The habit to check. Must not be established. 
+        moment (str): The time of the check (YYYY-MM-DD HH:MM:SS). 
+
+        Used by: manage.check() and manage.check_batch()
+        """
+        habit.streak += 1
+        habit.streak_max = max(habit.streak_max, habit.streak)
+        habit.date_check.append(moment)
+        habit.deadline_ordinal = to_ordinal(moment[:10]) + habit.period
+        
+        if habit.streak == habit.target:
+            habit.status = "Established"  # Broken and Active are handled in UPDATE
+        habits.notify("check", habit, dict(streak=habit.streak, streak_max=habit.streak_max, 
+                      date_check=moment, deadline=habit.deadline, status=habit.status))
+
+    @classmethod
+    def check_batch(cls, habits, checks):
+        """ 
+        Checks many habits in one pass without any prompt, e.g. to import check-ins from other devices. 
+        The checks are applied in chronological order. Unknown and established habits are skipped. 
+        All times are validated first, so a ValueError leaves every habit unchanged. 
+        The caller saves the habits once afterwards. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        checks (iterable): Habit IDs or pairs of habit ID and time of the check (YYYY-MM-DD HH:MM:SS). 
+                           Checks without time are recorded with the current time. 
+        
+        Returns: 
+        dict: The IDs of the "checked", "established", "unknown" and "skipped" (already established) habits. 
+        """
+        now = clock.now().strftime("%Y-%m-%d %H:%M:%S")
+        pairs = [check if isinstance(check, tuple) else (check, None) for check in checks]
+        pairs = sorted(((habit_id, moment or now) for habit_id, moment in pairs), key=lambda pair: pair[1])
+        for _, moment in pairs:
+            to_timestamp(moment)  # Rejects times in other formats before any habit is changed
+
+        result = {"checked": [], "established": [], "unknown": [], "skipped": []}
+        for habit_id, moment in pairs:
+            habit = habits.get(habit_id)
+            if habit is None:
+                result["unknown"].append(habit_id)
+            elif habit.status == "Established":
+                result["skipped"].append(habit_id)
+            else:
+                cls.record_check(habits, habit, moment)
+                result["checked"].append(habit_id)
+                if habit.status == "Established":
+                    result["established"].append(habit_id)
+        return result
+
+    @staticmethod
+    def read_checks(file):
+        """ 
+        Reads checks for check_batch() from a CSV file or stream with one check per line: 
+        the habit ID, optionally followed by a comma and the time of the check. 
+        Empty lines and a header line (e.g. "id,timestamp") are ignored. 
+        
+        Parameters: 
+        file (file): The open file or stream, e.g. sys.stdin. 
+        
+        Returns: 
+        list: The pairs of habit ID and time of the check (None if no time was given). 
+        """
+        checks = []
+        for number, line in enumerate(file, start=1):
+            fields = [field.strip() for field in line.split(",")]
+            if not fields[0]:
+                continue
+            try:
+                habit_id = int(fields[0])
+            except ValueError:
+                if number == 1:
+                    continue
+                raise ValueError(f"Line {number}: '{fields[0]}' is not a habit ID.")
+            checks.append((habit_id, fields[1] if len(fields) > 1 and fields[1] else None))
+        return checks
+
+    @classmethod
+    def delete(cls, habits):
+        """ 
+        Deletes a habit from the habits list.
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        import questionary
+
+        if cls.check_habits_exist(habits):
+            return
+        
+        habit_id = cls.check_id_exists(habits, occasion_name="delete")
+        if habit_id is None:
+            return
+        
+        confirmation = questionary.confirm(f"\nDo you really want to delete habit no. {habit_id}? Deleted habits cannot be restored.").ask()
+        if confirmation:
+            habit_to_delete = habits.get(habit_id)
+            habits.remove(habit_to_delete)
+            habits.notify("delete", habit_to_delete, {})
+            print(f"\nHabit no. {habit_id} has been deleted.")
+
+    @classmethod 
+    def duplicate(cls, habits):
+        """ 
+        Duplicates an existing habit.
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        if cls.check_habits_exist(habits): 
+            return
+         
+        habit_id = cls.check_id_exists(habits, occasion_name="duplicate") 
+        if habit_id is None: 
+            return 
+        
+        habit_to_duplicate = habits.get(habit_id) 
+        if habit_to_duplicate: 
+            id = cls.get_id(habits) 
+            name = cls.enter_name()
+            category = habit_to_duplicate.category 
+            period = habit_to_duplicate.period 
+            target = habit_to_duplicate.target
+
+            new_habit = cls(id, name, category, period, target)
+
+            habits.append(new_habit) 
+            habits.notify("add", new_habit, new_habit.to_dict())
+            print(f"\nHabit no. {habit_id} has been duplicated. The name of the new habits is '{name}'.")
+
+    @classmethod
+    def update(cls, habits):
+        """ 
+        Updates the status and streaks of all due habits in the list.
+        Is called once, the programm is started.
+        Only habits whose deadline has passed or which were checked again after they broke are updated. 
+        They are taken from the deadline index of the collection. At the start of the program the index is built 
+        from all habits in O(n), but only the due habits are updated and notified. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        """
+        today = clock.now().toordinal()
+        for habit in habits.deadlines.due(today):
+            if habit.status != "Established":  #Establishment during CHECK.
+                if habit.deadline_ordinal < today:
+                    changed = habit.status != "Broken" or habit.streak != 0
+                    habit.status = "Broken"
+                    habit.streak = 0 
+                    interruptions = habit.date_interruptions.numbers
+                    if len(interruptions) == 0 or max(interruptions) != today:
+                        interruptions.append(today)
+                        habits.notify("interrupt", habit, dict(status=habit.status, streak=habit.streak, date_interruptions=habit.date_interruptions[-1]))
+                    elif changed:  # A habit broken and interrupted today already is not saved again
+                        habits.notify("update", habit, dict(status=habit.status, streak=habit.streak))
+                else:
+                    habit.status = "Active"
+                    habit.deadline_ordinal = today + habit.period
+                    habits.notify("update", habit, dict(status=habit.status, deadline=habit.deadline))
+
+    def to_dict(self):
+        """ 
+        Returns the attributes of the habit which are saved by the store, with dates as strings and date lists as lists. 
+        
+        Returns: 
+        dict: The attribute names and values of the habit. 
+        """
+        habit_data = {field: getattr(self, field) for field in FIELDS}
+        for field in LIST_FIELDS:
+            habit_data[field] = list(habit_data[field])
+        return habit_data
+
+    def apply(self, changes):
+        """ 
+        Applies changes as they are given to notify(). Used to replay changes, e.g. from the journal. 
+        
+        Parameters: 
+        changes (dict): The new values of the changed attributes. Dates for "date_check" and 
+        "date_interruptions" are appended, a list of dates replaces all dates. 
+        """
+        for field, value in changes.items():
+            if field in LIST_FIELDS and not isinstance(value, list):
+                getattr(self, field).append(value)
+            else:
+                setattr(self, field, value)
+
+    @staticmethod
+    def get_id(habits):
+        """ 
+        Gets a new unique ID for a habit. Was added to ensure no double IDs.
+        Takes the greatest ID used in the collection since it was loaded and adds +1. The IDs are only unique 
+        among the current habits: the greatest ID is not saved, so the ID of a deleted habit can be given again 
+        after the next start of the program. 
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        
+        Returns: 
+        int: A unique ID for the new habit. 
+
+        Used by: manage.add(), manage.duplicate()
+        """
+        return habits.next_id()
+
+    @staticmethod
+    def enter_name(): 
+        """ 
+        Prompts the user to enter the name of the habit with max. 30 characters.
+        
+        Returns: 
+        str: The name of the habit. 
+
+        Used by: manage.add(), manage.duplicate() and manage.adjust()
+        """
+        import questionary
+
+        max_length = 30
+        while True: 
+            name = questionary.text(f"\nPlease enter the name of your habit:").ask()
+            if len(name) <= max_length: 
+                return name 
+            else: 
+                print(f"\nName is too long! Kindly use maximum {max_length} characters.")
+                print(f"'{name}' has {len(name)} characters.")
+
+    @staticmethod
+    def enter_category():
+        """ 
+        Prompts the user to choose one out of four categories to asign a habit. 
+        
+        Returns: 
+        str: The selected category.
+
+        Used by: manage.add() and manage.adjust()
+        """
+        import questionary
+
+        category = questionary.select(
+            "Which of these categories does your new habit belong to?",
+            choices=CATEGORIES
+        ).ask()
+        return category
+
+    @staticmethod
+    def enter_period():
+        """ 
+        Prompts the user to choose a period for the habit repetition. 
+        
+        Returns: 
+        int: The period mapped to its corresponding number of days.
+
+        Used by: manage.add() and manage.adjust()
+        """
+        import questionary
+
+        period_word = questionary.select(
+            "In which period you want to repeat your new habit?",
+            choices=PERIODS
+        ).ask()
+        period = PERIOD_MAPPING[period_word]
+        return period
+
+    @staticmethod
+    def enter_valid_target():
+        """ 
+        Prompts the user to enter a valid target number of repetitions for the habit.
+        Prevents an error caused by wrong input.
+        
+        Returns: 
+        int: The target number of repetitions.
+
+        Used by: manage.add() and manage.adjust()
+        """
+        import questionary
+
+        while True:
+            try:
+                target = int(questionary.text(f"\nHow many times do you want to repeat that habit?").ask())
+                if target > 0:
+                    return target
+                else:
+                    print(f"\nInvalid input. Please enter a positive integer.")
+            except ValueError:
+                print(f"\nInvalid input. Please enter a numeric value.")
+
+    @staticmethod
+    def check_habits_exist(habits):
+        """ 
+        Checks if there are any habits in the list.
+        Prevents the methods which use this helper method 
+        from trying to work without a database, which would lead to errors.
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        
+        Returns: 
+        bool: True if no habits exist, False otherwise. 
+
+        Used by: manage.adjust(), manage.check(), manage.delete(), manage.duplicate(), diaplay.display_habits() and display.filter_habits()
+        """
+        if not habits:
+            print(f"\nNo habits found. You can add new habits by using the “ADD“ function.")
+            return True
+        return False
+
+    @staticmethod
+    def check_id_exists(habits, occasion_name):
+        """ 
+        Prompts the user to enter a valid existing ID and checks if 
+        the input was correct (positiv int) and if the entered ID exists. 
+        Prevents an error caused by wrong input.
+        
+        Parameters: 
+        habits (HabitCollection): The collection of current habits. 
+        occasion_name (str): The occasion for which the ID is being checked. 
+        
+        Returns: 
+        int: The habit ID if it exists, None otherwise. 
+
+        Used by: manage.adjust(), manage.check(), manage.delete() and manage.duplicate()
+        """
+        import questionary
+
+        try:
+            habit_id = int(questionary.text(f"\nPlease enter the ID of the habit you want to {occasion_name}:").ask())
+        except ValueError:
+            print(f"\nInvalid input. Please enter one of the numeric IDs you can see in the list above.")
+            return None
+        
+        if habit_id not in habits.ids():
+            print(f"\nNo habit found with ID {habit_id}. Please enter a numeric ID you can see in the list above.")
+            return None
+        return habit_id
+
+class HabitCollection:
+    """ 
+    A collection of habits which replaces the plain list of habits. 
+    Keeps the habits in a dictionary by ID, so looking up, adding and deleting a habit costs O(1), 
+    while iterating still returns the habits in the order they were added. 
+    Is informed about every change of its habits by notify() and passes it on to its listeners. 
+    """
+    def __init__(self, habits = ()):
+        """ 
+        Initializes a HabitCollection object. 
+        
+        Parameters: 
+        habits (iterable): The habits to add to the collection. 
+        """
+        self.habits = {}  # Habit ID -> Habit, in the order the habits were added
+        self.max_id = 0  # Greatest ID used in the collection since it was created, not saved by the stores
+        self.listeners = []  # Callables informed about every change, see notify()
+        self.tombstones = set()  # IDs of habits deleted since the last save
+        self.deadlines = DeadlineIndex(self)
+        self.counts = HabitCounts(self)
+        self.ranges = {attribute: SortedIndex(self, attribute) for attribute in SortedIndex.FIELDS}  # For range filters
+        self.names = TrigramIndex(self)  # For name searches
+        self.snapshot = None  # Columnar snapshot for the analyses, see columnar.snapshot(). Dropped on every change
+        for habit in habits:
+            self.append(habit)
+
+    def append(self, habit):
+        """ 
+        Adds a habit to the collection. 
+        
+        Parameters: 
+        habit (Habit): The habit to add. Its ID must not be used by another habit of the collection. 
+        """
+        if habit.id in self.habits:
+            raise ValueError(f"A habit with ID {habit.id} already exists.")
+        self.habits[habit.id] = habit
+        self.max_id = max(self.max_id, habit.id)
+        self.deadlines.push(habit)
+        self.counts.add(habit)
+        for index in self.ranges.values():
+            index.add(habit)
+        self.names.add(habit)
+        self.snapshot = None
+
+    def remove(self, habit):
+        """ 
+        Removes a habit from the collection. 
+        
+        Parameters: 
+        habit (Habit): The habit to remove. 
+        """
+        if self.habits.get(habit.id) is not habit:
+            raise ValueError(f"Habit no. {habit.id} is not part of the collection.")
+        del self.habits[habit.id]
+        self.counts.discard(habit)
+        for index in self.ranges.values():
+            index.discard(habit)
+        self.names.discard(habit)
+        self.snapshot = None
+
+    def get(self, habit_id, default = None):
+        """ 
+        Returns the habit with the given ID. 
+        
+        Parameters: 
+        habit_id (int): The ID of the habit. 
+        default: The value returned if no habit has this ID. 
+        
+        Returns: 
+        Habit: The habit with the given ID or the default value. 
+        """
+        return self.habits.get(habit_id, default)
+
+    def ids(self):
+        """ 
+        Returns the IDs of all habits. Checking whether an ID is part of it costs O(1). 
+        
+        Returns: 
+        KeysView: The IDs of all habits. 
+        """
+        return self.habits.keys()
+
+    def next_id(self):
+        """ 
+        Returns the next ID which no current habit has. 
+        
+        Returns: 
+        int: The greatest ID used since the collection was created +1. 
+        """
+        return self.max_id + 1
+
+    def notify(self, event, habit, changes):
+        """ 
+        Marks the habit as dirty or, if it was deleted, records its ID as tombstone, so the store 
+        only has to persist the changed habits. Updates the indexes and views of the collection with the change. 
+        Afterwards informs all registered listeners, e.g. the journal of the store. 
+        Is called by every method of Habit that modifies habits. 
+        
+        Parameters: 
+        event (str): The kind of change ("add", "check", "adjust", "update", "interrupt", "repair" or "delete"). 
+        habit (Habit): The changed habit. 
+        changes (dict): The new values of the changed attributes. For "date_check" and "date_interruptions" 
+        only the appended date is given, except for "repair", which gives the whole list. For "add" all attributes are given. 
+        """
+        if event == "delete":
+            self.tombstones.add(habit.id)
+        else:
+            habit.dirty = True
+            self.deadlines.push(habit)
+            self.counts.update(habit)
+            for index in self.ranges.values():
+                index.update(habit)
+            self.names.update(habit)
+        self.snapshot = None
+        for listener in self.listeners:
+            listener(event, habit, changes)
+
+    def __iter__(self):
+        return iter(self.habits.values())
+
+    def __len__(self):
+        return len(self.habits)
+
+    def __contains__(self, habit):
+        return self.habits.get(habit.id) is habit
+
+    def __getitem__(self, index):
+        """ 
+        Returns the habit at the given position. Costs O(n), look up habits by ID with get() instead. 
+        """
+        if index < 0:
+            index += len(self.habits)
+        if not 0 <= index < len(self.habits):
+            raise IndexError("HabitCollection index out of range")
+        return next(islice(self.habits.values(), index, None))
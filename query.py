@@ -0,0 +1,258 @@
+"""
+Compound queries over habits, e.g.
+
+    category in {Sport, Health} and streak > 5 and deadline < 2025-01-01 and name contains 'run'
+    name starts 'morn' and status = active
+
+A query is a list of conditions (attribute, comparison, value) which all have to match. The values are converted once,
+the conditions are compiled into a single function which tests a habit, and the query runs over the candidates of the
+most selective index of the collection instead of over all habits.
+"""
+from operator import attrgetter, eq, gt, lt
+import re
+
+import manage
+
+ATTRIBUTES = {"id": "id", "name": "name", "category": "category", "period": "period", "target": "target", "streak": "streak",
+              "max-streak": "streak_max", "streak_max": "streak_max", "created-on": "date_create", "date_create": "date_create",
+              "deadline": "deadline", "status": "status"}
+NUMBERS = ["id", "target", "streak", "streak_max"]
+DATES = ["date_create", "deadline"]
+CHOICES = {"category": manage.CATEGORIES, "status": manage.STATUS_LIST}
+COMPARISONS = {"=": eq, ">": gt, "<": lt}
+FIELDS = {"name": "name_lower", "date_create": "date_create_ordinal", "deadline": "deadline_ordinal"}  # Parsed fields of the habits
+TOKEN = re.compile(r"""\s*(?:\{(?P<set>[^}]*)\}|'(?P<single>[^']*)'|"(?P<double>[^"]*)"|(?P<symbol>[=<>])|(?P<word>[^\s=<>{}'"]+))""")
+
+def tokenize(text):
+    """
+    Splits the text of a query into words, comparison symbols, quoted texts and sets.
+
+    Parameters:
+    text (str): The query.
+
+    Returns:
+    list: Pairs of kind ("word", "symbol", "text" or "set") and value. The value of a set is the list of its items.
+
+    Used by: query.Query.parse()
+    """
+    tokens = []
+    text = text.strip()
+    position = 0
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid query at '{text[position:position + 30]}'.")
+        position = match.end()
+        if match.group("set") is not None:
+            items = [item.strip().strip("'\"") for item in match.group("set").split(",")]
+            tokens.append(("set", [item for item in items if item]))
+        elif match.group("single") is not None or match.group("double") is not None:
+            tokens.append(("text", match.group("single") if match.group("single") is not None else match.group("double")))
+        elif match.group("symbol") is not None:
+            tokens.append(("symbol", match.group("symbol")))
+        else:
+            tokens.append(("word", match.group("word")))
+    return tokens
+
+def condition(attribute, comparison, value):
+    """
+    Checks a condition and converts its value into the form the compiled query compares with:
+    numbers as int, dates as day ordinal, the name as lower case text and categories, statuses and periods as set
+    (categories and statuses in lower case).
+    Raises a ValueError if the attribute is unknown or if comparison or value do not fit it.
+
+    Parameters:
+    attribute (str): The attribute, one of ATTRIBUTES.
+    comparison (str): "=", ">" or "<" for numbers and dates, "contains", "starts" (the start of a word) or "=" for the name
+                      and "in" or "=" for the others.
+    value: The value, a number, a date (YYYY-MM-DD or date), a text or a list of the allowed values.
+
+    Returns:
+    tuple: The attribute, the comparison and the converted value.
+    """
+    if attribute not in ATTRIBUTES:
+        raise ValueError(f"Unknown attribute '{attribute}', use one of {', '.join(ATTRIBUTES)}.")
+    attribute = ATTRIBUTES[attribute]
+    if attribute in NUMBERS or attribute in DATES:
+        if comparison not in COMPARISONS:
+            raise ValueError(f"{attribute} needs a comparison ({', '.join(COMPARISONS)}).")
+        if isinstance(value, (list, tuple, set, frozenset)):
+            raise ValueError(f"{attribute} needs a single value, not a set.")
+        if attribute in DATES:
+            value = value.toordinal() if hasattr(value, "toordinal") else manage.to_ordinal(str(value))
+        else:
+            value = int(value)
+    elif attribute == "name":
+        if comparison not in ["contains", "starts", "="]:
+            raise ValueError("name needs 'contains', 'starts' or '='.")
+        value = str(value).lower()
+    else:
+        if comparison not in ["in", "="]:
+            raise ValueError(f"{attribute} needs 'in' or '='.")
+        values = [value] if isinstance(value, (str, int)) else value
+        value = frozenset(canonical(attribute, item) for item in values)
+        comparison = "in"
+    return (attribute, comparison, value)
+
+def canonical(attribute, value):
+    """
+    Returns a category or status in lower case, as it is compared with the lower case value of the habit,
+    and the number of days of a period given as number or word.
+
+    Used by: query.condition()
+    """
+    if attribute == "period":
+        if isinstance(value, int) or str(value).isdigit():
+            return int(value)
+        words = {word.lower(): days for word, days in manage.PERIOD_MAPPING.items() if isinstance(word, str)}
+        if str(value).lower() not in words:
+            raise ValueError(f"Unknown period '{value}', use one of {', '.join(manage.PERIODS)} or the number of days.")
+        return words[str(value).lower()]
+    return str(value).lower()
+
+class Query:
+    """
+    A compound query: all conditions have to match. The query is compiled when it is created
+    and can be run any number of times over the habits.
+    """
+    def __init__(self, conditions):
+        """
+        Initializes a Query object.
+
+        Parameters:
+        conditions (list): Tuples (attribute, comparison, value), see condition().
+        """
+        self.conditions = [condition(*item) for item in conditions]
+        self.test = self.compile(self.conditions)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Creates a query from its text: conditions "attribute comparison value" joined by "and". Values with spaces are quoted,
+        sets of allowed values are written in braces, e.g. "status in {Active, Broken} and name contains 'read book'".
+
+        Parameters:
+        text (str): The query.
+
+        Returns:
+        Query: The compiled query.
+        """
+        tokens = tokenize(text)
+        conditions = []
+        position = 0
+        while True:
+            if position + 3 > len(tokens):
+                raise ValueError("Incomplete query, every condition needs an attribute, a comparison and a value.")
+            (kind, attribute), (comparison_kind, comparison), (_, value) = tokens[position:position + 3]
+            if kind != "word" or comparison_kind not in ["symbol", "word"]:
+                raise ValueError(f"Expected an attribute and a comparison, not '{attribute} {comparison}'.")
+            conditions.append((attribute.lower(), comparison.lower(), value))
+            position += 3
+            if position == len(tokens):
+                return cls(conditions)
+            if tokens[position][0] != "word" or tokens[position][1].lower() != "and":
+                raise ValueError(f"Expected 'and', not '{tokens[position][1]}'.")
+            position += 1
+
+    @staticmethod
+    def compile(conditions):
+        """
+        Compiles the conditions into one function which tests a habit. Every condition becomes a function which
+        compares a parsed field of the habit (day ordinals, the name in lower case) with the converted value,
+        so testing a habit neither parses nor converts anything.
+
+        Parameters:
+        conditions (list): The converted conditions.
+
+        Returns:
+        function: Takes a habit and returns True if it matches all conditions.
+        """
+        tests = [Query.compile_condition(*item) for item in conditions]
+        if len(tests) == 1:
+            return tests[0]
+        return lambda habit: all(test(habit) for test in tests)
+
+    @staticmethod
+    def compile_condition(attribute, comparison, value):
+        """
+        Compiles one converted condition into a function which tests a habit.
+
+        Used by: query.Query.compile()
+        """
+        field = attrgetter(FIELDS.get(attribute, attribute))
+        if attribute == "name" and comparison == "starts":
+            word_start = " " + value
+            return lambda habit: field(habit).startswith(value) or word_start in field(habit)
+        if attribute == "name" and comparison == "contains":
+            return lambda habit: value in field(habit)
+        if comparison == "in" and attribute in CHOICES:  # Custom categories keep the case the user gave them
+            return lambda habit: field(habit).lower() in value
+        if comparison == "in":
+            return lambda habit: field(habit) in value
+        compare = COMPARISONS[comparison]
+        return lambda habit: compare(field(habit), value)
+
+    @staticmethod
+    def estimate(habits, condition):
+        """
+        Tells how many candidates an index of the collection returns for a condition, without reading them.
+
+        Parameters:
+        habits (HabitCollection): The collection of current habits.
+        condition (tuple): The converted condition.
+
+        Returns:
+        tuple: The number of candidates and a function which returns their IDs, or None if no index supports the condition.
+        """
+        attribute, comparison, value = condition
+        if attribute == "id" and comparison == "=":
+            return 1, lambda: [value]
+        if attribute == "name":
+            prefix = comparison == "starts"
+            count = habits.names.count(value, prefix)
+            return None if count is None else (count, lambda: habits.names.candidates(value, prefix))
+        if attribute in habits.ranges:
+            index = habits.ranges[attribute]
+            return index.count(comparison, value), lambda: index.ids(comparison, value)
+        if attribute in ["category", "status", "period"]:
+            if attribute in CHOICES:  # The stored spellings of the values, independent of the case
+                value = {item for item in habits.counts.values(attribute) if item.lower() in value}
+            return sum(habits.counts.count(**{attribute: item}) for item in value), lambda: habits.counts.ids(attribute, value)
+        return None
+
+    def plan(self, habits):
+        """
+        Picks the index which returns the fewest candidates for one of the conditions.
+
+        Parameters:
+        habits (HabitCollection or list): The habits to query. Lists have no indexes.
+
+        Returns:
+        list: The sorted IDs of the candidates, or None if all habits have to be tested.
+        """
+        if not isinstance(habits, manage.HabitCollection):
+            return None
+        estimates = [estimate for estimate in (self.estimate(habits, item) for item in self.conditions) if estimate is not None]
+        if not estimates:
+            return None
+        count, ids = min(estimates, key=lambda estimate: estimate[0])
+        if count >= len(habits):
+            return None
+        return sorted(ids())
+
+    def run(self, habits):
+        """
+        Runs the query.
+
+        Parameters:
+        habits (HabitCollection or list): The habits to query.
+
+        Returns:
+        generator: The matching habits, in the order of their IDs if an index was used.
+        """
+        candidates = self.plan(habits)
+        selected = habits if candidates is None else (habits.get(habit_id) for habit_id in candidates)
+        test = self.test
+        for habit in selected:
+            if habit is not None and test(habit):
+                yield habit
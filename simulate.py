@@ -0,0 +1,131 @@
+"""
+Simulation of long-term usage for load tests: replays N days of checks and updates over M habits with a
+simulated clock, as fast as possible, and measures how the growing check history affects save, load and analysis times.
+
+    python simulate.py --days 1095 --habits 200 --every 90
+"""
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+import os
+import random
+import tempfile
+import time
+
+import tabulate  # Imported up front, so the first measurement does not include the import
+
+from analyse import Analyse
+import display
+import manage
+from manage import Habit, HabitCollection, SimulatedClock
+from store import HabitsStore
+
+def simulate(days, habit_count, every = 30, probability = 0.9, seed = 1, filename = None, binary = False, start = datetime(2024, 1, 1)):
+    """
+    Creates the habits and simulates every day: the status of the due habits is updated like at the start of the tracker,
+    then every habit whose deadline is reached is checked with the given probability at a random time of the day.
+    Every few days and after the last day, the habits are saved and loaded again and all analyses are run.
+
+    Parameters:
+    days (int): The number of days to simulate.
+    habit_count (int): The number of habits.
+    every (int): The number of days between two measurements.
+    probability (float): The probability that a due habit is checked.
+    seed (int): The seed of the random numbers, so runs can be repeated.
+    filename (str): The file the habits are saved to. Defaults to a temporary file which is removed afterwards.
+    binary (bool): If True, the habits are saved in the binary format.
+    start (datetime): The first simulated day.
+
+    Returns:
+    list: One dict per measurement with "day", "checks", "size" (bytes), "save", "load" and "analyse" (seconds).
+    """
+    generator = random.Random(seed)
+    previous_clock = manage.clock
+    manage.clock = clock = SimulatedClock(start)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = filename or os.path.join(directory, "simulation.json")
+        try:
+            habits = HabitCollection()
+            for number in range(habit_count):
+                Habit.create(habits, f"Habit {number + 1}", generator.choice(manage.CATEGORIES), generator.choice([1, 2, 7]), days + 1)
+
+            results = []
+            checks_total = 0
+            for day in range(1, days + 1):
+                clock.advance(days=1)
+                Habit.update(habits)
+                today = clock.now().toordinal()
+                date_text = clock.now().strftime("%Y-%m-%d")
+                checks = [(habit.id, f"{date_text} {generator.randrange(6, 23):02d}:{generator.randrange(60):02d}:00")
+                          for habit in habits if habit.deadline_ordinal <= today and habit.status != "Established"
+                          and generator.random() < probability]
+                checks_total += len(Habit.check_batch(habits, checks)["checked"])
+                if day % every == 0 or day == days:
+                    results.append(measure(habits, filename, binary, day, checks_total))
+        finally:
+            manage.clock = previous_clock
+    return results
+
+def measure(habits, filename, binary, day, checks_total):
+    """
+    Measures one full save, one full load and all analyses of the habits.
+
+    Parameters:
+    habits (HabitCollection): The simulated habits.
+    filename (str): The file the habits are saved to.
+    binary (bool): If True, the habits are saved in the binary format.
+    day (int): The simulated day.
+    checks_total (int): The number of checks so far.
+
+    Returns:
+    dict: The measurement, see simulate().
+    """
+    moment = time.perf_counter()
+    HabitsStore(binary).save(habits, filename)
+    save_time = time.perf_counter() - moment
+
+    moment = time.perf_counter()
+    loaded = HabitsStore().load(filename)
+    for habit in loaded:  # Parses the date lists as well
+        habit.date_check.numbers
+    load_time = time.perf_counter() - moment
+
+    moment = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        Analyse.get_top_main(loaded, attribute = "streak_max", designation = "Max Streak", order = True)
+        Analyse.get_top_main(loaded, attribute = "streak", designation = "Streak", order = True)
+        Analyse.get_top_most(loaded, attribute = "date_interruptions", designation = "interruptions")
+        Analyse.get_top_most(loaded, attribute = "date_check", designation = "checks")
+        Analyse.get_top_longest_expired(loaded)
+        Analyse.get_group_habits_by_category(loaded)
+    analyse_time = time.perf_counter() - moment
+
+    return dict(day=day, checks=checks_total, size=os.path.getsize(filename), save=save_time, load=load_time, analyse=analyse_time)
+
+def main(argv = None):
+    """
+    Runs a simulation with the given arguments and prints the measurements as table.
+
+    Parameters:
+    argv (list): The arguments, defaults to the arguments of the program.
+    """
+    parser = argparse.ArgumentParser(prog="simulate.py", description="Simulates long-term usage of the Habit Tracker.")
+    parser.add_argument("--days", type=int, default=365, help="simulated days (default: 365)")
+    parser.add_argument("--habits", type=int, default=100, help="number of habits (default: 100)")
+    parser.add_argument("--every", type=int, default=30, help="days between two measurements (default: 30)")
+    parser.add_argument("--probability", type=float, default=0.9, help="probability that a due habit is checked (default: 0.9)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--file", help="keep the habits in this file instead of a temporary one")
+    parser.add_argument("--binary", action="store_true", help="save in the binary format")
+    args = parser.parse_args(argv)
+
+    moment = time.perf_counter()
+    results = simulate(args.days, args.habits, args.every, args.probability, args.seed, args.file, args.binary)
+    table_data = [[result["day"], result["checks"], round(result["size"] / 1024), f"{result['save'] * 1000:.1f}",
+                   f"{result['load'] * 1000:.1f}", f"{result['analyse'] * 1000:.1f}"] for result in results]
+    display.print_table(table_data, ["Day", "Checks", "Size (KB)", "Save (ms)", "Load (ms)", "Analyse (ms)"])
+    print(f"\nSimulated {args.days} days of {args.habits} habits in {time.perf_counter() - moment:.1f} s.")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,667 @@
-import json
-
-from manage import Habit 
-
-class HabitsStore():
-    """ 
-    A class to handle saving and loading habits to and from a JSON file. 
-    """
-    DEFAULT_FILENAME = "habits.json"
-    
-    def save(self, habits, filename = DEFAULT_FILENAME):
-        """ 
-        Saves the current list of habits to a JSON file. 
-        
-        Parameters: 
-        habits (list): A list of Habit objects to be saved. 
-        filename (str): The name of the file to save the habits to. Defaults to "habits.json". 
-        """
-        with open(filename, 'w') as file:
-            json.dump([habit.__dict__ for habit in habits], file, indent=4)
-
-    def load(self, filename = DEFAULT_FILENAME):
-        """ 
-        Loads habits from a JSON file. 
-        
-        Parameters: 
-        filename (str): The name of the file to load the habits from. Defaults to "habits.json". 
-        
-        Returns: 
-        list: A list of Habit objects. 
-        """
-        try:
-            with open(filename, 'r') as file:
-                habits_data = json.load(file) 
-                return [Habit(**habit) for habit in habits_data]
-        except FileNotFoundError:
-            return []
\ No newline at end of file
+from array import array
+from contextlib import closing
+import json
+import os
+import re
+import struct
+import sys
+
+import manage
+from manage import DateList, Habit, HabitCollection 
+
+class HabitsStore():
+    """ 
+    A class to handle saving and loading habits to and from a JSON file 
+    or, optionally, a compact binary file. The format is detected automatically when loading. 
+    """
+    DEFAULT_FILENAME = "habits.json"
+    CHUNK_SIZE = 64 * 1024  # Characters read at once by stream()
+
+    SEPARATOR = re.compile(r'[\s,]*')
+    STRUCTURE = re.compile(r'["{}\[]')  # Characters which have to be looked at to find the end of a habit
+    STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+    DATE_LIST = re.compile(r'"(date_check|date_interruptions)"\s*:\s*\[([^\]]*)\]')
+
+    # Binary format: header, then per habit the fixed part, the name, custom values and both date arrays
+    BINARY_MAGIC = b"HBT\x01"
+    BINARY_HEADER = struct.Struct("<4sI")  # magic, number of habits
+    BINARY_HABIT = struct.Struct("<iiiiiiBBBHII")  # id, target, streak, streak_max, date_create, deadline, period, category, 
+                                                   # status, length of name, number of checks, number of interruptions
+    BINARY_CUSTOM = 255  # Code of values which are not part of the enum and follow as plain value
+    BINARY_PERIODS = [1, 2, 7]
+
+    def __init__(self, binary = False):
+        """ 
+        Initializes a HabitsStore object with an empty cache of serialized habits. 
+        
+        Parameters: 
+        binary (bool): If True, save() writes the compact binary format instead of JSON. 
+        """
+        self.binary = binary
+        self.fragments = {}  # Habit ID -> (Habit, serialized JSON text of the habit)
+    
+    def save(self, habits, filename = DEFAULT_FILENAME):
+        """ 
+        Saves the current list of habits to a JSON file. 
+        Only habits which are dirty or not serialized yet are converted to JSON, all others are taken from the cache. 
+        This only saves the serialization: the whole file is still written, so a save costs O(n) for n habits. 
+        JournaledHabitsStore appends only the changes and is the store whose saves do not grow with the number of habits. 
+        Habits whose date lists are still unparsed text are not cached, as the text is kept by the lists already 
+        and serializing them costs little. 
+        The file is written to a temporary file first and then renamed, so an interrupted save never leaves a broken file. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to be saved. 
+        filename (str): The name of the file to save the habits to. Defaults to "habits.json". 
+        """
+        for habit_id in habits.tombstones:
+            self.fragments.pop(habit_id, None)
+        habits.tombstones.clear()
+
+        if self.binary:
+            self.write_atomic(filename, self.encode(habits))
+            return
+
+        texts = []
+        for habit in habits:
+            cached = self.fragments.get(habit.id)
+            if habit.dirty or cached is None or cached[0] is not habit:
+                cached = (habit, self.serialize(habit))
+                if habit.date_check.unparsed() is None and habit.date_interruptions.unparsed() is None:
+                    self.fragments[habit.id] = cached
+                else:
+                    self.fragments.pop(habit.id, None)
+                habit.dirty = False
+            texts.append(cached[1])
+
+        self.write_atomic(filename, "[\n" + ",\n".join(texts) + "\n]" if texts else "[]")
+
+    @staticmethod
+    def serialize(habit):
+        """ 
+        Converts a habit to JSON text, formatted as element of the saved list. 
+        Date lists which were loaded lazily and not read since are written as the JSON text they were loaded from. 
+        
+        Parameters: 
+        habit (Habit): The habit to serialize. 
+        
+        Returns: 
+        str: The JSON text of the habit. 
+        """
+        habit_data = {}
+        unparsed = {}
+        for field in manage.FIELDS:
+            value = getattr(habit, field)
+            if field in manage.LIST_FIELDS:
+                unparsed[field] = value.unparsed()
+                value = None if unparsed[field] is not None else list(value)
+            habit_data[field] = value
+        text = "    " + json.dumps(habit_data, indent=4).replace("\n", "\n    ")
+        for field, source in unparsed.items():
+            if source is not None:  # Quotes in strings are escaped, so only the key itself can match
+                text = text.replace(f'"{field}": null', f'"{field}": [{source}]', 1)
+        return text
+
+    @staticmethod
+    def write_atomic(filename, text):
+        """ 
+        Writes the text to a temporary file and renames it to the target file afterwards. 
+        
+        Parameters: 
+        filename (str): The name of the target file. 
+        text (str or bytes): The content of the file. 
+        """
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, 'wb' if isinstance(text, bytes) else 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, filename)
+
+    def load(self, filename = DEFAULT_FILENAME, lazy = False):
+        """ 
+        Loads habits from a JSON file. 
+        
+        Parameters: 
+        filename (str): The name of the file to load the habits from. Defaults to "habits.json". 
+        lazy (bool): If True, a JSON file is streamed by stream() and the date lists are parsed on first access. 
+        
+        Returns: 
+        HabitCollection: The loaded habits. 
+        """
+        try:
+            with open(filename, 'rb') as file:
+                if file.read(len(self.BINARY_MAGIC)) == self.BINARY_MAGIC:
+                    return HabitCollection(self.decode(file.read()))
+            if lazy:
+                return HabitCollection(self.stream(filename))
+            with open(filename, 'r') as file:
+                habits_data = json.load(file) 
+                return HabitCollection(Habit(**habit) for habit in habits_data)
+        except FileNotFoundError:
+            return HabitCollection()
+
+    def stream(self, filename = DEFAULT_FILENAME):
+        """ 
+        Reads the habits of a JSON file one at a time, without loading the whole file. 
+        The lists date_check and date_interruptions are not parsed but handed over to the Habit as JSON text, 
+        which is parsed only when an analysis or display reads them. The text of the date lists is written back 
+        by serialize() as long as they are not read, so saving unchanged habits again parses no dates. 
+        
+        Parameters: 
+        filename (str): The name of the file to load the habits from. Defaults to "habits.json". 
+        
+        Yields: 
+        Habit: The next habit of the file. 
+        """
+        with open(filename, 'r') as file:
+            buffer = file.read(self.CHUNK_SIZE).lstrip()
+            if not buffer.startswith("["):
+                raise ValueError(f"{filename} does not contain a list of habits.")
+            position = 1
+
+            while True:
+                position = self.SEPARATOR.match(buffer, position).end()
+                if buffer.startswith("]", position):
+                    return
+                end = self.find_record_end(buffer, position)
+                if end is None:
+                    chunk = file.read(max(self.CHUNK_SIZE, len(buffer)))  # Grows with records larger than a chunk
+                    if not chunk:
+                        if position < len(buffer):
+                            raise ValueError(f"{filename} contains an invalid habit at '{buffer[position:position + 30]}'.")
+                        raise ValueError(f"{filename} ends unexpectedly.")
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+
+                text = buffer[position:end]
+                position = end
+                yield Habit(**self.parse_lazy(text))
+
+    def find_record_end(self, buffer, position):
+        """ 
+        Finds the end of the habit object starting at the given position. 
+        Lists are skipped as a whole, as they only contain dates. 
+        
+        Parameters: 
+        buffer (str): The text read so far. 
+        position (int): The position of the habit object in the buffer. 
+        
+        Returns: 
+        int: The position after the habit object or None, if it is not complete in the buffer. 
+        """
+        if position >= len(buffer):  # The chunk ended right before the habit
+            return None
+        if not buffer.startswith("{", position):
+            raise ValueError(f"Invalid habit at '{buffer[position:position + 30]}'.")
+        position += 1
+        while True:
+            match = self.STRUCTURE.search(buffer, position)
+            if match is None:
+                return None
+            char = match.group()
+            if char == '"':
+                match = self.STRING_REST.match(buffer, match.end())
+                if match is None:
+                    return None
+                position = match.end()
+            elif char == "[":
+                position = buffer.find("]", match.end()) + 1
+                if position == 0:
+                    return None
+            elif char == "}":
+                return match.end()
+            else:
+                raise ValueError(f"Invalid habit at '{buffer[position:position + 30]}'.")
+
+    def parse_lazy(self, text):
+        """ 
+        Parses the JSON text of one habit, but keeps the content of the date lists as unparsed text. 
+        
+        Parameters: 
+        text (str): The JSON text of the habit. 
+        
+        Returns: 
+        dict: The attributes of the habit. 
+        """
+        date_lists = {}
+        def keep_date_list(match):
+            date_lists[match.group(1)] = match.group(2)
+            return f'"{match.group(1)}": null'
+        habit_data = json.loads(self.DATE_LIST.sub(keep_date_list, text))
+        habit_data.update(date_lists)
+        return habit_data
+
+    def encode(self, habits):
+        """ 
+        Converts habits to the binary format. Check timestamps are packed as seconds since 1970, 
+        all other dates as day ordinals, period, category and status as enum codes. 
+        Raises an OverflowError for check timestamps before 1970. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to convert. 
+        
+        Returns: 
+        bytes: The binary content of the file. 
+        """
+        parts = [self.BINARY_HEADER.pack(self.BINARY_MAGIC, len(habits))]
+        for habit in habits:
+            name = habit.name.encode("utf-8")
+            codes = []
+            custom = b""
+            for value, enum in [(habit.period, self.BINARY_PERIODS), (habit.category, manage.CATEGORIES), (habit.status, manage.STATUS_LIST)]:
+                if value in enum:
+                    codes.append(enum.index(value))
+                else:
+                    codes.append(self.BINARY_CUSTOM)
+                    custom += struct.pack("<i", value) if isinstance(value, int) else self.pack_text(value)
+
+            checks = array("I", habit.date_check.numbers)
+            interruptions = array("I", habit.date_interruptions.numbers)
+            if sys.byteorder == "big":
+                checks.byteswap()
+                interruptions.byteswap()
+
+            parts.append(self.BINARY_HABIT.pack(habit.id, habit.target, habit.streak, habit.streak_max, 
+                                                habit.date_create_ordinal, habit.deadline_ordinal, 
+                                                *codes, len(name), len(checks), len(interruptions)))
+            parts.extend([name, custom, checks.tobytes(), interruptions.tobytes()])
+        return b"".join(parts)
+
+    def decode(self, data):
+        """ 
+        Converts the binary format back to habits. Expects the content of the file without the magic bytes. 
+        
+        Parameters: 
+        data (bytes): The binary content of the file after the magic bytes. 
+        
+        Returns: 
+        list: A list of Habit objects. 
+        """
+        data = memoryview(data)
+        (count,) = struct.unpack_from("<I", data, 0)
+        offset = 4
+        habits = []
+        for _ in range(count):
+            (id, target, streak, streak_max, date_create, deadline, period_code, category_code, status_code, 
+             name_length, check_count, interruption_count) = self.BINARY_HABIT.unpack_from(data, offset)
+            offset += self.BINARY_HABIT.size
+            name = bytes(data[offset:offset + name_length]).decode("utf-8")
+            offset += name_length
+
+            if period_code == self.BINARY_CUSTOM:
+                (period,) = struct.unpack_from("<i", data, offset)
+                offset += 4
+            else:
+                period = self.BINARY_PERIODS[period_code]
+            values = []
+            for code, enum in [(category_code, manage.CATEGORIES), (status_code, manage.STATUS_LIST)]:
+                if code == self.BINARY_CUSTOM:
+                    value, offset = self.unpack_text(data, offset)
+                else:
+                    value = enum[code]
+                values.append(value)
+            category, status = values
+
+            dates = []
+            for length in [check_count, interruption_count]:
+                numbers = array("I")
+                numbers.frombytes(data[offset:offset + length * numbers.itemsize])
+                if sys.byteorder == "big":
+                    numbers.byteswap()
+                offset += length * numbers.itemsize
+                dates.append(numbers)
+            checks, interruptions = dates
+
+            habit = Habit(id, name, category, period, target, streak, streak_max, 
+                          date_check=DateList(checks, timestamps=True), status=status, 
+                          date_interruptions=DateList(interruptions, timestamps=False))
+            habit.date_create_ordinal = date_create
+            habit.deadline_ordinal = deadline
+            habits.append(habit)
+        return habits
+
+    def convert(self, source, target, binary = True):
+        """ 
+        Converts a habits file from JSON to the binary format or the other way round. The conversion is lossless. 
+        
+        Parameters: 
+        source (str): The file to convert, in any of both formats. 
+        target (str): The file to write. 
+        binary (bool): If True, the target is written in the binary format, otherwise as JSON. 
+        """
+        HabitsStore(binary).save(self.load(source), target)
+
+    @staticmethod
+    def pack_text(text):
+        """ 
+        Packs a text as length followed by its UTF-8 bytes. 
+        
+        Parameters: 
+        text (str): The text to pack. 
+        
+        Returns: 
+        bytes: The packed text. 
+        """
+        encoded = text.encode("utf-8")
+        return struct.pack("<H", len(encoded)) + encoded
+
+    @staticmethod
+    def unpack_text(data, offset):
+        """ 
+        Unpacks a text packed by pack_text(). 
+        
+        Parameters: 
+        data (memoryview): The binary data. 
+        offset (int): The position of the packed text. 
+        
+        Returns: 
+        tuple: The text and the position after it. 
+        """
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+class JournaledHabitsStore(HabitsStore):
+    """ 
+    A JSON store that appends every change of a habit to a journal file instead of rewriting the 
+    whole JSON file after each action. The JSON file serves as snapshot, the journal is replayed 
+    on top of it when loading and folded back into the snapshot once it grows past a threshold. 
+    """
+    JOURNAL_SUFFIX = ".journal"
+    COMPACT_THRESHOLD = 1024 * 1024  # Size of the journal in bytes which triggers the compaction
+
+    def __init__(self, compact_threshold = COMPACT_THRESHOLD, binary = False):
+        """ 
+        Initializes a JournaledHabitsStore object. 
+        
+        Parameters: 
+        compact_threshold (int): The journal size in bytes after which save() compacts the journal into the snapshot. 
+        binary (bool): If True, the snapshot is written in the binary format. 
+        """
+        super().__init__(binary)
+        self.compact_threshold = compact_threshold
+        self.pending = []
+        self.collection = None  # The habits loaded last, whose changes are recorded
+
+    def record(self, event, habit, changes):
+        """ 
+        Listener for HabitCollection.notify(). Keeps the change as journal line until the next save. 
+        The line is serialized right away, so later changes of the habit do not alter it. 
+        
+        Parameters: 
+        event (str): The kind of change. 
+        habit (Habit): The changed habit. 
+        changes (dict): The new values of the changed attributes. 
+        """
+        self.pending.append(json.dumps({"event": event, "id": habit.id, "changes": changes}) + "\n")
+
+    def save(self, habits, filename = HabitsStore.DEFAULT_FILENAME):
+        """ 
+        Appends all changes since the last save to the journal. The cost only depends on the number of 
+        changes, not on the number of habits. Compacts the journal if it exceeds the threshold. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to be saved. 
+        filename (str): The name of the snapshot file. Defaults to "habits.json". 
+        """
+        if not os.path.exists(filename):
+            self.compact(habits, filename)
+            return
+
+        journal_filename = filename + self.JOURNAL_SUFFIX
+        if self.pending:
+            with open(journal_filename, 'a') as file:
+                file.writelines(self.pending)
+            self.pending = []
+
+        if os.path.exists(journal_filename) and os.path.getsize(journal_filename) > self.compact_threshold:
+            self.compact(habits, filename)
+
+    def compact(self, habits, filename = HabitsStore.DEFAULT_FILENAME):
+        """ 
+        Writes all habits into the snapshot and removes the journal. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to be saved. 
+        filename (str): The name of the snapshot file. Defaults to "habits.json". 
+        """
+        super().save(habits, filename)
+        self.pending = []
+        if os.path.exists(filename + self.JOURNAL_SUFFIX):
+            os.remove(filename + self.JOURNAL_SUFFIX)
+
+    def load(self, filename = HabitsStore.DEFAULT_FILENAME, lazy = False):
+        """ 
+        Loads the snapshot, replays the journal on top of it and starts recording the changes of the habits. 
+        
+        Parameters: 
+        filename (str): The name of the snapshot file. Defaults to "habits.json". 
+        lazy (bool): If True, the snapshot is streamed and the date lists are parsed on first access. 
+        
+        Returns: 
+        HabitCollection: The loaded habits. 
+        """
+        habits = super().load(filename, lazy)
+        try:
+            with open(filename + self.JOURNAL_SUFFIX, 'r') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # Incomplete last line after a crash while writing
+                        break
+                    habit = habits.get(entry["id"])
+                    if entry["event"] == "add":
+                        if habit is not None:
+                            habits.remove(habit)
+                        habits.append(Habit(**entry["changes"]))
+                    elif habit is None:
+                        continue
+                    elif entry["event"] == "delete":
+                        habits.remove(habit)
+                    else:
+                        habit.apply(entry["changes"])
+                        habit.dirty = True  # The cached text of the snapshot is outdated now
+        except FileNotFoundError:
+            pass
+
+        self.close()
+        habits.listeners.append(self.record)
+        self.collection = habits
+        return habits
+
+    def close(self):
+        """ 
+        Stops recording the changes of the habits loaded last. 
+        """
+        if self.collection is not None and self.record in self.collection.listeners:
+            self.collection.listeners.remove(self.record)
+        self.collection = None
+
+class SQLiteHabitsStore():
+    """ 
+    A class to handle saving and loading habits to and from a SQLite database. 
+    Offers the same save / load interface as HabitsStore, but keeps the check and interruption 
+    history in separate tables and indexes the columns used for filtering.
+    """
+    DEFAULT_FILENAME = "habits.db"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS habits (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            period INTEGER NOT NULL,
+            target INTEGER NOT NULL,
+            streak INTEGER NOT NULL,
+            streak_max INTEGER NOT NULL,
+            date_create TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            status TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS checks (
+            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+            date_check TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS interruptions (
+            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+            date_interruption TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_habits_status ON habits(status);
+        CREATE INDEX IF NOT EXISTS idx_habits_period ON habits(period);
+        CREATE INDEX IF NOT EXISTS idx_habits_category ON habits(category);
+        CREATE INDEX IF NOT EXISTS idx_habits_deadline ON habits(deadline);
+        CREATE INDEX IF NOT EXISTS idx_checks_habit ON checks(habit_id);
+        CREATE INDEX IF NOT EXISTS idx_interruptions_habit ON interruptions(habit_id);
+    """
+
+    HABIT_COLUMNS = ["id", "name", "category", "period", "target", "streak", "streak_max", "date_create", "deadline", "status"]
+
+    def __init__(self):
+        """ 
+        Initializes a SQLiteHabitsStore object. 
+        """
+        self.synced = {}  # Database file -> {Habit ID: Habit} of the habits which are stored unchanged in the database
+
+    def connect(self, filename = DEFAULT_FILENAME):
+        """ 
+        Opens a connection to the database and creates the tables and indexes if they do not exist yet. 
+        
+        Parameters: 
+        filename (str): The name of the database file. Defaults to "habits.db". 
+        
+        Returns: 
+        sqlite3.Connection: The open connection. 
+        """
+        import sqlite3  # deferred, so that the JSON stores start without it
+
+        connection = sqlite3.connect(filename)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def save(self, habits, filename = DEFAULT_FILENAME):
+        """ 
+        Saves the current list of habits to the database within one transaction. 
+        If habits were loaded from, selected from or saved to this database before, only dirty habits are written 
+        and the rows of deleted habits (tombstones) are removed, so the rows of habits outside a selection are kept. 
+        Otherwise all rows are replaced. 
+        
+        Parameters: 
+        habits (HabitCollection): The habits to be saved. 
+        filename (str): The name of the database file. Defaults to "habits.db". 
+        """
+        synced = self.synced.get(filename)
+        with closing(self.connect(filename)) as connection, connection:
+            if synced is None:
+                connection.execute("DELETE FROM checks")
+                connection.execute("DELETE FROM interruptions")
+                connection.execute("DELETE FROM habits")
+                synced = {}
+                changed = list(habits)
+            else:
+                deleted = [(habit_id,) for habit_id in habits.tombstones if synced.pop(habit_id, None) is not None]
+                connection.executemany("DELETE FROM habits WHERE id = ?", deleted)
+                changed = [habit for habit in habits if habit.dirty or synced.get(habit.id) is not habit]
+
+            connection.executemany(
+                f"INSERT OR REPLACE INTO habits ({', '.join(self.HABIT_COLUMNS)}) VALUES ({', '.join('?' * len(self.HABIT_COLUMNS))})",
+                ([getattr(habit, column) for column in self.HABIT_COLUMNS] for habit in changed))
+            connection.executemany("DELETE FROM checks WHERE habit_id = ?", ((habit.id,) for habit in changed))
+            connection.executemany("DELETE FROM interruptions WHERE habit_id = ?", ((habit.id,) for habit in changed))
+            connection.executemany(
+                "INSERT INTO checks (habit_id, date_check) VALUES (?, ?)",
+                ((habit.id, date) for habit in changed for date in habit.date_check))
+            connection.executemany(
+                "INSERT INTO interruptions (habit_id, date_interruption) VALUES (?, ?)",
+                ((habit.id, date) for habit in changed for date in habit.date_interruptions))
+
+        for habit in changed:
+            synced[habit.id] = habit
+            habit.dirty = False
+        habits.tombstones.clear()
+        self.synced[filename] = synced
+
+    def load(self, filename = DEFAULT_FILENAME):
+        """ 
+        Loads all habits from the database. 
+        
+        Parameters: 
+        filename (str): The name of the database file. Defaults to "habits.db". 
+        
+        Returns: 
+        HabitCollection: The loaded habits. 
+        """
+        self.synced.pop(filename, None)  # Habits of earlier loads and selections are replaced by these
+        return self.select(filename)
+
+    def select(self, filename = DEFAULT_FILENAME, status = None, period = None, category = None, deadline_before = None):
+        """ 
+        Loads the habits matching the given criteria. The criteria are answered by the indexes on 
+        status, period, category and deadline, so only matching habits and their history are read. 
+        The selected habits are registered as stored, so saving them afterwards only writes their changes. 
+        
+        Parameters: 
+        filename (str): The name of the database file. Defaults to "habits.db". 
+        status (str): Only habits with this status. Ignored if None. 
+        period (int): Only habits with this period. Ignored if None. 
+        category (str): Only habits in this category. Ignored if None. 
+        deadline_before (str): Only habits with a deadline before this date (YYYY-MM-DD). Ignored if None. 
+        
+        Returns: 
+        HabitCollection: The loaded habits. 
+        """
+        if not os.path.exists(filename):
+            return HabitCollection()
+
+        conditions = []
+        parameters = []
+        for column, value in [("status", status), ("period", period), ("category", category)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if deadline_before is not None:
+            conditions.append("deadline < ?")
+            parameters.append(deadline_before)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with closing(self.connect(filename)) as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(self.HABIT_COLUMNS)} FROM habits{where} ORDER BY id", parameters).fetchall()
+            habits_data = {row[0]: dict(zip(self.HABIT_COLUMNS, row), date_check=[], date_interruptions=[]) for row in rows}
+
+            selection = f" WHERE habit_id IN (SELECT id FROM habits{where})" if conditions else ""
+            for habit_id, date in connection.execute(
+                    f"SELECT habit_id, date_check FROM checks{selection} ORDER BY rowid", parameters):
+                habits_data[habit_id]["date_check"].append(date)
+            for habit_id, date in connection.execute(
+                    f"SELECT habit_id, date_interruption FROM interruptions{selection} ORDER BY rowid", parameters):
+                habits_data[habit_id]["date_interruptions"].append(date)
+
+        habits = HabitCollection(Habit(**habit) for habit in habits_data.values())
+        self.synced.setdefault(filename, {}).update((habit.id, habit) for habit in habits)
+        return habits
+
+    def migrate(self, json_filename = HabitsStore.DEFAULT_FILENAME, filename = DEFAULT_FILENAME):
+        """ 
+        One-shot migration of an existing JSON file into the database. 
+        Nothing happens if the database already contains habits, so it is safe to call on every start. 
+        The JSON file is left untouched. 
+        
+        Parameters: 
+        json_filename (str): The JSON file to migrate. Defaults to "habits.json". 
+        filename (str): The name of the database file. Defaults to "habits.db". 
+        
+        Returns: 
+        int: The number of migrated habits. 
+        """
+        if os.path.exists(filename):
+            with closing(self.connect(filename)) as connection:
+                if connection.execute("SELECT 1 FROM habits LIMIT 1").fetchone():
+                    return 0
+
+        habits = HabitsStore().load(json_filename)
+        if habits:
+            self.save(habits, filename)
+        return len(habits)
@@ -0,0 +1,159 @@
+import manage
+
+DERIVED_FIELDS = ["streak", "streak_max", "status", "date_interruptions"]
+
+def recompute(habit, today = None):
+    """
+    Derives streak, max streak, status, deadline and interruptions of a habit from its checks and period alone,
+    in one sweep over the sorted check timestamps.
+    The rules are those of Habit.check() and Habit.update(): a check keeps the streak if it is made at the latest
+    on the deadline, which is the day of the previous check (or the creation) plus the period. Otherwise the habit
+    was broken in between and the streak starts again. The habit is established once the streak reaches the target.
+    The day of an interruption depends on when the tracker was started, so stored interruptions which lie between a
+    missed deadline and the next check are kept. A gap without any gets the day after the missed deadline,
+    interruptions outside of all gaps are dropped.
+
+    Parameters:
+    habit (Habit): The habit to recompute. It is not changed.
+    today (int): The day ordinal up to which the habit is evaluated, later checks are ignored. Defaults to today.
+
+    Returns:
+    dict: The derived values of "streak", "streak_max", "status", "deadline" (day ordinal)
+          and "date_interruptions" (sorted list of day ordinals).
+
+    Used by: streaks.verify() and streaks.state_at()
+    """
+    if today is None:
+        today = manage.clock.now().toordinal()
+    stored = sorted(habit.date_interruptions.numbers)
+    interruptions = []
+    position = 0
+    streak = streak_max = 0
+    status = "Active"
+    deadline = habit.date_create_ordinal + habit.period
+
+    for seconds in sorted(habit.date_check.numbers):
+        day = manage.EPOCH_ORDINAL + seconds // manage.DAY
+        if day > today:  # Checks after the evaluated day, see state_at()
+            break
+        if day > deadline:
+            position = fill_gap(stored, position, deadline + 1, day, interruptions)
+            streak = 0
+        streak += 1
+        if streak > streak_max:
+            streak_max = streak
+        deadline = day + habit.period
+        if streak >= habit.target:
+            status = "Established"
+            break
+
+    if status != "Established" and deadline < today:
+        fill_gap(stored, position, deadline + 1, today, interruptions)
+        streak = 0
+        status = "Broken"
+    return dict(streak=streak, streak_max=streak_max, status=status, deadline=deadline, date_interruptions=interruptions)
+
+def fill_gap(stored, position, first, last, interruptions):
+    """
+    Adds the interruptions of one gap between a missed deadline and the next check (or today).
+
+    Parameters:
+    stored (list): The sorted day ordinals of the stored interruptions.
+    position (int): The first stored interruption which was not looked at yet.
+    first (int): The first day of the gap, the day after the missed deadline.
+    last (int): The last day of the gap.
+    interruptions (list): The derived interruptions, extended in place.
+
+    Returns:
+    int: The position of the first stored interruption after the gap.
+
+    Used by: streaks.recompute()
+    """
+    while position < len(stored) and stored[position] < first:
+        position += 1
+    start = position
+    while position < len(stored) and stored[position] <= last:
+        position += 1
+    if position > start:
+        interruptions.extend(stored[start:position])
+    else:
+        interruptions.append(first)
+    return position
+
+def verify(habits, ids = None, today = None, repair = False):
+    """
+    Recomputes the habits from their checks and reports all stored values which disagree.
+
+    Parameters:
+    habits (HabitCollection): The collection of current habits.
+    ids (list): The IDs of the habits to verify. Defaults to all habits.
+    today (int): The day ordinal up to which the habits are evaluated. Defaults to today.
+    repair (bool): If True, the derived values replace the stored ones, so the store saves them.
+
+    Returns:
+    list: One tuple (habit ID, field, stored value, derived value) per disagreement, dates as strings.
+    """
+    if today is None:
+        today = manage.clock.now().toordinal()
+    selected = habits if ids is None else [habits.get(habit_id) for habit_id in ids if habits.get(habit_id) is not None]
+
+    disagreements = []
+    for habit in selected:
+        derived = recompute(habit, today)
+        changes = {}
+        for field in DERIVED_FIELDS:
+            if field == "date_interruptions":
+                stored = sorted(habit.date_interruptions.numbers)
+                if stored != derived[field]:
+                    changes[field] = [manage.from_ordinal(day) for day in derived[field]]
+                    disagreements.append((habit.id, field, [manage.from_ordinal(day) for day in stored], changes[field]))
+            elif getattr(habit, field) != derived[field]:
+                changes[field] = derived[field]
+                disagreements.append((habit.id, field, getattr(habit, field), derived[field]))
+
+        if repair and changes:
+            for field, value in changes.items():
+                setattr(habit, field, value)
+            habits.notify("repair", habit, changes)
+    return disagreements
+
+def history(habit):
+    """
+    Returns the life of a habit as stream of events in chronological order, rebuilt from its stored dates.
+    Interruptions of the same day come before the check which ends them.
+
+    Parameters:
+    habit (Habit): The habit.
+
+    Returns:
+    list: Tuples (day ordinal, event, moment) with the events "created", "interrupted" and "checked"
+          and the moment of the event as stored (date or date and time).
+    """
+    events = [(habit.date_create_ordinal, 0, "created", habit.date_create)]
+    events.extend((day, 1, "interrupted", manage.from_ordinal(day)) for day in habit.date_interruptions.numbers)
+    events.extend((manage.EPOCH_ORDINAL + seconds // manage.DAY, 2, "checked", manage.from_timestamp(seconds)) 
+                  for seconds in habit.date_check.numbers)
+    events.sort()
+    return [(day, event, moment) for day, _, event, moment in events]
+
+def state_at(habit, day):
+    """
+    Reconstructs the state of a habit at the end of a past day by replaying the checks of its history() up to that day.
+    Name, category, period and target are the current ones, as adjustments are not part of the stored history.
+
+    Parameters:
+    habit (Habit): The habit. It is not changed.
+    day (str): The day (YYYY-MM-DD).
+
+    Returns:
+    Habit: A new habit with the checks, interruptions, streaks, status and deadline of that day,
+           or None if the habit did not exist yet.
+    """
+    today = manage.to_ordinal(day)
+    if today < habit.date_create_ordinal:
+        return None
+    derived = recompute(habit, today)
+    checks = [moment for event_day, event, moment in history(habit) if event == "checked" and event_day <= today]
+    return manage.Habit(habit.id, habit.name, habit.category, habit.period, habit.target, derived["streak"], derived["streak_max"], 
+                        habit.date_create, checks, manage.from_ordinal(derived["deadline"]), derived["status"], 
+                        [manage.from_ordinal(interruption) for interruption in derived["date_interruptions"]])
@@ -1,446 +1,1339 @@
-from datetime import datetime, timedelta
-import json
-import os
-from unittest.mock import patch, MagicMock
-
-import pytest
-
-from analyse import Analyse
-import manage
-from manage import Habit
-from store import HabitsStore
-from display import display_habits, filter_habits
-
-def create_test_file(file_path):
-    """ 
-    Creates a test JSON file with sample habit data. 
-    Parameters: 
-    file_path (str): The path where the test file will be created. 
-    
-    The function generates sample habit data for testing purposes, including all Habit attributes.
-    The generated data is written to a JSON file specified by the file_path parameter. 
-        ID 1: Active / Daily / No Issues.
-        ID 2: Active / Every two days / No Issues.
-        ID 3: Established / Weekly / No Issues.
-        ID 4: Broken / Every two days / Interruption.
-        ID 5: Broken / Daily / Interruption.
-    """
-    now = datetime.now()
-    four_weeks_ago = now - timedelta(days=28)
-
-    TEST_DATA = [
-        {"id": 1, "name": "Exercise", "category": "Health", "period": 1, "target": 28, "streak": 27, "streak_max": 27, 
-         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
-         "date_check": [(four_weeks_ago + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 27)], 
-         "deadline": (four_weeks_ago + timedelta(days=28)).strftime("%Y-%m-%d"), "status": "Active", 
-         "date_interruptions": []},
-
-        {"id": 2, "name": "Read Book", "category": "Education", "period": 2, "target": 28, "streak": 14, "streak_max": 14, 
-         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
-         "date_check": [(four_weeks_ago + timedelta(days=i*2)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 14)], 
-         "deadline": (four_weeks_ago + timedelta(days=(14 * 2))).strftime("%Y-%m-%d"), "status": "Active", 
-         "date_interruptions": []},
-
-        {"id": 3, "name": "Meditation", "category": "Wellness", "period": 7, "target": 4, "streak": 4, "streak_max": 4, 
-         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
-         "date_check": [(four_weeks_ago + timedelta(days=i*7)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 4)], 
-         "deadline": (four_weeks_ago + timedelta(days=3*7)).strftime("%Y-%m-%d"), "status": "Established", 
-         "date_interruptions": []},
-
-        {"id": 4, "name": "Cooking", "category": "Lifestyle", "period": 2, "target": 6, "streak": 2, "streak_max": 2, 
-         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
-         "date_check": [(four_weeks_ago + timedelta(days=i*2)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 2)], 
-         "deadline": (four_weeks_ago + timedelta(days=(2 * 2))).strftime("%Y-%m-%d"), "status": "Broken", 
-         "date_interruptions": [(four_weeks_ago + timedelta(days=(2 * 2) + 2)).strftime("%Y-%m-%d")]},
-
-        {"id": 5, "name": "Yoga", "category": "Fitness", "period": 1, "target": 7, "streak": 3, "streak_max": 3, 
-         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
-         "date_check": [(four_weeks_ago + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 3)], 
-         "deadline": (four_weeks_ago + timedelta(days=3)).strftime("%Y-%m-%d"), "status": "Active", 
-         "date_interruptions": [(four_weeks_ago + timedelta(days=3)).strftime("%Y-%m-%d")]}
-    ]
-
-    with open(file_path, 'w') as file:
-        json.dump(TEST_DATA, file, indent=4)
-
-
-   
-@pytest.fixture
-def sample_habits():
-    """
-    Fixture to create and load sample habits from a test JSON file.
-
-    This fixture creates a test file with sample habit data, loads the habits using
-    the HabitsStore class, yields the loaded habits for testing, and removes the
-    test file after the test is completed.
-
-    Returns:
-    list: A list of Habit objects loaded from the test file.
-    """
-    create_test_file('test_habits.json')
-    store = HabitsStore()
-    habits = store.load('test_habits.json')
-    yield habits
-    os.remove('test_habits.json')
-
-def test_save_habits(sample_habits, test_file_path="test_habits_save.json"):
-    """
-    Tests the save function by saving the current state of habits to a test file
-    and verifying the saved data.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects to be saved.
-    test_file_path (str): The path to the test file where the habits will be saved.
-                          Defaults to "test_habits_save.json".
-
-    The function saves the habits to the specified test file, loads the saved data 
-    and asserts that the loaded data matches the original sample habits. The test file will be deleted after use.
-    """
-    store = HabitsStore()
-    store.save(sample_habits, test_file_path)
-    with open(test_file_path, 'r') as file:
-        loaded_data = json.load(file)
-    assert len(loaded_data) == 5
-    assert loaded_data[0]['name'] == "Exercise"
-    assert loaded_data[1]['name'] == "Read Book"
-    assert loaded_data[2]['name'] == "Meditation"
-    assert loaded_data[3]['name'] == "Cooking"
-    assert loaded_data[4]['name'] == "Yoga"
-    os.remove('test_habits_save.json')
-
-def test_load_habits(sample_habits):
-    """
-    Tests the load function by verifying the loaded sample habits.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function asserts that the loaded sample habits match the expected habit data.
-    """
-    assert len(sample_habits) == 5
-    assert sample_habits[0].name == "Exercise"
-    assert sample_habits[1].name == "Read Book"
-    assert sample_habits[2].name == "Meditation"
-    assert sample_habits[3].name == "Cooking"
-    assert sample_habits[4].name == "Yoga"
-
-def test_update_habit_status(sample_habits):
-    """
-    Tests the update function by verifying the status and streak updates of sample habits.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function asserts that the status and streak of the sample habits are correctly updated
-    based on their deadlines. It verifies if the statuses are set to "Broken" or "Active" and
-    if the streaks and interruptions are correctly updated.
-    """
-    habit1 = sample_habits[0]
-    habit5 = sample_habits[4]
-
-    Habit.update(sample_habits)
-
-    now = datetime.now().strftime("%Y-%m-%d")
-
-    assert habit1.status == "Active"
-    assert habit1.streak == 27
-    assert now not in habit1.date_interruptions
-
-    assert habit5.status == "Broken"
-    assert habit5.streak == 0
-    assert now in habit5.date_interruptions
-
-@patch('questionary.text')
-@patch('questionary.select')
-@patch('questionary.confirm')
-def test_add_habit(mock_confirm, mock_select, mock_text, sample_habits):
-    """
-    Tests the add function by mocking user inputs and verifying the addition of a new habit.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user inputs to add a new habit and asserts that the new habit
-    is correctly added to the sample habits list with the expected attributes.
-    """
-    mock_text.return_value.ask.side_effect = ["New Habit Name", 5]
-    mock_select.return_value.ask.side_effect = ["Health", "Daily"]
-    mock_confirm.return_value.ask.return_value = True
-
-    initial_count = len(sample_habits)
-    Habit.add(sample_habits)
-    
-    assert len(sample_habits) == initial_count + 1
-    assert sample_habits[-1].name == "New Habit Name"
-    assert sample_habits[-1].category == "Health"
-    assert sample_habits[-1].period == manage.PERIOD_MAPPING["Daily"]
-    assert sample_habits[-1].target == 5
-
-@patch('questionary.text')
-@patch('questionary.select')
-@patch('questionary.confirm')
-def test_adjust_habit(mock_confirm, mock_select, mock_text, sample_habits):
-    """
-    Tests the adjust function by mocking user inputs and verifying the adjustment of an existing habit.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user inputs to adjust an existing habit's name and asserts that
-    the habit's name is correctly updated in the sample habits list.
-    """
-    mock_text.return_value.ask.side_effect = [str(sample_habits[0].id), "Adjusted Name"]
-    mock_select.return_value.ask.side_effect = ["Name"]
-    mock_confirm.return_value.ask.return_value = True
-
-    habit_to_adjust = sample_habits[0]
-    initial_name = habit_to_adjust.name
-
-    Habit.adjust(sample_habits)
-
-    assert habit_to_adjust.name != initial_name
-    assert habit_to_adjust.name == "Adjusted Name"
-
-@patch('questionary.confirm')
-@patch('questionary.text')
-def test_check_habit(mock_text, mock_confirm, sample_habits):
-    """
-    Tests the check function by mocking user inputs and verifying the habit check-in process.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user inputs to check a habit and asserts that the habit's streak is incremented
-    and the date of the check-in is correctly recorded.
-    """
-    habit_to_check = sample_habits[0]
-    initial_streak = habit_to_check.streak
-
-    mock_text.return_value.ask.return_value = str(habit_to_check.id)
-    mock_confirm.return_value.ask.return_value = True
-
-    Habit.check(sample_habits)
-
-    assert habit_to_check.streak == initial_streak + 1
-    assert habit_to_check.date_check[-1].split()[0] == datetime.now().strftime("%Y-%m-%d")
-
-def test_check_habit_already_established(sample_habits):
-    """
-    Tests the check function for an already established habit.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function asserts that the streak and status of an already established habit remain unchanged
-    after attempting to check it again.
-    """
-    habit_to_check = sample_habits[0]
-    habit_to_check.status = "Established"
-    initial_streak = habit_to_check.streak
-
-    with patch('questionary.confirm') as mock_confirm, patch('questionary.text') as mock_text:
-        mock_text.return_value.ask.return_value = str(habit_to_check.id)
-        mock_confirm.return_value.ask.return_value = True
-
-        Habit.check(sample_habits)
-    
-    assert habit_to_check.streak == initial_streak
-    assert habit_to_check.status == "Established"
-
-@patch('questionary.confirm')
-@patch('questionary.text')
-def test_delete_habit(mock_text, mock_confirm, sample_habits):
-    """
-    Tests the delete function by mocking user inputs and verifying the deletion of a habit.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user inputs to delete a habit and asserts that the habit is correctly
-    removed from the sample habits list.
-    """
-    habit_to_delete = sample_habits[0]
-    initial_count = len(sample_habits)
-
-    mock_text.return_value.ask.return_value = str(habit_to_delete.id)
-    mock_confirm.return_value.ask.return_value = True
-
-    Habit.delete(sample_habits)
-    
-    assert len(sample_habits) == initial_count - 1
-    assert habit_to_delete not in sample_habits
-
-@patch('questionary.text')
-def test_duplicate_habit(mock_text, sample_habits):
-    """
-    Tests the duplicate function by mocking user inputs and verifying the duplication of a habit.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user inputs to duplicate a habit and asserts that the new habit is correctly
-    added to the sample habits list with the expected attributes.
-    """
-    habit_to_duplicate = sample_habits[0]
-    initial_count = len(sample_habits)
-
-    mock_text.return_value.ask.side_effect = [str(habit_to_duplicate.id), "Name of Dublicate"]
-
-    Habit.duplicate(sample_habits)
-    
-    assert len(sample_habits) == initial_count + 1
-    assert sample_habits[-1].name == "Name of Dublicate"
-    assert sample_habits[-1].category == habit_to_duplicate.category
-    assert sample_habits[-1].period == habit_to_duplicate.period
-    assert sample_habits[-1].target == habit_to_duplicate.target
-
-
-@patch('tabulate.tabulate', return_value="Mocked Table")
-@patch('questionary.select')
-def test_get_top_main(mock_select, mock_tabulate, sample_habits, capsys):
-    """
-    Tests the get_top_main function by mocking user input and verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function simulates user input to select the order of habits and asserts that the
-    output contains the expected text indicating the sorted list of habits by streak.
-    """
-    mock_select.return_value.ask.return_value = 'descending'
-    Analyse.get_top_main(sample_habits, 'streak', 'streak')
-    captured = capsys.readouterr()
-    assert "Here is a descending list of all habits that have a streak > 0:" in captured.out
-
-@patch('tabulate.tabulate', return_value="Mocked Table")
-def test_get_top_most(mock_tabulate, sample_habits, capsys):
-    """
-    Tests the get_top_most function by verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function asserts that the output contains the expected text indicating the
-    top 3 habits with the most check-ins.
-    """
-    Analyse.get_top_most(sample_habits, 'date_check', 'check-ins')
-    captured = capsys.readouterr()
-    assert "Here are the top 3 of your habits with the most check-ins since creation:" in captured.out
-
-@patch('tabulate.tabulate', return_value="Mocked Table")
-def test_get_top_longest_expired(mock_tabulate, sample_habits, capsys):
-    """
-    Tests the get_top_longest_expired function by verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function asserts that the output contains the expected text indicating the
-    top 3 habits that have not been worked on for the longest time.
-    """
-    Analyse.get_top_longest_expired(sample_habits)
-    captured = capsys.readouterr()
-    assert "Here are the top 3 of your habits that have not been worked on for the longest time:" in captured.out
-
-@patch('tabulate.tabulate', return_value="Mocked Table")
-def test_get_group_habits_by_category(mock_tabulate, sample_habits, capsys):
-    """
-    Tests the get_group_habits_by_category function by verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function asserts that the output contains the expected text indicating the
-    grouping of all habits by category.
-    """
-    Analyse.get_group_habits_by_category(sample_habits)
-    captured = capsys.readouterr()
-    assert "Here is a grouping of all habits by category:" in captured.out
-
-@patch('questionary.text')
-@patch('tabulate.tabulate', return_value="Mocked Table")
-def test_get_habit_streak_max(mock_tabulate, mock_text, sample_habits, capsys):
-    """
-    Tests the get_habit_streak_max function by mocking user input and verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function simulates user input to select a habit and asserts that the output contains
-    the expected text indicating the maximum streak for the selected habit.
-    """
-    mock_text.return_value.ask.return_value = "1"
-    Analyse.get_habit_streak_max(sample_habits)
-    captured = capsys.readouterr()
-    assert "Streak Max" in captured.out
-
-@patch('questionary.select')
-def test_get_habits_by_period(mock_select, sample_habits, capsys):
-    """
-    Tests the get_habits_by_period function by mocking user input and verifying the output.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
-
-    The function simulates user input to select a period and asserts that the output contains
-    the expected text indicating the habits with the selected period.
-    """
-    mock_select.return_value.ask.return_value = "Daily"
-    Analyse.get_habits_by_period(sample_habits)
-    captured = capsys.readouterr()
-    assert "Here are all habits with a period of 'Daily'." in captured.out
-
-
-
-@patch('builtins.print')
-def test_display_habits(mock_print, sample_habits):
-    """
-    Tests the display_habits function by verifying the displayed habits table.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function calls display_habits with specified parameters to display habits
-    and asserts that the printed output contains the expected table headers and habit names.
-    """
-    display_habits(sample_habits, status_request=None, length="full", filter_period=[1, 2, 7], headline="")
-    mock_print.assert_called()
-    output = mock_print.call_args[0][0]
-    assert "ID" in output
-    assert "Exercise" in output
-    assert "Read Book" in output
-    assert "Meditation" in output
-    assert "Cooking" in output
-    assert "Yoga" in output
-
-@patch('questionary.select')
-@patch('builtins.print')
-def test_filter_habits(mock_print, mock_select, sample_habits):
-    """
-    Tests the filter_habits function by mocking user input and verifying the filtered habits table.
-
-    Parameters:
-    sample_habits (list): A list of Habit objects loaded from the test file.
-
-    The function simulates user input to filter habits by "id > 1" and asserts that the printed
-    output contains the expected table headers and habit names, excluding the habit with id=1.
-    """
-    mock_select.return_value.ask.side_effect = ["id", "greater values"]
-    with patch('questionary.text') as mock_text:
-        mock_text.return_value.ask.return_value = "1"
-        filter_habits(sample_habits)
-
-    mock_print.assert_called()
-    output = mock_print.call_args[0][0]
-    assert "ID" in output
-    assert "Exercise" not in output
-    assert "Read Book" in output
-    assert "Meditation" in output
-    assert "Cooking" in output
-    assert "Yoga" in output
\ No newline at end of file
+from datetime import datetime, timedelta
+import io
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from analyse import Analyse
+import cli
+import display
+import fleet
+from index import SortedIndex, TrigramIndex
+import main
+import manage
+from manage import Habit, HabitCollection, SimulatedClock
+import simulate
+import streaks
+from query import Query
+from store import HabitsStore, JournaledHabitsStore, SQLiteHabitsStore
+from display import display_habits, filter_habits
+
+def create_test_file(file_path):
+    """ 
+    Creates a test JSON file with sample habit data. 
+    Parameters: 
+    file_path (str): The path where the test file will be created. 
+    
+    The function generates sample habit data for testing purposes, including all Habit attributes.
+    The generated data is written to a JSON file specified by the file_path parameter. 
+        ID 1: Active / Daily / No Issues.
+        ID 2: Active / Every two days / No Issues.
+        ID 3: Established / Weekly / No Issues.
+        ID 4: Broken / Every two days / Interruption.
+        ID 5: Broken / Daily / Interruption.
+    """
+    now = datetime.now()
+    four_weeks_ago = now - timedelta(days=28)
+
+    TEST_DATA = [
+        {"id": 1, "name": "Exercise", "category": "Health", "period": 1, "target": 28, "streak": 27, "streak_max": 27, 
+         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
+         "date_check": [(four_weeks_ago + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 27)], 
+         "deadline": (four_weeks_ago + timedelta(days=28)).strftime("%Y-%m-%d"), "status": "Active", 
+         "date_interruptions": []},
+
+        {"id": 2, "name": "Read Book", "category": "Education", "period": 2, "target": 28, "streak": 14, "streak_max": 14, 
+         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
+         "date_check": [(four_weeks_ago + timedelta(days=i*2)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 14)], 
+         "deadline": (four_weeks_ago + timedelta(days=(14 * 2))).strftime("%Y-%m-%d"), "status": "Active", 
+         "date_interruptions": []},
+
+        {"id": 3, "name": "Meditation", "category": "Wellness", "period": 7, "target": 4, "streak": 4, "streak_max": 4, 
+         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
+         "date_check": [(four_weeks_ago + timedelta(days=i*7)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 4)], 
+         "deadline": (four_weeks_ago + timedelta(days=3*7)).strftime("%Y-%m-%d"), "status": "Established", 
+         "date_interruptions": []},
+
+        {"id": 4, "name": "Cooking", "category": "Lifestyle", "period": 2, "target": 6, "streak": 2, "streak_max": 2, 
+         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
+         "date_check": [(four_weeks_ago + timedelta(days=i*2)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 2)], 
+         "deadline": (four_weeks_ago + timedelta(days=(2 * 2))).strftime("%Y-%m-%d"), "status": "Broken", 
+         "date_interruptions": [(four_weeks_ago + timedelta(days=(2 * 2) + 2)).strftime("%Y-%m-%d")]},
+
+        {"id": 5, "name": "Yoga", "category": "Fitness", "period": 1, "target": 7, "streak": 3, "streak_max": 3, 
+         "date_create": four_weeks_ago.strftime("%Y-%m-%d"), 
+         "date_check": [(four_weeks_ago + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(0, 3)], 
+         "deadline": (four_weeks_ago + timedelta(days=3)).strftime("%Y-%m-%d"), "status": "Active", 
+         "date_interruptions": [(four_weeks_ago + timedelta(days=3)).strftime("%Y-%m-%d")]}
+    ]
+
+    with open(file_path, 'w') as file:
+        json.dump(TEST_DATA, file, indent=4)
+
+
+   
+@pytest.fixture
+def sample_habits():
+    """
+    Fixture to create and load sample habits from a test JSON file.
+
+    This fixture creates a test file with sample habit data, loads the habits using
+    the HabitsStore class, yields the loaded habits for testing, and removes the
+    test file after the test is completed.
+
+    Returns:
+    list: A list of Habit objects loaded from the test file.
+    """
+    create_test_file('test_habits.json')
+    store = HabitsStore()
+    habits = store.load('test_habits.json')
+    yield habits
+    os.remove('test_habits.json')
+
+def test_save_habits(sample_habits, test_file_path="test_habits_save.json"):
+    """
+    Tests the save function by saving the current state of habits to a test file
+    and verifying the saved data.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects to be saved.
+    test_file_path (str): The path to the test file where the habits will be saved.
+                          Defaults to "test_habits_save.json".
+
+    The function saves the habits to the specified test file, loads the saved data 
+    and asserts that the loaded data matches the original sample habits. The test file will be deleted after use.
+    """
+    store = HabitsStore()
+    store.save(sample_habits, test_file_path)
+    with open(test_file_path, 'r') as file:
+        loaded_data = json.load(file)
+    assert len(loaded_data) == 5
+    assert loaded_data[0]['name'] == "Exercise"
+    assert loaded_data[1]['name'] == "Read Book"
+    assert loaded_data[2]['name'] == "Meditation"
+    assert loaded_data[3]['name'] == "Cooking"
+    assert loaded_data[4]['name'] == "Yoga"
+    os.remove('test_habits_save.json')
+
+def test_load_habits(sample_habits):
+    """
+    Tests the load function by verifying the loaded sample habits.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that the loaded sample habits match the expected habit data.
+    """
+    assert len(sample_habits) == 5
+    assert sample_habits[0].name == "Exercise"
+    assert sample_habits[1].name == "Read Book"
+    assert sample_habits[2].name == "Meditation"
+    assert sample_habits[3].name == "Cooking"
+    assert sample_habits[4].name == "Yoga"
+
+def test_load_habits_lazy(sample_habits, tmp_path):
+    """
+    Tests the streaming load by reading the test file in small chunks.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that the date lists stay unparsed until they are read, that the
+    streamed habits equal the eagerly loaded ones and that saving the unchanged habits
+    writes their date lists back without parsing them.
+    """
+    store = HabitsStore()
+    store.CHUNK_SIZE = 100
+    lazy_habits = store.load('test_habits.json', lazy=True)
+
+    assert lazy_habits[0].date_check._numbers is None
+    assert lazy_habits[0].date_check == sample_habits[0].date_check
+    assert lazy_habits[0].date_check._numbers is not None
+    assert [habit.to_dict() for habit in lazy_habits] == [habit.to_dict() for habit in sample_habits]
+
+    lazy_habits = store.load('test_habits.json', lazy=True)
+    store.save(lazy_habits, str(tmp_path / "test_habits_save.json"))
+    assert all(habit.date_check._numbers is None for habit in lazy_habits if len(habit.date_check))
+    assert not store.fragments
+    assert [habit.to_dict() for habit in HabitsStore().load(str(tmp_path / "test_habits_save.json"))] == [habit.to_dict() for habit in sample_habits]
+
+def test_binary_format(sample_habits, tmp_path):
+    """
+    Tests the binary format by converting the test file to binary and back to JSON.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that the binary file is detected on load, that it is considerably smaller
+    than the JSON file and that converting it back to JSON restores the original content.
+    """
+    binary_file = str(tmp_path / "test_habits.bin")
+    json_file = str(tmp_path / "test_habits_back.json")
+    store = HabitsStore()
+    store.convert('test_habits.json', binary_file)
+    store.convert(binary_file, json_file, binary=False)
+
+    with open(binary_file, 'rb') as file:
+        assert file.read(4) == HabitsStore.BINARY_MAGIC
+    assert os.path.getsize(binary_file) * 5 < os.path.getsize('test_habits.json')
+    assert [habit.to_dict() for habit in store.load(binary_file)] == [habit.to_dict() for habit in sample_habits]
+    with open(json_file) as file, open('test_habits.json') as original_file:
+        assert json.load(file) == json.load(original_file)
+
+def test_stream_chunk_boundaries(sample_habits, tmp_path):
+    """
+    Tests the lazy load with chunk sizes down to a single character, so that the chunks end
+    at every position of the file, also right between two habits.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that all habits are loaded unchanged with every chunk size.
+    """
+    with open('test_habits.json') as file:
+        length = len(file.read())
+    for size in range(1, length + 1, 7):
+        with patch.object(HabitsStore, "CHUNK_SIZE", size):
+            habits = HabitsStore().load('test_habits.json', lazy=True)
+        assert [habit.to_dict() for habit in habits] == [habit.to_dict() for habit in sample_habits]
+
+def test_sqlite_store(sample_habits, tmp_path):
+    """
+    Tests the SQLite store by saving the sample habits to a database, loading them again
+    and selecting habits through the indexed columns.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that all attributes including the check and interruption history
+    survive the round trip, that the selection only returns matching habits and that saving a changed
+    selection keeps all other habits.
+    """
+    db_file = str(tmp_path / "test_habits.db")
+    store = SQLiteHabitsStore()
+    store.save(sample_habits, db_file)
+    loaded_habits = store.load(db_file)
+
+    assert [habit.to_dict() for habit in loaded_habits] == [habit.to_dict() for habit in sample_habits]
+    assert [habit.name for habit in store.select(db_file, status="Active", period=1)] == ["Exercise", "Yoga"]
+    assert [habit.name for habit in store.select(db_file, category="Lifestyle")] == ["Cooking"]
+
+    store = SQLiteHabitsStore()
+    selected_habits = store.select(db_file, status="Broken")
+    Habit.check_batch(selected_habits, [4])
+    store.save(selected_habits, db_file)
+    reloaded_habits = SQLiteHabitsStore().load(db_file)
+    assert [habit.id for habit in reloaded_habits] == [1, 2, 3, 4, 5]
+    assert reloaded_habits.get(4).streak == selected_habits.get(4).streak == 3
+
+def test_sqlite_migrate(tmp_path):
+    """
+    Tests the one-shot migration from a JSON file into the SQLite store.
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that all habits are migrated on the first call and that
+    a second call leaves the already filled database untouched.
+    """
+    json_file = str(tmp_path / "test_habits.json")
+    db_file = str(tmp_path / "test_habits.db")
+    create_test_file(json_file)
+    store = SQLiteHabitsStore()
+
+    assert store.migrate(json_file, db_file) == 5
+    assert store.migrate(json_file, db_file) == 0
+    assert len(store.load(db_file)) == 5
+
+@patch('questionary.confirm')
+@patch('questionary.text')
+def test_journaled_store(mock_text, mock_confirm, tmp_path):
+    """
+    Tests the journaled store by checking and deleting habits, reloading them from snapshot and journal
+    and compacting the journal afterwards.
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that each change adds one line to the journal while the snapshot stays untouched,
+    that the reloaded habits contain all changes and that the compaction removes the journal.
+    """
+    test_file = str(tmp_path / "test_habits.json")
+    create_test_file(test_file)
+    snapshot = open(test_file).read()
+    store = JournaledHabitsStore()
+    try:
+        habits = store.load(test_file)
+        mock_confirm.return_value.ask.return_value = True
+        mock_text.return_value.ask.return_value = "1"
+        Habit.check(habits)
+        store.save(habits, test_file)
+        mock_text.return_value.ask.return_value = "2"
+        Habit.delete(habits)
+        store.save(habits, test_file)
+
+        assert open(test_file).read() == snapshot
+        assert len(open(test_file + ".journal").readlines()) == 2
+
+        reload_store = JournaledHabitsStore()
+        reloaded_habits = reload_store.load(test_file)
+        reload_store.close()
+        assert [habit.id for habit in reloaded_habits] == [1, 3, 4, 5]
+        assert reloaded_habits[0].to_dict() == habits[0].to_dict()
+
+        store.compact(habits, test_file)
+        assert not os.path.exists(test_file + ".journal")
+        assert len(HabitsStore().load(test_file)) == 4
+    finally:
+        store.close()
+
+def test_journal_replay_lazy(tmp_path):
+    """
+    Tests that changes replayed from the journal onto a lazily loaded snapshot survive the compaction.
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function checks a habit, reloads snapshot and journal lazily, compacts them and asserts
+    that the check and the streak are part of the new snapshot.
+    """
+    test_file = str(tmp_path / "test_habits.json")
+    create_test_file(test_file)
+    store = JournaledHabitsStore()
+    habits = store.load(test_file, lazy=True)
+    Habit.check_batch(habits, [2])
+    store.save(habits, test_file)
+    store.close()
+    expected = habits.get(2).to_dict()
+
+    store = JournaledHabitsStore()
+    habits = store.load(test_file, lazy=True)
+    store.compact(habits, test_file)
+    store.close()
+    assert not os.path.exists(test_file + ".journal")
+    assert HabitsStore().load(test_file).get(2).to_dict() == expected
+
+@patch('questionary.confirm')
+@patch('questionary.text')
+def test_incremental_save(mock_text, mock_confirm, sample_habits, tmp_path):
+    """
+    Tests the dirty tracking by checking and deleting habits and saving them to a JSON file
+    and a SQLite database afterwards.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function asserts that only the checked habit is serialized again, that the deleted habits are
+    removed from both files and that all dirty flags and tombstones are reset after saving.
+    """
+    json_file = str(tmp_path / "test_habits_save.json")
+    db_file = str(tmp_path / "test_habits.db")
+    json_store = HabitsStore()
+    sqlite_store = SQLiteHabitsStore()
+    json_store.save(sample_habits, json_file)
+    mock_confirm.return_value.ask.return_value = True
+
+    mock_text.return_value.ask.return_value = "2"
+    Habit.check(sample_habits)
+    mock_text.return_value.ask.return_value = "5"
+    Habit.delete(sample_habits)
+    assert sample_habits[1].dirty
+    assert sample_habits.tombstones == {5}
+
+    with patch.object(HabitsStore, 'serialize', wraps=HabitsStore.serialize) as mock_serialize:
+        json_store.save(sample_habits, json_file)
+    assert mock_serialize.call_count == 1
+    assert not any(habit.dirty for habit in sample_habits)
+    assert not sample_habits.tombstones
+    assert not os.path.exists(json_file + ".tmp")
+    assert [habit.to_dict() for habit in HabitsStore().load(json_file)] == [habit.to_dict() for habit in sample_habits]
+
+    sqlite_store.save(sample_habits, db_file)
+    mock_text.return_value.ask.return_value = "1"
+    Habit.check(sample_habits)
+    Habit.delete(sample_habits)
+    sqlite_store.save(sample_habits, db_file)
+    assert [habit.to_dict() for habit in SQLiteHabitsStore().load(db_file)] == [habit.to_dict() for habit in sample_habits]
+
+def test_compact_habit(sample_habits):
+    """
+    Tests the compact representation of a habit with slots, day ordinals and date lists backed by arrays.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that habits have no attribute dictionary, that dates are kept as ordinals
+    but still offered as strings and that the date lists behave like lists of date strings.
+    """
+    habit = sample_habits[0]
+    assert not hasattr(habit, "__dict__")
+    assert habit.deadline_ordinal == datetime.strptime(habit.deadline, "%Y-%m-%d").toordinal()
+
+    habit.deadline = "2024-12-24"
+    assert habit.deadline_ordinal == datetime(2024, 12, 24).toordinal()
+    assert habit.date_check.numbers.typecode == "q"
+    assert len(habit.date_check) == 27
+    assert habit.date_check[0] == sample_habits[0].date_check[0]
+    assert habit.date_check.latest() == max(list(habit.date_check))
+
+    habit.date_check.append("2024-12-24 08:15:00")
+    assert habit.date_check[-1] == "2024-12-24 08:15:00"
+    assert "2024-12-24 08:15:00" in habit.date_check
+    assert habit.category is manage.CATEGORIES[0]
+
+def test_habit_collection(sample_habits):
+    """
+    Tests the HabitCollection by looking up, removing and adding habits.
+
+    Parameters:
+    sample_habits (HabitCollection): The habits loaded from the test file.
+
+    The function asserts that habits are found by their ID, that the insertion order is kept
+    after removing a habit, that IDs of deleted habits are not handed out again and that
+    a second habit with an existing ID is rejected.
+    """
+    assert isinstance(sample_habits, HabitCollection)
+    assert sample_habits.get(4).name == "Cooking"
+    assert sample_habits.get(42) is None
+    assert 3 in sample_habits.ids()
+
+    sample_habits.remove(sample_habits.get(5))
+    assert [habit.id for habit in sample_habits] == [1, 2, 3, 4]
+    assert Habit.get_id(sample_habits) == 6
+
+    sample_habits.append(Habit(6, "Swimming", "Sport", 7, 10))
+    assert sample_habits[-1].name == "Swimming"
+    with pytest.raises(ValueError):
+        sample_habits.append(Habit(6, "Running", "Sport", 1, 10))
+
+def test_update_habit_status(sample_habits):
+    """
+    Tests the update function by verifying the status and streak updates of sample habits.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that the status and streak of the sample habits are correctly updated
+    based on their deadlines. It verifies if the statuses are set to "Broken" or "Active" and
+    if the streaks and interruptions are correctly updated.
+    """
+    habit1 = sample_habits[0]
+    habit5 = sample_habits[4]
+
+    Habit.update(sample_habits)
+
+    now = datetime.now().strftime("%Y-%m-%d")
+
+    assert habit1.status == "Active"
+    assert habit1.streak == 27
+    assert now not in habit1.date_interruptions
+
+    assert habit5.status == "Broken"
+    assert habit5.streak == 0
+    assert now in habit5.date_interruptions
+
+@patch('questionary.confirm')
+@patch('questionary.text')
+def test_update_due_habits_only(mock_text, mock_confirm, sample_habits):
+    """
+    Tests that the update only processes due habits taken from the deadline index.
+
+    Parameters:
+    sample_habits (HabitCollection): The habits loaded from the test file.
+
+    The function asserts that habits which are not due are not touched, that habits with a
+    passed deadline break and that a broken habit which was checked again becomes active.
+    """
+    today = datetime.now().date().toordinal()
+
+    assert sorted(habit.id for habit in sample_habits.deadlines.due(today)) == [4, 5]
+    sample_habits.deadlines.build()
+    Habit.update(sample_habits)
+
+    assert sample_habits.get(1).deadline_ordinal == today
+    assert not sample_habits.get(1).dirty
+    assert not sample_habits.get(2).dirty
+    assert sample_habits.get(5).status == "Broken"
+
+    mock_text.return_value.ask.return_value = "4"
+    mock_confirm.return_value.ask.return_value = True
+    Habit.check(sample_habits)
+    Habit.update(sample_habits)
+    assert sample_habits.get(4).status == "Active"
+    assert sample_habits.get(5).status == "Broken"
+
+def test_update_twice_a_day(tmp_path):
+    """
+    Tests that updating the habits again on the same day changes nothing, e.g. when the tracker is started twice.
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    The function updates and saves the habits, loads and updates them again and asserts that the second update
+    records no change for the journal and, with the plain JSON store, marks no habit as dirty.
+    """
+    test_file = str(tmp_path / "test_habits.json")
+    create_test_file(test_file)
+    store = JournaledHabitsStore()
+    habits = store.load(test_file)
+    Habit.update(habits)
+    store.save(habits, test_file)
+    store.close()
+    lines = open(test_file + ".journal").readlines()
+    assert lines
+
+    store = JournaledHabitsStore()
+    habits = store.load(test_file)
+    Habit.update(habits)
+    assert not store.pending
+    store.save(habits, test_file)
+    store.close()
+    assert open(test_file + ".journal").readlines() == lines
+
+    HabitsStore().save(habits, test_file)
+    habits = HabitsStore().load(test_file)
+    Habit.update(habits)
+    assert not any(habit.dirty for habit in habits)
+
+def test_columnar_update(sample_habits):
+    """
+    Tests that the vectorized update of columnar.py gives the same results as Habit.update().
+
+    Parameters:
+    sample_habits (HabitCollection): The habits loaded from the test file.
+
+    The function adds broken habits which were checked in time again and habits with an interruption
+    of today, updates a copy of the habits with both engines and asserts that all attributes are equal.
+    """
+    columnar = pytest.importorskip("columnar")
+    pytest.importorskip("numpy")
+    today = datetime.now().strftime("%Y-%m-%d")
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    sample_habits.append(Habit(6, "Checked again", "Sport", 1, 10, status="Broken", deadline=tomorrow))
+    sample_habits.append(Habit(7, "Broken today", "Sport", 1, 10, status="Broken", deadline="2024-01-01", date_interruptions=[today]))
+
+    scalar_habits = HabitCollection(Habit(**habit.to_dict()) for habit in sample_habits)
+    Habit.update(scalar_habits)
+    changed = columnar.update(sample_habits)
+
+    assert changed == 4
+    assert [habit.to_dict() for habit in sample_habits] == [habit.to_dict() for habit in scalar_habits]
+    assert [habit.dirty for habit in sample_habits] == [habit.dirty for habit in scalar_habits]
+
+def test_recompute_streaks():
+    """
+    Tests recomputing streaks, status and interruptions from the checks of a habit.
+
+    The habit is checked daily on day 0, 1, 3 and 4, so it was broken on day 3 and has a current streak of 2.
+    The function asserts that the wrong stored values are reported, that a stored interruption outside of the gap
+    is replaced and that the habit agrees with its checks after the repair.
+    """
+    first_day = datetime(2024, 3, 1)
+    checks = [(first_day + timedelta(days=day, hours=8)).strftime("%Y-%m-%d %H:%M:%S") for day in [0, 1, 3, 4]]
+    habit = Habit(1, "Run", "Sport", 1, 10, streak=4, streak_max=4, date_create="2024-03-01", date_check=checks, 
+                  deadline="2024-03-06", status="Active", date_interruptions=["2024-02-20"])
+    habits = HabitCollection([habit])
+    today = (first_day + timedelta(days=5)).toordinal()
+
+    derived = streaks.recompute(habit, today)
+    assert derived["streak"] == 2 and derived["streak_max"] == 2 and derived["status"] == "Active"
+    assert derived["date_interruptions"] == [manage.to_ordinal("2024-03-04")]
+
+    disagreements = streaks.verify(habits, today=today, repair=True)
+    assert [(habit_id, field) for habit_id, field, _, _ in disagreements] == [(1, "streak"), (1, "streak_max"), (1, "date_interruptions")]
+    assert habit.streak == 2 and habit.dirty
+    assert list(habit.date_interruptions) == ["2024-03-04"]
+    assert streaks.verify(habits, today=today) == []
+
+    derived = streaks.recompute(habit, today + 1)  # The deadline of day 5 has passed
+    assert derived["streak"] == 0 and derived["status"] == "Broken"
+    assert derived["date_interruptions"] == [manage.to_ordinal("2024-03-04"), manage.to_ordinal("2024-03-07")]
+
+def test_habit_counts(sample_habits):
+    """
+    Tests that the counters per category, status and period follow every change without counting the habits again.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function changes, adds and deletes habits and asserts that the counters agree with a full recount.
+    A change which bypasses the collection is found by the verification. 
+    It also reconstructs the state of habit 1 on an earlier day and the history of events of habit 5.
+    """
+    assert sample_habits.counts.by_status("Health") == {"Active": 1}
+    Habit.check_batch(sample_habits, [1])  # Reaches the target
+    Habit.update(sample_habits)
+    habit = sample_habits.get(2)
+    habit.category, habit.period = "Health", 7
+    sample_habits.notify("adjust", habit, dict(category="Health", period=7))
+    Habit.create(sample_habits, "Walk", "Health", 1, 10)
+    habit = sample_habits.get(4)
+    sample_habits.remove(habit)
+    sample_habits.notify("delete", habit, {})
+
+    assert sample_habits.counts.verify() == {}
+    assert sample_habits.counts.by_status("Health") == {"Established": 1, "Active": 2}
+    assert sample_habits.counts.count(period=7) == 2
+    assert sample_habits.counts.count(status="Broken") == 1
+    assert sample_habits.counts.count("Health", "Active", 1) == 1
+
+    sample_habits.get(6).status = "Broken"  # Not reported to the collection
+    assert sample_habits.counts.verify() == {("Health", "Active", 1): (1, 0), ("Health", "Broken", 1): (0, 1)}
+
+    habit = sample_habits.get(1)
+    day = habit.date_check[9][:10]
+    earlier = streaks.state_at(habit, day)
+    assert earlier.streak == 10 and earlier.status == "Active" and len(earlier.date_check) == 10
+    assert habit.streak == 28 and streaks.state_at(habit, "2000-01-01") is None
+
+    habit = sample_habits.get(5)
+    habit.date_interruptions.append(habit.date_check[0][:10])
+    events = streaks.history(habit)
+    assert events[0] == (habit.date_create_ordinal, "created", habit.date_create)
+    assert [event for _, event, _ in events].count("checked") == len(habit.date_check)
+    assert events[1:3] == [(manage.to_ordinal(habit.date_check[0][:10]), "interrupted", habit.date_check[0][:10]),
+                           (manage.to_ordinal(habit.date_check[0][:10]), "checked", habit.date_check[0])]
+    assert [day for day, _, _ in events] == sorted(day for day, _, _ in events)
+
+def test_simulated_clock(sample_habits):
+    """
+    Tests running the tracker with a simulated clock and the simulation of long-term usage.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function moves the clock three days ahead and asserts that the update breaks the habits
+    which were not checked in time. It then simulates 20 days of 5 habits and checks the measurements.
+    """
+    clock = SimulatedClock(datetime.now() + timedelta(days=3))
+    with patch('manage.clock', clock):
+        Habit.update(sample_habits)
+        assert sample_habits.get(1).status == "Broken"
+        assert sample_habits.get(1).date_interruptions[-1] == clock.now().strftime("%Y-%m-%d")
+        clock.advance(hours=1)
+        Habit.check_batch(sample_habits, [2])
+        assert sample_habits.get(2).date_check[-1] == clock.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    results = simulate.simulate(days=20, habit_count=5, every=10)
+    assert [result["day"] for result in results] == [10, 20]
+    assert 0 < results[0]["checks"] < results[1]["checks"] <= 100
+    assert all(result["save"] > 0 and result["load"] > 0 for result in results)
+    assert type(manage.clock) is manage.Clock
+
+@patch('questionary.text')
+@patch('questionary.select')
+@patch('questionary.confirm')
+def test_add_habit(mock_confirm, mock_select, mock_text, sample_habits):
+    """
+    Tests the add function by mocking user inputs and verifying the addition of a new habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user inputs to add a new habit and asserts that the new habit
+    is correctly added to the sample habits list with the expected attributes.
+    """
+    mock_text.return_value.ask.side_effect = ["New Habit Name", 5]
+    mock_select.return_value.ask.side_effect = ["Health", "Daily"]
+    mock_confirm.return_value.ask.return_value = True
+
+    initial_count = len(sample_habits)
+    Habit.add(sample_habits)
+    
+    assert len(sample_habits) == initial_count + 1
+    assert sample_habits[-1].name == "New Habit Name"
+    assert sample_habits[-1].category == "Health"
+    assert sample_habits[-1].period == manage.PERIOD_MAPPING["Daily"]
+    assert sample_habits[-1].target == 5
+
+@patch('questionary.text')
+@patch('questionary.select')
+@patch('questionary.confirm')
+def test_adjust_habit(mock_confirm, mock_select, mock_text, sample_habits):
+    """
+    Tests the adjust function by mocking user inputs and verifying the adjustment of an existing habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user inputs to adjust an existing habit's name and asserts that
+    the habit's name is correctly updated in the sample habits list.
+    """
+    mock_text.return_value.ask.side_effect = [str(sample_habits[0].id), "Adjusted Name"]
+    mock_select.return_value.ask.side_effect = ["Name"]
+    mock_confirm.return_value.ask.return_value = True
+
+    habit_to_adjust = sample_habits[0]
+    initial_name = habit_to_adjust.name
+
+    Habit.adjust(sample_habits)
+
+    assert habit_to_adjust.name != initial_name
+    assert habit_to_adjust.name == "Adjusted Name"
+
+@patch('questionary.confirm')
+@patch('questionary.text')
+def test_check_habit(mock_text, mock_confirm, sample_habits):
+    """
+    Tests the check function by mocking user inputs and verifying the habit check-in process.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user inputs to check a habit and asserts that the habit's streak is incremented
+    and the date of the check-in is correctly recorded.
+    """
+    habit_to_check = sample_habits[0]
+    initial_streak = habit_to_check.streak
+
+    mock_text.return_value.ask.return_value = str(habit_to_check.id)
+    mock_confirm.return_value.ask.return_value = True
+
+    Habit.check(sample_habits)
+
+    assert habit_to_check.streak == initial_streak + 1
+    assert habit_to_check.date_check[-1].split()[0] == datetime.now().strftime("%Y-%m-%d")
+
+def test_check_habit_already_established(sample_habits):
+    """
+    Tests the check function for an already established habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that the streak and status of an already established habit remain unchanged
+    after attempting to check it again.
+    """
+    habit_to_check = sample_habits[0]
+    habit_to_check.status = "Established"
+    initial_streak = habit_to_check.streak
+
+    with patch('questionary.confirm') as mock_confirm, patch('questionary.text') as mock_text:
+        mock_text.return_value.ask.return_value = str(habit_to_check.id)
+        mock_confirm.return_value.ask.return_value = True
+
+        Habit.check(sample_habits)
+    
+    assert habit_to_check.streak == initial_streak
+    assert habit_to_check.status == "Established"
+
+def test_check_batch(sample_habits):
+    """
+    Tests checking several habits in one batch read from CSV lines.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that habit 1 reaches its target and becomes established with the given check time,
+    that habit 2 is checked now, and that unknown and already established habits are reported and skipped.
+    """
+    moment = datetime.now().strftime("%Y-%m-%d 07:30:00")
+    checks = Habit.read_checks(io.StringIO(f"id,timestamp\n1,{moment}\n\n2\n3\n99\n"))
+    result = Habit.check_batch(sample_habits, checks)
+
+    assert sorted(result["checked"]) == [1, 2]
+    assert result["established"] == [1]
+    assert result["unknown"] == [99]
+    assert result["skipped"] == [3]
+    habit = sample_habits.get(1)
+    assert habit.streak == 28 and habit.status == "Established"
+    assert habit.date_check[-1] == moment
+    assert habit.deadline == (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    assert sample_habits.get(2).streak == 15
+
+    with pytest.raises(ValueError):
+        Habit.read_checks(io.StringIO("1\nabc\n"))
+    with pytest.raises(ValueError):
+        Habit.check_batch(sample_habits, [(2, moment), (4, "yesterday")])
+    assert sample_habits.get(2).streak == 15 and sample_habits.get(2).date_check[-1] != moment
+
+@patch('questionary.confirm')
+@patch('questionary.text')
+def test_delete_habit(mock_text, mock_confirm, sample_habits):
+    """
+    Tests the delete function by mocking user inputs and verifying the deletion of a habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user inputs to delete a habit and asserts that the habit is correctly
+    removed from the sample habits list.
+    """
+    habit_to_delete = sample_habits[0]
+    initial_count = len(sample_habits)
+
+    mock_text.return_value.ask.return_value = str(habit_to_delete.id)
+    mock_confirm.return_value.ask.return_value = True
+
+    Habit.delete(sample_habits)
+    
+    assert len(sample_habits) == initial_count - 1
+    assert habit_to_delete not in sample_habits
+
+@patch('questionary.text')
+def test_duplicate_habit(mock_text, sample_habits):
+    """
+    Tests the duplicate function by mocking user inputs and verifying the duplication of a habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user inputs to duplicate a habit and asserts that the new habit is correctly
+    added to the sample habits list with the expected attributes.
+    """
+    habit_to_duplicate = sample_habits[0]
+    initial_count = len(sample_habits)
+
+    mock_text.return_value.ask.side_effect = [str(habit_to_duplicate.id), "Name of Dublicate"]
+
+    Habit.duplicate(sample_habits)
+    
+    assert len(sample_habits) == initial_count + 1
+    assert sample_habits[-1].name == "Name of Dublicate"
+    assert sample_habits[-1].category == habit_to_duplicate.category
+    assert sample_habits[-1].period == habit_to_duplicate.period
+    assert sample_habits[-1].target == habit_to_duplicate.target
+
+
+@patch('tabulate.tabulate', return_value="Mocked Table")
+@patch('questionary.select')
+def test_get_top_main(mock_select, mock_tabulate, sample_habits, capsys):
+    """
+    Tests the get_top_main function by mocking user input and verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function simulates user input to select the order of habits and asserts that the
+    output contains the expected text indicating the sorted list of habits by streak.
+    """
+    mock_select.return_value.ask.return_value = 'descending'
+    Analyse.get_top_main(sample_habits, 'streak', 'streak')
+    captured = capsys.readouterr()
+    assert "Here is a descending list of all habits that have a streak > 0:" in captured.out
+
+@patch('tabulate.tabulate', return_value="Mocked Table")
+def test_get_top_most(mock_tabulate, sample_habits, capsys):
+    """
+    Tests the get_top_most function by verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function asserts that the output contains the expected text indicating the
+    top 3 habits with the most check-ins.
+    """
+    Analyse.get_top_most(sample_habits, 'date_check', 'check-ins')
+    captured = capsys.readouterr()
+    assert "Here are the top 3 of your habits with the most check-ins since creation:" in captured.out
+
+@patch('tabulate.tabulate', return_value="Mocked Table")
+def test_get_top_longest_expired(mock_tabulate, sample_habits, capsys):
+    """
+    Tests the get_top_longest_expired function by verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function asserts that the output contains the expected text indicating the
+    top 3 habits that have not been worked on for the longest time.
+    """
+    Analyse.get_top_longest_expired(sample_habits)
+    captured = capsys.readouterr()
+    assert "Here are the top 3 of your habits that have not been worked on for the longest time:" in captured.out
+
+def test_top_k(sample_habits, capsys):
+    """
+    Tests the heap based selection of the top habits with a configurable number of habits.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that the selection equals sorting all habits, also for equal keys,
+    and that the reports return the selected rows without any prompt.
+    """
+    def key(habit):
+        return habit.period
+
+    assert [habit for _, habit in Analyse.top_k(sample_habits, key, k=3)] == sorted(sample_habits, key=key, reverse=True)[:3]
+    assert [habit for _, habit in Analyse.top_k(sample_habits, key, k=4, largest=False)] == sorted(sample_habits, key=key)[:4]
+
+    rows = Analyse.get_top_most(sample_habits, "date_check", "checks", k=2)
+    assert rows == [[1, "Exercise", 27, "Active"], [2, "Read Book", 14, "Active"]]
+    assert "top 2" in capsys.readouterr().out
+
+    assert [row[0] for row in Analyse.get_top_longest_expired(sample_habits, k=10)] == [4]
+
+def test_completion_rates(capsys):
+    """
+    Tests the completion rates per week and month, per habit and per category.
+
+    The function creates a daily and a weekly habit on a Monday, checks the daily habit on every day of the first week
+    and on three days of the second one and asserts rates, trend and interruptions of both groupings. An established
+    habit whose last check is older than the habit itself must not get a negative expected count.
+    """
+    habits = HabitCollection()
+    with patch('manage.clock', SimulatedClock(datetime(2024, 1, 1, 8))):
+        daily = Habit.create(habits, "Run", "Sport", 1, 28)
+        weekly = Habit.create(habits, "Swim", "Sport", 7, 4)
+    for day in list(range(1, 8)) + [8, 10, 12]:
+        Habit.record_check(habits, daily, f"2024-01-{day:02d} 07:30:00")
+    Habit.record_check(habits, weekly, "2024-01-03 18:00:00")
+    daily.date_interruptions.append("2024-01-10")
+    today = manage.to_ordinal("2024-01-14")
+
+    rates = Analyse.completion_rates(habits, "week", "habit", today=today)
+    assert rates["labels"] == ["2024-W01", "2024-W02"]
+    assert rates["groups"][daily.id]["checks"] == [7, 3]
+    assert rates["groups"][daily.id]["rates"] == [1.0, 3 / 7]
+    assert rates["groups"][daily.id]["interruptions"] == [0, 1]
+    assert rates["groups"][daily.id]["trend"] == pytest.approx((3 / 7 - 1) * 100)
+    assert rates["groups"][weekly.id]["rates"] == [1.0, 0.0]
+
+    rates = Analyse.completion_rates(habits, "month", "category", today=today)
+    assert rates["labels"] == ["2024-01"]
+    assert rates["groups"]["Sport"]["checks"] == [11]
+    assert rates["groups"]["Sport"]["expected"] == [pytest.approx(14 + 2)]
+    assert rates["groups"]["Sport"]["trend"] is None
+
+    imported = Habit(id=3, name="Read", category="Education", period=1, target=5, streak=5, streak_max=5, date_create="2024-01-10", 
+                     date_check=["2024-01-08 07:00:00"], deadline="2024-01-09", status="Established", date_interruptions=[])
+    habits.append(imported)
+    rates = Analyse.completion_rates(habits, "week", "habit", today=today)
+    assert rates["groups"][imported.id]["expected"] == [0.0, 1.0]
+    assert rates["groups"][imported.id]["checks"] == [0, 1]
+
+    with patch('manage.clock', SimulatedClock(datetime(2024, 1, 14, 20))):
+        Analyse.get_completion_rates(habits, "week", "habit", count=1)
+    output = capsys.readouterr().out
+    assert "2024-W02" in output and "2024-W01" not in output and "43%" in output
+
+def test_fleet(tmp_path):
+    """
+    Tests the reports across the habits files of several users with a pool of worker processes.
+
+    Parameters:
+    tmp_path (Path): A temporary directory with one subdirectory per user.
+
+    The function asserts that the merged top lists and counters equal those of all habits at once,
+    and that a broken file is reported instead of stopping the run.
+    """
+    for user in ["alice", "bob"]:
+        os.makedirs(tmp_path / user)
+        create_test_file(str(tmp_path / user / "habits.json"))
+    (tmp_path / "carol.json").write_text("{}")
+
+    result = fleet.run(str(tmp_path), k=2, workers=2, chunk_size=1)
+    assert (result["users"], result["habits"]) == (2, 10)
+    assert [user for user, _ in result["errors"]] == ["carol.json"]
+
+    habits = HabitsStore().load(str(tmp_path / "alice" / "habits.json"))
+    Habit.update(habits)
+    best = max(habits, key=lambda habit: habit.streak_max)
+    expected = (best.streak_max, best.id, best.name)
+    assert [(entry[0], entry[2], entry[3]) for entry in result["top"]["streak_max"]] == [expected, expected]
+    assert [entry[1] for entry in result["top"]["streak_max"]] == [os.path.join("alice", "habits.json"), os.path.join("bob", "habits.json")]
+    assert result["categories"][("Health", habits.get(1).status)] == 2
+    assert sum(result["categories"].values()) == 2 * sum(1 for habit in habits if habit.category in manage.CATEGORIES)
+
+def test_columnar_analyses(sample_habits, capsys):
+    """
+    Tests that the reports answered from the columnar snapshot equal the reports which loop over the habits.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function compares the rows of both ways, also for equal values, and asserts that the snapshot
+    is kept between reports and dropped when a habit changes.
+    """
+    pytest.importorskip("numpy")
+    import columnar
+
+    for number in range(6):
+        Habit.create(sample_habits, f"Habit {number}", "Other", [1, 2, 7][number % 3], 10)
+        Habit.check_batch(sample_habits, [sample_habits.max_id] * (number % 3))
+    Habit.update(sample_habits)
+
+    def reports():
+        return [Analyse.get_top_main(sample_habits, "streak", "streak", order=True), 
+                Analyse.get_top_main(sample_habits, "streak_max", "max streak", order=False), 
+                Analyse.get_top_most(sample_habits, "date_check", "checks", k=4), 
+                Analyse.get_top_most(sample_habits, "date_interruptions", "interruptions", k=2), 
+                Analyse.get_top_longest_expired(sample_habits, k=5)]
+
+    vectorized = reports()
+    snapshot = sample_habits.snapshot
+    assert snapshot is not None and reports() and sample_habits.snapshot is snapshot
+    with patch('columnar.np', None):
+        assert reports() == vectorized
+    Analyse.get_habits_by_period(sample_habits, period=7)
+    assert "Meditation" in capsys.readouterr().out
+
+    Habit.check_batch(sample_habits, [2])
+    assert sample_habits.snapshot is None
+    assert columnar.snapshot(sample_habits).streaks.tolist() == [habit.streak for habit in sample_habits]
+
+@patch('tabulate.tabulate', return_value="Mocked Table")
+def test_get_group_habits_by_category(mock_tabulate, sample_habits, capsys):
+    """
+    Tests the get_group_habits_by_category function by verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function asserts that the output contains the expected text indicating the
+    grouping of all habits by category.
+    """
+    Analyse.get_group_habits_by_category(sample_habits)
+    captured = capsys.readouterr()
+    assert "Here is a grouping of all habits by category:" in captured.out
+
+@patch('questionary.text')
+@patch('tabulate.tabulate', return_value="Mocked Table")
+def test_get_habit_streak_max(mock_tabulate, mock_text, sample_habits, capsys):
+    """
+    Tests the get_habit_streak_max function by mocking user input and verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function simulates user input to select a habit and asserts that the table
+    with the maximum streak of the selected habit is printed.
+    """
+    mock_text.return_value.ask.return_value = "1"
+    Analyse.get_habit_streak_max(sample_habits)
+    captured = capsys.readouterr()
+    assert "Mocked Table" in captured.out
+    table_data, = mock_tabulate.call_args[0]
+    assert table_data == [[1, "Exercise", 27, "Active"]]
+    assert "Streak Max" in mock_tabulate.call_args[1]["headers"]
+
+@patch('questionary.select')
+def test_get_habits_by_period(mock_select, sample_habits, capsys):
+    """
+    Tests the get_habits_by_period function by mocking user input and verifying the output.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    capsys (CaptureFixture): Pytest fixture to capture stdout and stderr output.
+
+    The function simulates user input to select a period and asserts that the output contains
+    the expected text indicating the habits with the selected period.
+    """
+    mock_select.return_value.ask.return_value = "Daily"
+    Analyse.get_habits_by_period(sample_habits)
+    captured = capsys.readouterr()
+    assert "Here are all habits with a period of 'Daily'." in captured.out
+
+
+
+@patch('builtins.print')
+def test_display_habits(mock_print, sample_habits):
+    """
+    Tests the display_habits function by verifying the displayed habits table.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function calls display_habits with specified parameters to display habits
+    and asserts that the printed output contains the expected table headers and habit names.
+    """
+    display_habits(sample_habits, status_request=None, length="full", filter_period=[1, 2, 7], headline="")
+    mock_print.assert_called()
+    output = mock_print.call_args[0][0]
+    assert "ID" in output
+    assert "Exercise" in output
+    assert "Read Book" in output
+    assert "Meditation" in output
+    assert "Cooking" in output
+    assert "Yoga" in output
+
+def test_display_pages(capsys):
+    """
+    Tests that display_habits() prints long lists page by page and builds only the rows it shows.
+
+    The function displays 120 habits, of which 20 are filtered out, in pages of 30 habits, once without pausing
+    and once with the user declining the second page.
+    """
+    habits = HabitCollection(Habit(number, f"Habit {number}", "Sport", 1 if number % 6 else 7, 10) for number in range(1, 121))
+    with patch('display.get_row', wraps=display.get_row) as mock_row:
+        display_habits(habits, status_request=None, length="short", filter_period=[1], headline="", page_size=30)
+    output = capsys.readouterr().out
+    assert mock_row.call_count == 100
+    assert output.count("Last Checked") == 4
+    assert "Habit 119" in output and "Habit 120" not in output
+
+    with patch('display.pause', True), patch('display.get_row', wraps=display.get_row) as mock_row, patch('questionary.confirm') as mock_confirm:
+        mock_confirm.return_value.ask.return_value = False
+        display_habits(habits, status_request=None, length="short", filter_period=[1], headline="", page_size=30)
+    output = capsys.readouterr().out
+    assert mock_confirm.call_count == 1
+    assert mock_row.call_count == 31
+    assert output.count("Last Checked") == 1 and "Habit 35" in output and "Habit 37" not in output
+
+@patch('questionary.select')
+@patch('builtins.print')
+def test_filter_habits(mock_print, mock_select, sample_habits):
+    """
+    Tests the filter_habits function by mocking user input and verifying the filtered habits table.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function simulates user input to filter habits by "id > 1" and asserts that the printed
+    output contains the expected table headers and habit names, excluding the habit with id=1.
+    """
+    mock_select.return_value.ask.side_effect = ["id", "greater values"]
+    with patch('questionary.text') as mock_text:
+        mock_text.return_value.ask.return_value = "1"
+        filter_habits(sample_habits)
+
+    mock_print.assert_called()
+    output = mock_print.call_args[0][0]
+    assert "ID" in output
+    assert "Exercise" not in output
+    assert "Read Book" in output
+    assert "Meditation" in output
+    assert "Cooking" in output
+    assert "Yoga" in output
+
+def test_query(sample_habits, tmp_path, capsys):
+    """
+    Tests compound queries from their text and from conditions, with and without an index.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+    tmp_path (Path): A temporary directory for the habits file of the command line.
+
+    The function asserts the matching habits, that the conditions are compiled once per query, that the category index
+    selects the candidates and follows changes of the habits, also for custom categories in any case, and that invalid
+    queries, also sets for numbers and dates, are rejected.
+    """
+    query = Query.parse("category in {health, Education} and streak > 10 and name contains 'e'")
+    assert [habit.id for habit in query.run(sample_habits)] == [1, 2]
+    assert query.plan(sample_habits) == [1, 2]
+    assert [habit.id for habit in query.run(list(sample_habits))] == [1, 2]
+    query = Query([("deadline", "<", sample_habits.get(2).deadline), ("period", "=", "Daily")])
+    assert [habit.id for habit in query.run(sample_habits)] == [5]
+    with patch.object(Query, "compile_condition", wraps=Query.compile_condition) as mock_compile:
+        query = Query.parse("name starts 'boo' and id < 5")
+        assert [habit.id for habit in query.run(sample_habits)] == [2]
+        assert [habit.id for habit in query.run(list(sample_habits))] == [2]
+    assert mock_compile.call_count == 2
+
+    habit = sample_habits.get(4)
+    habit.category = "Sport"
+    sample_habits.notify("adjust", habit, dict(category=habit.category))
+    assert [habit.id for habit in Query.parse("category = sport").run(sample_habits)] == [4]
+    assert [habit.id for habit in Query.parse("category in {wellness, health}").run(sample_habits)] == [1, 3]
+    assert [habit.id for habit in Query.parse("category = WELLNESS").run(list(sample_habits))] == [3]
+
+    for text in ["streak >", "streak >> 5", "color = red", "streak > 5 or id = 1", "period in {monthly}", "deadline < 2025-1-1",
+                 "streak > {1, 2}", "deadline < {2025-01-01}"]:
+        with pytest.raises(ValueError):
+            Query.parse(text)
+
+    file_path = str(tmp_path / "habits.json")
+    create_test_file(file_path)
+    assert cli.main(["--file", file_path, "query", "status = Broken and name contains 'cook'"]) == 0
+    output = capsys.readouterr().out
+    assert "Cooking" in output and "Yoga" not in output
+    assert cli.main(["--file", file_path, "query", "streak", "~", "3"]) == 2
+    assert cli.main(["--file", file_path, "query", "streak > {1, 2}"]) == 2
+
+def test_preparsed_filters(sample_habits):
+    """
+    Tests that the filters compare the parsed fields of the habits and convert nothing per habit.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function makes converting dates fail while the filters run and asserts their results,
+    also after a habit was renamed.
+    """
+    deadline = datetime.strptime(sample_habits.get(2).deadline, "%Y-%m-%d")
+    query = Query([("date_create", "=", sample_habits.get(1).date_create), ("status", "in", ["active", "BROKEN"])])
+    habit = sample_habits.get(5)
+    habit.name = "Morning Run"
+    with patch('manage.from_ordinal', side_effect=AssertionError), patch('manage.to_ordinal', side_effect=AssertionError):
+        assert [habit.id for habit in display.select_habits(sample_habits, "deadline", deadline, "<")] == [3, 4, 5]
+        assert [habit.id for habit in display.select_habits(list(sample_habits), "name", "run")] == [5]
+        assert [habit.id for habit in query.run(list(sample_habits))] == [1, 2, 4, 5]
+
+def test_sorted_indexes(sample_habits):
+    """
+    Tests the sorted indexes of the range filters while habits are checked, added, adjusted and removed.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts after every change that each index returns the same habits as comparing all habits.
+    """
+    def assert_indexes():
+        for attribute, field in SortedIndex.FIELDS.items():
+            index = sample_habits.ranges[attribute]
+            for value in {getattr(habit, field) for habit in sample_habits} | {0}:
+                for comparison, matches in [("=", lambda a, b: a == b), (">", lambda a, b: a > b), ("<", lambda a, b: a < b)]:
+                    expected = sorted(habit.id for habit in sample_habits if matches(getattr(habit, field), value))
+                    assert sorted(index.ids(comparison, value)) == expected
+                    assert index.count(comparison, value) == len(expected)
+
+    assert_indexes()
+    Habit.record_check(sample_habits, sample_habits.get(2), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    new_habit = Habit.create(sample_habits, "Swim", "Sport", 7, 10)
+    habit = sample_habits.get(4)
+    habit.target = 30
+    sample_habits.notify("adjust", habit, dict(target=habit.target))
+    assert_indexes()
+    sample_habits.remove(new_habit)
+    sample_habits.notify("delete", new_habit, {})
+    assert_indexes()
+    query = Query.parse("streak > 1 and target > 29")
+    assert query.plan(sample_habits) == [4]
+    assert [habit.id for habit in query.run(sample_habits)] == [4]
+
+def test_trigram_index(sample_habits):
+    """
+    Tests the search of habit names with the trigram index while habits are added, renamed and removed.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts the results of substring, prefix and fuzzy searches, also for names of several words,
+    and that queries on the name only test the candidates of the index.
+    """
+    def search(text, mode = "substring"):
+        return [habit.id for habit in sample_habits.names.search(text, mode)]
+
+    assert search("OOK") == [2, 4]
+    assert search("oo") == [2, 4]
+    assert search("bo", "prefix") == [2]
+    assert search("meditaton", "fuzzy") == [3]
+    yoga = Habit.create(sample_habits, "Yoga (Dummy)", "Sport", 1, 7)
+    python = Habit.create(sample_habits, "Learn Python (Dummy)", "Education", 1, 30)
+    assert search("yoga", "fuzzy") == [5, yoga.id]
+    assert search("lern pyton", "fuzzy") == [python.id]
+    assert search("oo", "fuzzy") == [4, 2]
+    assert Query.parse("name contains 'ook'").plan(sample_habits) == [2, 4]
+
+    new_habit = Habit.create(sample_habits, "Book Club", "Education", 7, 10)
+    habit = sample_habits.get(4)
+    habit.name = "Baking"
+    sample_habits.notify("adjust", habit, dict(name=habit.name))
+    assert search("book") == [2, new_habit.id]
+    assert search("boo", "prefix") == [2, new_habit.id]
+    assert [habit.id for habit in Query.parse("name starts 'clu'").run(sample_habits)] == [new_habit.id]
+    sample_habits.remove(new_habit)
+    sample_habits.notify("delete", new_habit, {})
+    assert search("ook") == [2]
+    rebuilt = TrigramIndex(sample_habits)
+    rebuilt.build()
+    assert rebuilt.postings == sample_habits.names.postings
+
+def test_cli_commands(tmp_path, capsys):
+    """
+    Tests the non-interactive command line on a copy of the test habits.
+
+    Parameters:
+    tmp_path (Path): A temporary directory for the habits file.
+
+    The function checks and adds habits without any prompt and asserts that the changes are saved,
+    that invalid values and unknown IDs are reported by the exit code and that filter and export print the habits.
+    """
+    file_path = str(tmp_path / "habits.json")
+    create_test_file(file_path)
+
+    assert cli.main(["--file", file_path, "check", "2"]) == 0
+    assert cli.main(["--file", file_path, "check", "2", "99"]) == 1
+    assert cli.main(["--file", file_path, "add", "Walk", "--category", "Sport", "--period", "7", "--target", "10"]) == 0
+    assert cli.main(["--file", file_path, "add", "Walk", "--category", "Sports", "--period", "7", "--target", "10"]) == 2
+    habits = JournaledHabitsStore().load(file_path)
+    assert habits.get(2).streak == 16
+    assert habits.get(6).name == "Walk" and habits.get(6).period == 7
+    capsys.readouterr()
+
+    assert cli.main(["--file", file_path, "filter", "streak", ">", "15"]) == 0
+    output = capsys.readouterr().out
+    assert "Read Book" in output and "Exercise" in output and "Yoga" not in output
+    assert cli.main(["--file", file_path, "filter", "streak", "15"]) == 2
+
+    assert cli.main(["--file", file_path, "export"]) == 0
+    exported = json.loads(capsys.readouterr().out)
+    assert [habit["id"] for habit in exported] == [1, 2, 3, 4, 5, 6]
+
+def test_import_main(tmp_path):
+    """
+    Tests that importing main in a fresh interpreter has no side effects.
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing an empty working directory.
+
+    The function asserts that neither questionary nor tabulate is imported, that no habits are loaded
+    and that no file is created.
+    """
+    code = "import sys, main; print('questionary' in sys.modules, 'tabulate' in sys.modules, main.habits)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.split() == ["False", "False", "None"]
+    assert os.listdir(tmp_path) == []
+
+@patch('questionary.select')
+def test_startup_report(mock_select, sample_habits, capsys):
+    """
+    Tests the startup report which is shown instead of the main menu.
+
+    Parameters:
+    sample_habits (list): A list of Habit objects loaded from the test file.
+
+    The function asserts that the phases of the start, the number of habits and whether the UI modules
+    were imported before the menu are printed, and that no question is asked.
+    """
+    with patch.object(main, "habits", sample_habits), patch.dict(main.timings, {"Load habits": 0.002}):
+        main.cli_main(report=True)
+    output = capsys.readouterr().out
+    assert "STARTUP REPORT" in output and "Load habits" in output and "Import questionary" in output
+    assert "Habits" in output and " 5\n" in output
+    assert main.preloaded == {"questionary": True, "tabulate": "tabulate" in sys.modules}
+    assert "questionary preloaded" in output
+    mock_select.return_value.ask.assert_not_called()
+
+def test_main_check_batch(tmp_path, capsys):
+    """
+    Tests checking habits from a CSV file with "python main.py --check-batch" and main.check_batch().
+
+    Parameters:
+    tmp_path (Path): Pytest fixture providing a temporary working directory.
+
+    The function asserts that the checks of the file are recorded and saved to the journal,
+    and that an invalid file is reported without changing or saving any habit.
+    """
+    create_test_file(str(tmp_path / "habits.json"))
+    (tmp_path / "checks.csv").write_text("id,timestamp\n2\n99\n")
+    result = subprocess.run([sys.executable, os.path.abspath(main.__file__), "--check-batch", "checks.csv"], 
+                            cwd=tmp_path, capture_output=True, text=True)
+    assert "1 checks recorded" in result.stdout and "Unknown habit IDs: 99" in result.stdout
+    assert HabitsStore().load(str(tmp_path / "habits.json")).get(2).streak == 14
+    assert JournaledHabitsStore().load(str(tmp_path / "habits.json")).get(2).streak == 15
+
+    (tmp_path / "invalid.csv").write_text("2\n4,yesterday\n")
+    habits = HabitsStore().load(str(tmp_path / "habits.json"))
+    store = MagicMock()
+    with patch.object(main, "habits", habits), patch.object(main, "habits_store", store):
+        main.check_batch(str(tmp_path / "invalid.csv"))
+    assert "yesterday" in capsys.readouterr().err
+    store.save.assert_not_called()
+    assert habits.get(2).streak == 14